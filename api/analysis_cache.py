@@ -0,0 +1,125 @@
+"""
+Caché de Análisis Guardados
+===========================
+Respuestas de ``GET /api/analysis/<id>/`` listas para servir.
+
+La respuesta se guarda en la caché al crear el análisis (``analyze_news``
+y el análisis por lotes) y las consultas siguientes no tocan la base de
+datos. Si no está en la caché (expiró o lo creó otro worker), se lee de la
+BD y se guarda.
+
+``rescore_analyses`` reescribe los análisis de otras versiones con el
+modelo actual, y con la caché local de cada worker (la de por defecto) el
+comando no puede borrar las entradas de los workers. Por eso solo se
+guardan los análisis puntuados por el modelo activo del worker, que el
+comando no cambia, y la clave incluye esa versión: tras una recarga las
+entradas anteriores dejan de usarse. Los análisis de otras versiones se
+leen siempre de la BD.
+
+Cada entrada lleva su ``ETag`` (hash del cuerpo), para que los clientes y
+las CDN puedan revalidar con ``If-None-Match`` y recibir un 304.
+
+Usa el alias de caché ``analyses`` (ver ``CACHES`` en settings): por
+defecto es memoria local de cada worker; con Redis/Memcached se comparte
+entre workers y nodos.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """
+    Respuestas serializadas de los análisis guardados, con su ETag
+    """
+
+    def __init__(self, cache_alias: Optional[str] = 'analyses', max_age: int = 60):
+        self.max_age = max_age
+        self.cache = None
+
+        if cache_alias:
+            try:
+                self.cache = caches[cache_alias]
+            except InvalidCacheBackendError:
+                logger.warning(f"Caché '{cache_alias}' no configurada, los análisis se leerán de la BD")
+
+    @classmethod
+    def from_settings(cls) -> 'AnalysisCache':
+        config = settings.ANALYSIS_CACHE
+        return cls(
+            cache_alias=config.get('ALIAS', 'analyses') if config.get('ENABLED', True) else None,
+            max_age=config.get('MAX_AGE', 60),
+        )
+
+    @staticmethod
+    def make_key(analysis_id, model_version: str) -> str:
+        return f"analysis:{model_version}:{analysis_id}"
+
+    @staticmethod
+    def make_entry(body: Dict) -> Dict:
+        """
+        Entrada de la caché: cuerpo de la respuesta y su ETag
+        """
+        digest = hashlib.blake2b(
+            json.dumps(body, sort_keys=True).encode('utf-8'), digest_size=16
+        ).hexdigest()
+        return {'etag': f'"{digest}"', 'body': body}
+
+    def get(self, analysis_id, model_version: Optional[str]) -> Optional[Dict]:
+        if self.cache is None or model_version is None:
+            return None
+
+        try:
+            return self.cache.get(self.make_key(analysis_id, model_version))
+        except Exception as e:
+            logger.warning(f"Error al leer la caché de análisis: {str(e)}")
+            return None
+
+    def set_many(self, bodies: Dict, model_version: Optional[str]) -> Dict:
+        """
+        Guardar las respuestas de varios análisis (``{id: cuerpo}``); solo
+        se guardan las puntuadas con ``model_version`` (el modelo activo)
+
+        Returns:
+            Dict: Entradas creadas, por id
+        """
+        entries = {analysis_id: self.make_entry(body) for analysis_id, body in bodies.items()}
+        cacheable = {
+            self.make_key(analysis_id, model_version): entry
+            for analysis_id, entry in entries.items()
+            if model_version is not None and entry['body'].get('model_version') == model_version
+        }
+
+        if cacheable and self.cache is not None:
+            try:
+                self.cache.set_many(cacheable)
+            except Exception as e:
+                logger.warning(f"Error al escribir en la caché de análisis: {str(e)}")
+
+        return entries
+
+    def set(self, analysis_id, body: Dict, model_version: Optional[str]) -> Dict:
+        return self.set_many({analysis_id: body}, model_version)[analysis_id]
+
+    def delete_many(self, analysis_ids: Iterable, model_version: str):
+        if self.cache is None:
+            return
+
+        try:
+            self.cache.delete_many([
+                self.make_key(analysis_id, model_version) for analysis_id in analysis_ids
+            ])
+        except Exception as e:
+            logger.warning(f"Error al borrar de la caché de análisis: {str(e)}")
+
+
+# Instancia global usada por las vistas y los comandos
+analysis_cache = AnalysisCache.from_settings()
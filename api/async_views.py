@@ -0,0 +1,271 @@
+"""
+Vistas Asíncronas de la API
+===========================
+Versiones nativas async de analyze_news, get_analysis y health_check para
+el despliegue ASGI (uvicorn bajo gunicorn). Se activan con
+``ASYNC_VIEWS=True``.
+
+La inferencia, que usa CPU, se ejecuta en un pool de hilos acotado y los
+análisis se insertan con el ORM asíncrono (``abulk_create``), de modo que
+los clientes lentos y la latencia de la base de datos no bloquean el
+worker. Los throttles y la caché de análisis (también la lectura de
+``get_analysis``, que la comparte con las vistas síncronas) solo tienen
+API síncrona y pasan por ``sync_to_async``.
+
+El cuerpo se interpreta con los mismos parsers que las vistas de DRF
+(``DEFAULT_PARSER_CLASSES``): JSON, formulario y multipart.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import metrics
+from .ml_service import ml_service
+from .models import NewsAnalysis
+from .serializers import NewsAnalysisRequestSerializer
+from .stats import arecord_analyses
+from .utils import get_client_ip
+from .views import (
+    build_analysis_response,
+    build_health_response,
+    cache_analyses,
+    load_stored_analysis,
+    stored_analysis_response,
+)
+
+logger = logging.getLogger(__name__)
+
+# Pool acotado para la inferencia: nunca hay más de INFERENCE_THREADS
+# predicciones en paralelo por worker, el resto espera en cola
+inference_executor = ThreadPoolExecutor(
+    max_workers=settings.ML_CONFIG.get('INFERENCE_THREADS', 4),
+    thread_name_prefix='inference'
+)
+
+
+async def run_inference(func, *args):
+    """
+    Ejecutar ``func`` en el pool de inferencia conservando el contexto
+    (tiempos por petición de ``api.timing``)
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        inference_executor, functools.partial(context.run, func, *args)
+    )
+
+
+@sync_to_async
+def check_throttles(request):
+    """
+    Aplicar los mismos throttles que DEFAULT_THROTTLE_CLASSES de DRF
+
+    Returns:
+        float | None: Segundos a esperar si la petición se limita
+    """
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            return throttle.wait() or 0
+    return None
+
+
+def parse_request_data(request):
+    """
+    Datos del cuerpo interpretados con los parsers de DRF, como en la
+    versión síncrona de la vista (el cuerpo ya está leído: no bloquea)
+    """
+    parsers = [parser_class() for parser_class in api_settings.DEFAULT_PARSER_CLASSES]
+    return Request(request, parsers=parsers).data
+
+
+def require_methods(*methods):
+    """
+    Equivalente async de ``require_http_methods`` (el de Django 4.2 envuelve
+    la vista en una función síncrona y deja de ser una vista async)
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def inner(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+        return inner
+    return decorator
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    """
+    JsonResponse con el mismo formato que el JSONRenderer de DRF
+    """
+    return JsonResponse(data, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+def throttled_response(wait):
+    response = json_response({
+        'status': 'error',
+        'message': 'Demasiadas peticiones, inténtalo más tarde',
+        'code': 'THROTTLED'
+    }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = str(int(wait) + 1)
+    return response
+
+
+@require_methods('POST')
+async def analyze_news(request):
+    """
+    Endpoint principal para analizar noticias (versión asíncrona)
+
+    POST /api/analyze/
+    """
+    try:
+        wait = await check_throttles(request)
+        if wait is not None:
+            return throttled_response(wait)
+
+        # Validar datos de entrada
+        try:
+            data = parse_request_data(request)
+        except ParseError:
+            data = None
+        except UnsupportedMediaType as e:
+            return json_response({
+                'status': 'error',
+                'message': str(e.detail),
+                'code': 'UNSUPPORTED_MEDIA_TYPE'
+            }, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        serializer = NewsAnalysisRequestSerializer(data=data)
+        if not serializer.is_valid():
+            return json_response({
+                'status': 'error',
+                'message': 'Datos de entrada inválidos',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        text = serializer.validated_data['text']
+
+        # Verificar que el servicio ML esté listo
+        if not ml_service.is_ready():
+            return json_response({
+                'status': 'error',
+                'message': 'El servicio de análisis no está disponible temporalmente',
+                'code': 'SERVICE_UNAVAILABLE'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        # Validar el texto con el servicio ML
+        is_valid, error_message = ml_service.validate_text(text)
+        if not is_valid:
+            return json_response({
+                'status': 'error',
+                'message': error_message,
+                'code': 'INVALID_TEXT'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Realizar predicción
+        try:
+            prediction_result = await run_inference(ml_service.predict, text)
+
+            # Guardar análisis en la base de datos
+            with metrics.observe_stage('db_persist'):
+                news_analysis, = await arecord_analyses([NewsAnalysis(
+                    text=text[:1000],  # Limitar texto guardado
+                    prediction=prediction_result['prediction'],
+                    confidence=prediction_result['confidence'],
+                    probability_real=prediction_result['probability_real'],
+                    probability_fake=prediction_result['probability_fake'],
+                    model_version=prediction_result['model_version'],
+                    ip_address=get_client_ip(request)
+                )])
+            await sync_to_async(cache_analyses)([news_analysis])
+
+            logger.info(f"Análisis exitoso: {news_analysis.id}")
+            return json_response(build_analysis_response(news_analysis, prediction_result))
+
+        except Exception as e:
+            logger.error(f"Error en predicción: {str(e)}")
+            return json_response({
+                'status': 'error',
+                'message': 'Error interno en el análisis',
+                'code': 'PREDICTION_ERROR'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    except Exception as e:
+        logger.error(f"Error general en analyze_news: {str(e)}")
+        return json_response({
+            'status': 'error',
+            'message': 'Error interno del servidor',
+            'code': 'INTERNAL_ERROR'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# Igual que las vistas de DRF, la API no usa protección CSRF de sesión
+analyze_news.csrf_exempt = True
+
+
+@require_methods('GET')
+async def get_analysis(request, analysis_id):
+    """
+    Obtener resultado de un análisis específico (versión asíncrona)
+
+    GET /api/analysis/{analysis_id}/
+    """
+    try:
+        wait = await check_throttles(request)
+        if wait is not None:
+            return throttled_response(wait)
+
+        entry = await sync_to_async(load_stored_analysis)(analysis_id)
+
+        return stored_analysis_response(request, entry, json_response)
+
+    except NewsAnalysis.DoesNotExist:
+        return json_response({
+            'status': 'error',
+            'message': 'Análisis no encontrado',
+            'code': 'NOT_FOUND'
+        }, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.error(f"Error al obtener análisis: {str(e)}")
+        return json_response({
+            'status': 'error',
+            'message': 'Error interno del servidor',
+            'code': 'INTERNAL_ERROR'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_methods('GET')
+async def health_check(request):
+    """
+    Endpoint de salud del servicio (versión asíncrona)
+
+    GET /api/health/
+    """
+    try:
+        wait = await check_throttles(request)
+        if wait is not None:
+            return throttled_response(wait)
+
+        health_data, http_status = build_health_response()
+
+        return json_response(health_data, status=http_status)
+
+    except Exception as e:
+        logger.error(f"Error en health check: {str(e)}")
+        return json_response({
+            'service_status': 'unhealthy',
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,168 @@
+"""
+Puntuación Masiva en Streaming (NDJSON)
+=======================================
+Tubería de generadores para puntuar archivos de noticias de cualquier
+tamaño: las líneas se leen de una en una, se agrupan en bloques de tamaño
+fijo que pasan por ``predict_batch`` y los resultados se emiten a medida
+que se calculan. La memoria usada depende del tamaño del bloque, no del
+tamaño de la entrada.
+
+Formato de entrada (una noticia por línea)::
+
+    {"id": "nota-1", "text": "Texto de la noticia..."}
+
+Formato de salida (un resultado por línea, en el mismo orden)::
+
+    {"line": 1, "id": "nota-1", "status": "success", "prediction": "FALSA", ...}
+    {"line": 2, "status": "error", "message": "...", "code": "INVALID_JSON"}
+
+Los errores de una línea (JSON inválido, texto no válido, ...) se
+devuelven en su propia línea y no interrumpen el resto del stream. Si la
+entrada supera ``max_lines``, la última línea de salida es un error
+``TOO_MANY_LINES`` y el resto de la entrada no se lee.
+"""
+
+import json
+import logging
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Una línea leída: (número de línea, texto de la noticia, id, error)
+ParsedLine = Tuple[int, str, object, Dict]
+
+
+def parse_lines(lines: Iterable) -> Iterator[ParsedLine]:
+    """
+    Decodificar cada línea NDJSON; las líneas en blanco se ignoran
+    """
+    for line_number, raw_line in enumerate(lines, start=1):
+        if isinstance(raw_line, bytes):
+            try:
+                raw_line = raw_line.decode('utf-8')
+            except UnicodeDecodeError:
+                yield line_number, None, None, {
+                    'message': 'La línea no está codificada en UTF-8',
+                    'code': 'INVALID_JSON'
+                }
+                continue
+
+        if not raw_line.strip():
+            continue
+
+        try:
+            record = json.loads(raw_line)
+        except ValueError:
+            yield line_number, None, None, {
+                'message': 'La línea no es un JSON válido',
+                'code': 'INVALID_JSON'
+            }
+            continue
+
+        if not isinstance(record, dict) or not isinstance(record.get('text'), str):
+            yield line_number, None, record.get('id') if isinstance(record, dict) else None, {
+                'message': 'Cada línea debe ser un objeto con el campo "text"',
+                'code': 'INVALID_RECORD'
+            }
+            continue
+
+        yield line_number, record['text'], record.get('id'), None
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    Agrupar un iterable en listas de ``size`` elementos (la última puede ser menor)
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_chunk(service, chunk: List[ParsedLine]) -> List[Dict]:
+    """
+    Puntuar un bloque de líneas con una sola llamada a ``predict_batch``
+
+    Sin caché de predicciones: los textos de un archivo rara vez se repiten
+    y solo desplazarían las entradas útiles de la caché compartida.
+    """
+    valid = [item for item in chunk if item[3] is None]
+    predictions = {}
+
+    # Los errores de texto (INVALID_TEXT) los cuenta predict_batch
+    for _, _, _, error in chunk:
+        if error is not None:
+            metrics.count_error(error['code'])
+
+    if valid:
+        try:
+            results = service.predict_batch([text for _, text, _, _ in valid], use_cache=False)
+            predictions = {item[0]: result for item, result in zip(valid, results)}
+        except Exception as e:
+            logger.error(f"Error al puntuar un bloque del stream: {str(e)}")
+            error = {'error': 'Error interno en el análisis', 'code': 'PREDICTION_ERROR'}
+            predictions = {item[0]: error for item in valid}
+            metrics.count_error('PREDICTION_ERROR', len(valid))
+
+    output = []
+    for line_number, _, record_id, error in chunk:
+        result = {'line': line_number}
+        if record_id is not None:
+            result['id'] = record_id
+
+        if error is None:
+            prediction = predictions[line_number]
+            if 'error' in prediction:
+                error = {'message': prediction['error'], 'code': prediction['code']}
+
+        if error is not None:
+            result.update({'status': 'error', **error})
+        else:
+            result.update({
+                'status': 'success',
+                'prediction': prediction['prediction'],
+                'confidence': round(prediction['confidence'], 4),
+                'probability_real': round(prediction['probability_real'], 4),
+                'probability_fake': round(prediction['probability_fake'], 4),
+                'model_version': prediction['model_version'],
+            })
+        output.append(result)
+
+    return output
+
+
+def stream_ndjson(service, lines: Iterable, chunk_size: int = 256,
+                  max_lines: int = 0) -> Iterator[bytes]:
+    """
+    Puntuar un stream de líneas NDJSON emitiendo un bloque de bytes NDJSON
+    por cada bloque de entrada, listo para ``StreamingHttpResponse``
+
+    Con ``max_lines`` (0 = sin límite) se puntúan como mucho esas líneas
+    no vacías.
+    """
+    parsed = parse_lines(lines)
+    limited = islice(parsed, max_lines) if max_lines else parsed
+
+    for chunk in chunked(limited, chunk_size):
+        yield ''.join(
+            json.dumps(result, ensure_ascii=False) + '\n'
+            for result in score_chunk(service, chunk)
+        ).encode('utf-8')
+
+    if max_lines:
+        extra = next(parsed, None)
+        if extra is not None:
+            metrics.count_error('TOO_MANY_LINES')
+            error = {
+                'line': extra[0],
+                'status': 'error',
+                'message': f'Se admiten como mucho {max_lines} líneas por petición; '
+                           f'para archivos mayores usa "manage.py score_ndjson"',
+                'code': 'TOO_MANY_LINES'
+            }
+            yield (json.dumps(error, ensure_ascii=False) + '\n').encode('utf-8')
@@ -0,0 +1,372 @@
+"""
+Backends de Inferencia
+======================
+Dónde se ejecuta ``predict_proba`` sobre los textos ya preprocesados:
+
+- ``local``: en el propio proceso web (comportamiento por defecto).
+- ``process_pool``: en un pool de procesos, cada uno con su copia del
+  modelo, para usar todos los núcleos sin que el GIL limite la inferencia
+  y dejar los workers web como simples manejadores de E/S.
+
+Este módulo no depende de Django para que los procesos del pool puedan
+importarlo sin configurar el proyecto.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from .metrics import observe_stage
+from .model_artifacts import compute_model_version, load_artifact
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TEXT = 'el gobierno anunció nuevas medidas económicas para combatir la inflación'
+
+# Modelo cargado en cada proceso del pool y su versión
+_worker_model = None
+_worker_version = None
+
+
+def _init_worker(model_path: str, artifact_path: Optional[str], use_mmap: bool):
+    """
+    Inicializador de cada proceso del pool: carga el modelo una vez
+    """
+    global _worker_model, _worker_version
+    import joblib
+
+    loaded = None
+    if use_mmap and artifact_path:
+        try:
+            loaded = load_artifact(model_path, artifact_path)
+        except Exception as e:
+            logger.warning(f"No se pudo cargar el artefacto mapeado en el pool: {str(e)}")
+
+    if loaded is None:
+        loaded = joblib.load(model_path), compute_model_version(model_path)
+    _worker_model, _worker_version = loaded
+
+
+def staged_predict_proba(estimator, texts: List[str], on_step=None):
+    """
+    ``predict_proba`` midiendo por separado la vectorización (pasos de
+    transformación del pipeline) y la clasificación (último paso)
+    
+    Hace lo mismo que ``Pipeline.predict_proba``; un estimador que no es un
+    pipeline se mide entero como clasificación. Si se indica,
+    ``on_step(nombre, segundos)`` recibe el tiempo de cada paso del pipeline
+    (ver ``api.pipeline_profiler``).
+    """
+    # GridSearchCV delega en el mejor pipeline encontrado
+    pipeline = getattr(estimator, 'best_estimator_', estimator)
+    steps = getattr(pipeline, 'steps', None)
+    if not steps or len(steps) < 2:
+        steps = [(type(pipeline).__name__, estimator)]
+    
+    features = texts
+    if len(steps) > 1:
+        with observe_stage('vectorize'):
+            for name, step in steps[:-1]:
+                if step is not None and step != 'passthrough':
+                    started_at = time.perf_counter()
+                    features = step.transform(features)
+                    if on_step is not None:
+                        on_step(name, time.perf_counter() - started_at)
+    
+    name, classifier = steps[-1]
+    started_at = time.perf_counter()
+    with observe_stage('classify'):
+        probabilities = classifier.predict_proba(features)
+    if on_step is not None:
+        on_step(name, time.perf_counter() - started_at)
+    return probabilities
+
+
+def _worker_predict_proba(texts: List[str], version: Optional[str] = None):
+    # None si el proceso tiene cargado otro modelo que el pedido
+    if version is not None and version != _worker_version:
+        return None
+    return staged_predict_proba(_worker_model, texts)
+
+
+def _worker_pid(_):
+    return os.getpid()
+
+
+def default_pool_size() -> int:
+    """
+    Procesos del pool por worker web: los núcleos repartidos entre los
+    ``WEB_CONCURRENCY`` workers (cada worker tiene su propio pool)
+    """
+    try:
+        web_workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+    except ValueError:
+        web_workers = 1
+    return max((os.cpu_count() or 1) // max(web_workers, 1), 1)
+
+
+class InferenceBackend(ABC):
+    """
+    Interfaz común de los backends de inferencia
+    """
+    name = 'base'
+
+    @abstractmethod
+    def predict_proba(self, texts: List[str], estimator=None, version: Optional[str] = None):
+        """
+        Probabilidades para ``texts`` con el modelo ``estimator`` (de versión
+        ``version``); sin ellos, con el modelo activo del backend
+        """
+
+    def start(self):
+        """
+        Preparar el backend (se llama al arrancar cada worker web)
+        """
+
+    def shutdown(self):
+        """
+        Liberar los recursos del backend
+        """
+
+    def reload(self, model_path: str, artifact_path: Optional[str] = None):
+        """
+        Pasar a usar otro modelo (tras una recarga en caliente)
+        """
+
+    def get_stats(self) -> Dict:
+        return {'backend': self.name}
+
+
+class LocalInferenceBackend(InferenceBackend):
+    """
+    Inferencia en el proceso web con el modelo ya cargado por el servicio
+    """
+    name = 'local'
+
+    def __init__(self, get_model):
+        self.get_model = get_model
+
+    def predict_proba(self, texts: List[str], estimator=None, version: Optional[str] = None):
+        model = estimator if estimator is not None else self.get_model()
+        return staged_predict_proba(model, texts)
+
+
+class ProcessPoolInferenceBackend(InferenceBackend):
+    """
+    Inferencia en un pool de procesos con el modelo precargado
+
+    Si un proceso del pool muere, el pool se recrea y la llamada se reintenta
+    una vez, siempre que no se hayan superado ``max_restarts`` reinicios en
+    los últimos ``restart_window`` segundos. Pasado ese límite el pool queda
+    desactivado (``RuntimeError``) hasta que termina la ventana.
+
+    Si se pide una versión que no es la cargada en el pool (una petición
+    que empezó antes de una recarga), ``estimator`` se ejecuta en el
+    proceso web.
+    """
+    name = 'process_pool'
+
+    def __init__(self, model_path: str, artifact_path: Optional[str] = None,
+                 use_mmap: bool = True, pool_size: Optional[int] = None,
+                 warmup: bool = True, max_restarts: int = 5,
+                 restart_window: float = 60.0, timeout: Optional[float] = 30.0,
+                 start_method: Optional[str] = None):
+        self.model_path = str(model_path)
+        self.artifact_path = str(artifact_path) if artifact_path else None
+        self.use_mmap = use_mmap
+        self.pool_size = pool_size or default_pool_size()
+        self.warmup = warmup
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.timeout = timeout
+        self.start_method = start_method or (
+            'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        )
+
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._restarts = deque()
+        self._total_restarts = 0
+        # Instante (monotonic) hasta el que el pool queda desactivado
+        self._failed_until = None
+        # Los hilos de un worker web llaman a la vez: contadores con su lock
+        self._stats_lock = threading.Lock()
+        self._calls = 0
+        # Llamadas ejecutadas en el proceso web por pedir otra versión
+        self._local_calls = 0
+
+    def start(self):
+        self._get_executor()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def reload(self, model_path: str, artifact_path: Optional[str] = None):
+        """
+        Crear y calentar un pool con el modelo nuevo y sustituir el actual;
+        las tareas en curso del pool anterior terminan con el modelo anterior
+        """
+        self.model_path = str(model_path)
+        self.artifact_path = str(artifact_path) if artifact_path else None
+        new_executor = self._create_executor()
+
+        with self._lock:
+            old_executor, old_pid = self._executor, self._pid
+            self._executor, self._pid = new_executor, os.getpid()
+            self._failed_until = None
+
+        if old_executor is not None and old_pid == os.getpid():
+            old_executor.shutdown(wait=False)
+
+    def predict_proba(self, texts: List[str], estimator=None, version: Optional[str] = None):
+        if estimator is None:
+            version = None
+
+        executor = self._get_executor()
+        with self._stats_lock:
+            self._calls += 1
+        try:
+            probabilities = executor.submit(_worker_predict_proba, texts, version).result(timeout=self.timeout)
+        except BrokenProcessPool:
+            logger.error("Un proceso del pool de inferencia terminó inesperadamente")
+            executor = self._restart(executor)
+            probabilities = executor.submit(_worker_predict_proba, texts, version).result(timeout=self.timeout)
+
+        if probabilities is None:
+            with self._stats_lock:
+                self._local_calls += 1
+            return staged_predict_proba(estimator, texts)
+        return probabilities
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            calls, local_calls = self._calls, self._local_calls
+        return {
+            'backend': self.name,
+            'pool_size': self.pool_size,
+            'start_method': self.start_method,
+            'running': self._executor is not None and self._pid == os.getpid(),
+            'calls': calls,
+            'local_calls': local_calls,
+            'restarts': self._total_restarts,
+            'failed': self._failed_until is not None and time.monotonic() < self._failed_until,
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Un pool creado antes de un fork (maestro de gunicorn) no sirve en el hijo
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._check_not_failed()
+                self._executor = self._create_executor()
+                self._pid = os.getpid()
+            return self._executor
+
+    def _check_not_failed(self):
+        if self._failed_until is None:
+            return
+        remaining = self._failed_until - time.monotonic()
+        if remaining > 0:
+            raise RuntimeError(
+                f"El pool de inferencia superó {self.max_restarts} reinicios en "
+                f"{self.restart_window:.0f}s; desactivado durante {remaining:.0f}s más"
+            )
+        self._failed_until = None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        started_at = time.perf_counter()
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method == 'forkserver':
+            # Precargar solo este módulo (y joblib/sklearn) en el forkserver,
+            # no el ``__main__`` del proceso web
+            context.set_forkserver_preload([__name__])
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.pool_size,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.model_path, self.artifact_path, self.use_mmap),
+        )
+
+        if self.warmup:
+            # Arrancar todos los procesos y hacer una predicción en cada uno
+            list(executor.map(_worker_pid, range(self.pool_size)))
+            futures = [
+                executor.submit(_worker_predict_proba, [WARMUP_TEXT])
+                for _ in range(self.pool_size)
+            ]
+            for future in futures:
+                future.result()
+
+        logger.info(
+            f"Pool de inferencia listo: {self.pool_size} procesos "
+            f"({self.start_method}) en {time.perf_counter() - started_at:.2f}s"
+        )
+        return executor
+
+    def _restart(self, broken_executor) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is not broken_executor:
+                # Otro hilo ya lo reinició (o lo desactivó)
+                if self._executor is None:
+                    self._check_not_failed()
+                    self._executor = self._create_executor()
+                    self._pid = os.getpid()
+                return self._executor
+
+            now = time.monotonic()
+            while self._restarts and now - self._restarts[0] > self.restart_window:
+                self._restarts.popleft()
+
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+            if len(self._restarts) >= self.max_restarts:
+                # Sin pool hasta que el reinicio más antiguo salga de la ventana
+                self._failed_until = (self._restarts[0] if self._restarts else now) + self.restart_window
+                self._check_not_failed()
+
+            self._restarts.append(now)
+            self._total_restarts += 1
+
+            logger.warning("Reiniciando el pool de inferencia")
+            self._executor = self._create_executor()
+            self._pid = os.getpid()
+            return self._executor
+
+
+def create_backend(ml_config: Dict, get_model) -> InferenceBackend:
+    """
+    Crear el backend indicado en ``ML_CONFIG['INFERENCE_BACKEND']``
+    """
+    backend = ml_config.get('INFERENCE_BACKEND', 'local')
+
+    if backend == 'local':
+        return LocalInferenceBackend(get_model)
+
+    if backend == 'process_pool':
+        return ProcessPoolInferenceBackend(
+            model_path=ml_config['MODEL_PATH'],
+            artifact_path=ml_config.get('MODEL_ARTIFACT_PATH'),
+            use_mmap=ml_config.get('MODEL_MMAP', True),
+            pool_size=ml_config.get('INFERENCE_POOL_SIZE'),
+            warmup=ml_config.get('INFERENCE_POOL_WARMUP', True),
+            max_restarts=ml_config.get('INFERENCE_POOL_MAX_RESTARTS', 5),
+            restart_window=ml_config.get('INFERENCE_POOL_RESTART_WINDOW', 60.0),
+            timeout=ml_config.get('INFERENCE_POOL_TIMEOUT', 30.0),
+        )
+
+    raise ValueError(f"Backend de inferencia desconocido: {backend}")
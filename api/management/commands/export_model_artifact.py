@@ -0,0 +1,37 @@
+"""
+Exportar el modelo a un artefacto con memoria mapeada
+=====================================================
+Uso: python manage.py export_model_artifact
+"""
+
+import joblib
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.model_artifacts import export_artifact, load_artifact
+
+SAMPLE_TEXTS = [
+    'el gobierno anunció nuevas medidas económicas para combatir la inflación',
+    'el agua del grifo contiene microchips para controlar nuestras mentes',
+]
+
+
+class Command(BaseCommand):
+    help = 'Exporta el modelo ML a un archivo joblib cargable con mmap_mode="r"'
+
+    def handle(self, *args, **options):
+        source_path = settings.ML_CONFIG['MODEL_PATH']
+        artifact_path = settings.ML_CONFIG['MODEL_ARTIFACT_PATH']
+
+        metadata = export_artifact(source_path, artifact_path)
+
+        # Verificar que el artefacto predice exactamente lo mismo que el original
+        estimator, _ = load_artifact(source_path, artifact_path)
+        expected = joblib.load(source_path).predict_proba(SAMPLE_TEXTS)
+        if not np.array_equal(expected, estimator.predict_proba(SAMPLE_TEXTS)):
+            raise CommandError('El artefacto exportado no reproduce las predicciones del modelo original')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Artefacto exportado: {artifact_path} (versión {metadata['model_version']})"
+        ))
@@ -0,0 +1,17 @@
+"""
+Recalcular la tabla de estadísticas por hora
+============================================
+Uso: python manage.py rebuild_hourly_stats
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.stats import rebuild_hourly_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalcula HourlyStats a partir de NewsAnalysis y APIUsage'
+
+    def handle(self, *args, **options):
+        hours = rebuild_hourly_stats()
+        self.stdout.write(self.style.SUCCESS(f'Estadísticas recalculadas: {hours} horas'))
@@ -0,0 +1,219 @@
+"""
+Recalcular las predicciones guardadas con el modelo actual
+=========================================================
+Uso:
+    python manage.py rescore_analyses
+    python manage.py rescore_analyses --workers 8 --chunk-size 2000
+    python manage.py rescore_analyses --restart
+
+Recorre NewsAnalysis por clave primaria (paginación por clave, sin OFFSET),
+puntúa cada bloque en un pool de procesos y guarda los resultados con
+``bulk_update``. Tras cada bloque se guarda un punto de control: si el
+comando se interrumpe, al volver a ejecutarlo continúa donde se quedó
+(siempre que el modelo sea el mismo). Los contadores de HourlyStats se
+ajustan en la misma transacción que cada bloque.
+
+Las vistas guardan solo los primeros ``STORED_TEXT_LENGTH`` caracteres de
+cada noticia: las filas que llegan a ese límite están probablemente
+recortadas y se dejan como están (``--include-truncated`` las recalcula
+igualmente, con el texto recortado).
+"""
+
+import json
+import os
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.analysis_cache import analysis_cache
+from api.inference_backends import ProcessPoolInferenceBackend
+from api.models import NewsAnalysis
+from api.stats import apply_hourly_counters, prediction_counter, truncate_to_hour
+from api.text_normalizer import normalize_text
+
+UPDATE_FIELDS = ['prediction', 'confidence', 'probability_real', 'probability_fake', 'model_version']
+
+# Caracteres del texto que guardan las vistas (``text[:1000]``)
+STORED_TEXT_LENGTH = 1000
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las predicciones de NewsAnalysis con el modelo actual'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Filas por bloque')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Procesos de inferencia (0 = en este proceso)')
+        parser.add_argument('--checkpoint',
+                            default=str(settings.BASE_DIR / 'cache' / 'rescore_analyses.json'),
+                            help='Archivo del punto de control')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignorar el punto de control y empezar desde el principio')
+        parser.add_argument('--include-truncated', action='store_true',
+                            help=f'Recalcular también las filas con {STORED_TEXT_LENGTH} caracteres '
+                                 f'o más: se guardaron recortadas y la predicción nueva sería '
+                                 f'solo del principio de la noticia')
+
+    def handle(self, *args, **options):
+        from api.ml_service import ml_service
+
+        if not ml_service.is_ready():
+            raise CommandError('El modelo no está disponible')
+
+        self.service = ml_service
+        self.checkpoint_path = options['checkpoint']
+        checkpoint = self.load_checkpoint(options['restart'])
+
+        last_pk = checkpoint.get('last_pk')
+        self.processed = checkpoint.get('processed', 0)
+        self.changed = checkpoint.get('changed', 0)
+        self.skipped = checkpoint.get('skipped', 0)
+        include_truncated = options['include_truncated']
+        if last_pk:
+            self.stdout.write(f"Reanudando tras {self.processed} filas (última clave {last_pk})")
+
+        workers = options['workers']
+        if workers > 0:
+            backend = ProcessPoolInferenceBackend(
+                model_path=settings.ML_CONFIG['MODEL_PATH'],
+                artifact_path=settings.ML_CONFIG.get('MODEL_ARTIFACT_PATH'),
+                use_mmap=settings.ML_CONFIG.get('MODEL_MMAP', True),
+                pool_size=workers,
+            )
+            predict_proba = backend.predict_proba
+        else:
+            backend = None
+            predict_proba = ml_service.predict_proba
+
+        def score(rows):
+            scored = [
+                row for row in rows
+                if include_truncated or len(row[1]) < STORED_TEXT_LENGTH
+            ]
+            processed_texts = [normalize_text(row[1]) for row in scored]
+            probabilities = predict_proba(processed_texts) if scored else []
+            return rows, scored, processed_texts, probabilities
+
+        self.started_at = time.perf_counter()
+        self.session_rows = 0
+
+        # Varios bloques en vuelo para mantener ocupado el pool mientras se
+        # lee y escribe en la BD; los resultados se guardan en orden
+        in_flight = deque()
+        max_in_flight = max(1, workers) * 2
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                for rows in self.iter_chunks(last_pk, options['chunk_size']):
+                    in_flight.append(executor.submit(score, rows))
+                    if len(in_flight) >= max_in_flight:
+                        self.write_chunk(*in_flight.popleft().result())
+
+                while in_flight:
+                    self.write_chunk(*in_flight.popleft().result())
+        finally:
+            if backend is not None:
+                backend.shutdown()
+
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        elapsed = time.perf_counter() - self.started_at
+        rate = self.session_rows / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Recalculadas {self.processed} filas ({self.changed} con otra predicción, "
+            f"{self.skipped} recortadas sin recalcular) en {elapsed:.1f}s ({rate:.0f} filas/s) con el modelo {ml_service.model_version}"
+        ))
+
+    def iter_chunks(self, last_pk, chunk_size):
+        """
+        Bloques de (pk, texto, fecha, valores guardados) ordenados por clave primaria
+        """
+        queryset = NewsAnalysis.objects.order_by('pk').values_list(
+            'pk', 'text', 'created_at', *UPDATE_FIELDS
+        )
+        while True:
+            page = queryset.filter(pk__gt=last_pk) if last_pk else queryset
+            rows = list(page[:chunk_size])
+            if not rows:
+                return
+            yield rows
+            last_pk = rows[-1][0]
+
+    def write_chunk(self, rows, scored, processed_texts, probabilities):
+        updates = []
+        deltas = defaultdict(Counter)
+        changed = 0
+
+        for (pk, text, created_at, *stored), processed_text, row in zip(
+            scored, processed_texts, probabilities
+        ):
+            result = self.service._build_result(text, processed_text, row)
+            values = [result[field] for field in UPDATE_FIELDS]
+
+            # Solo se escriben las filas que cambian (un reintento tras
+            # interrumpir el comando no reescribe lo ya recalculado)
+            if values == stored:
+                continue
+
+            updates.append(NewsAnalysis(pk=pk, **dict(zip(UPDATE_FIELDS, values))))
+
+            old_prediction = stored[0]
+            if result['prediction'] != old_prediction:
+                changed += 1
+                hour = truncate_to_hour(created_at)
+                deltas[hour][prediction_counter(old_prediction)] -= 1
+                deltas[hour][prediction_counter(result['prediction'])] += 1
+
+        if updates:
+            with transaction.atomic():
+                NewsAnalysis.objects.bulk_update(updates, UPDATE_FIELDS, batch_size=500)
+                apply_hourly_counters(deltas)
+            # La caché de análisis solo guarda los de la versión activa (ver
+            # ``api.analysis_cache``); con una caché compartida se borran las
+            # entradas de esa versión que hayan cambiado
+            analysis_cache.delete_many(
+                [str(analysis.pk) for analysis in updates], self.service.model_version
+            )
+
+        self.processed += len(rows)
+        self.changed += changed
+        self.skipped += len(rows) - len(scored)
+        self.session_rows += len(rows)
+        self.save_checkpoint(rows[-1][0])
+
+        elapsed = time.perf_counter() - self.started_at
+        rate = self.session_rows / elapsed if elapsed else 0.0
+        self.stdout.write(f"{self.processed} filas, {self.changed} cambios ({rate:.0f} filas/s)")
+
+    def load_checkpoint(self, restart):
+        if restart or not os.path.exists(self.checkpoint_path):
+            return {}
+
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+
+        if checkpoint.get('model_version') != self.service.model_version:
+            self.stdout.write(self.style.WARNING(
+                f"El punto de control es del modelo {checkpoint.get('model_version')}; se empieza de nuevo"
+            ))
+            return {}
+
+        return checkpoint
+
+    def save_checkpoint(self, last_pk):
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'model_version': self.service.model_version,
+                'last_pk': str(last_pk),
+                'processed': self.processed,
+                'changed': self.changed,
+                'skipped': self.skipped,
+            }, f)
+        os.replace(tmp_path, self.checkpoint_path)
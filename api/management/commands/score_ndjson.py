@@ -0,0 +1,59 @@
+"""
+Puntuar un archivo NDJSON de noticias
+=====================================
+Uso:
+    python manage.py score_ndjson noticias.ndjson > resultados.ndjson
+    cat noticias.ndjson | python manage.py score_ndjson - --chunk-size 1000
+
+Cada línea de entrada es un objeto ``{"id": ..., "text": ...}``; la salida
+tiene una línea de resultado por cada línea de entrada (ver
+``api.bulk_scoring``). El archivo se procesa en bloques sin cargarlo entero
+en memoria.
+"""
+
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.bulk_scoring import stream_ndjson
+
+
+class Command(BaseCommand):
+    help = 'Puntúa un archivo NDJSON de noticias y escribe los resultados en NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Archivo NDJSON de entrada ("-" para stdin)')
+        parser.add_argument('--output', '-o', default='-',
+                            help='Archivo NDJSON de salida (por defecto stdout)')
+        parser.add_argument('--chunk-size', type=int,
+                            default=settings.ML_CONFIG.get('STREAM_CHUNK_SIZE', 256),
+                            help='Líneas por bloque de predicción')
+
+    def handle(self, *args, **options):
+        from api.ml_service import ml_service
+
+        if not ml_service.is_ready():
+            raise CommandError('El modelo no está disponible')
+
+        source = sys.stdin.buffer if options['input'] == '-' else open(options['input'], 'rb')
+        target = sys.stdout.buffer if options['output'] == '-' else open(options['output'], 'wb')
+
+        started_at = time.perf_counter()
+        lines = 0
+        try:
+            for block in stream_ndjson(ml_service, source, options['chunk_size']):
+                target.write(block)
+                target.flush()
+                lines += block.count(b'\n')
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+            if target is not sys.stdout.buffer:
+                target.close()
+
+        elapsed = time.perf_counter() - started_at
+        self.stderr.write(self.style.SUCCESS(
+            f"{lines} líneas puntuadas en {elapsed:.1f}s ({lines / elapsed if elapsed else 0:.0f} líneas/s)"
+        ))
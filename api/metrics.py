@@ -0,0 +1,162 @@
+"""
+Métricas de Prometheus
+======================
+Histogramas, contadores y gauges que se exponen en ``/metrics``.
+
+Con varios workers de gunicorn cada proceso tiene sus propias métricas;
+para agregarlas se usa el modo multiproceso de ``prometheus_client``: si
+``PROMETHEUS_MULTIPROC_DIR`` está definida (``gunicorn.conf.py`` la define
+y vacía el directorio al arrancar), cada proceso escribe sus valores en
+archivos mapeados en memoria de ese directorio y ``/metrics`` los suma al
+responder. Sin la variable (``runserver``, comandos) las métricas son las
+del propio proceso.
+
+Este módulo no importa Django: lo usan también los procesos del pool de
+inferencia.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+# Límites de los intervalos (segundos): de 0,1 ms (normalizar un texto) a
+# varios segundos (peticiones por lotes)
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_DURATION = Histogram(
+    'fakenews_stage_duration_seconds',
+    'Duración de cada etapa del análisis '
+    '(preprocess, vectorize, classify, db_persist)',
+    ['stage'],
+    buckets=STAGE_BUCKETS,
+)
+
+REQUEST_DURATION = Histogram(
+    'fakenews_request_duration_seconds',
+    'Duración de las peticiones a /api/ por endpoint',
+    ['endpoint', 'method'],
+    buckets=REQUEST_BUCKETS,
+)
+
+REQUESTS = Counter(
+    'fakenews_requests_total',
+    'Peticiones a /api/ por endpoint, método y código de estado',
+    ['endpoint', 'method', 'status'],
+)
+
+PREDICTIONS = Counter(
+    'fakenews_predictions_total',
+    'Predicciones servidas por etiqueta y versión del modelo',
+    ['label', 'model_version'],
+)
+
+ERRORS = Counter(
+    'fakenews_errors_total',
+    'Errores devueltos por código (respuestas de error y textos con error '
+    'dentro de lotes y streams)',
+    ['code'],
+)
+
+MODEL_LOAD_SECONDS = Gauge(
+    'fakenews_model_load_seconds',
+    'Tiempo de la última carga de cada modelo',
+    ['model', 'version'],
+    multiprocess_mode='max',
+)
+
+RESIDENT_MEMORY = Gauge(
+    'fakenews_process_resident_memory_bytes',
+    'Memoria residente de cada proceso',
+    multiprocess_mode='liveall',
+)
+
+# La memoria se actualiza al terminar una petición, como mucho cada N segundos
+MEMORY_UPDATE_INTERVAL = 5.0
+_memory_updated_at = 0.0
+
+
+@contextmanager
+def observe_stage(stage: str):
+    """
+    Medir un bloque de código en ``fakenews_stage_duration_seconds``
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(stage).observe(time.perf_counter() - started_at)
+
+
+def count_prediction(result):
+    PREDICTIONS.labels(result['prediction'], result.get('model_version', '')).inc()
+
+
+def count_error(code: str, amount: int = 1):
+    ERRORS.labels(code or 'UNKNOWN').inc(amount)
+
+
+def observe_request(endpoint: str, method: str, status: int, elapsed_seconds: float):
+    REQUEST_DURATION.labels(endpoint, method).observe(elapsed_seconds)
+    REQUESTS.labels(endpoint, method, str(status)).inc()
+    update_memory()
+
+
+def update_memory(force: bool = False):
+    """
+    Actualizar el gauge de memoria residente de este proceso
+    """
+    global _memory_updated_at
+
+    now = time.monotonic()
+    if not force and now - _memory_updated_at < MEMORY_UPDATE_INTERVAL:
+        return
+    _memory_updated_at = now
+
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return
+    RESIDENT_MEMORY.set(resident_pages * os.sysconf('SC_PAGE_SIZE'))
+
+
+def render_metrics():
+    """
+    Texto de exposición de Prometheus y su Content-Type
+
+    En modo multiproceso se agregan los archivos de todos los procesos.
+    """
+    update_memory(force=True)
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """
+    Descartar los gauges ``live*`` de un worker que terminó (hook de gunicorn)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,179 @@
+"""
+Middleware de la API
+====================
+Mide cada petición a la API, la registra en APIUsage y actualiza las
+métricas de Prometheus.
+"""
+
+import json
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+
+from . import metrics, timing
+from .usage import usage_recorder
+from .utils import get_client_ip
+
+
+class RequestTimingMiddleware:
+    """
+    Mide el tiempo de respuesta de las peticiones a ``/api/``
+
+    Registra endpoint, método, estado, latencia total y el desglose entre
+    inferencia del modelo y base de datos. El registro se entrega al
+    ``usage_recorder``, por lo que no hay escrituras en BD en el hilo de
+    la petición. Funciona tanto en modo síncrono (WSGI) como asíncrono (ASGI).
+
+    En las respuestas en streaming el cuerpo se genera después de que la
+    vista devuelve la respuesta: se registran al terminar de enviarlo (o
+    cuando se corta), con el tiempo total y la inferencia y BD de todo el
+    stream.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.path_prefix = getattr(settings, 'USAGE_LOGGING', {}).get('PATH_PREFIX', '/api/')
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        if not request.path.startswith(self.path_prefix):
+            return self.get_response(request)
+
+        token = timing.start_request()
+        started_at = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timing.db_execute_wrapper):
+                response = self.get_response(request)
+        finally:
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            timings = timing.end_request(token)
+
+        self.finish(request, response, started_at, elapsed_ms, timings)
+        return response
+
+    async def __acall__(self, request):
+        if not request.path.startswith(self.path_prefix):
+            return await self.get_response(request)
+
+        token = timing.start_request()
+        started_at = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timing.db_execute_wrapper):
+                response = await self.get_response(request)
+        finally:
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            timings = timing.end_request(token)
+
+        self.finish(request, response, started_at, elapsed_ms, timings)
+        return response
+
+    def finish(self, request, response, started_at, elapsed_ms, timings):
+        if not getattr(response, 'streaming', False):
+            self.record(request, response, elapsed_ms, timings)
+        elif getattr(response, 'is_async', False):
+            response.streaming_content = self.atimed_stream(
+                request, response, response.streaming_content, started_at, timings
+            )
+        else:
+            response.streaming_content = self.timed_stream(
+                request, response, response.streaming_content, started_at, timings
+            )
+
+    def timed_stream(self, request, response, content, started_at, timings):
+        """
+        Generar ``content`` midiendo cada bloque y registrar la petición al final
+        """
+        iterator = iter(content)
+        try:
+            while True:
+                token = timing.start_request(timings)
+                try:
+                    with connection.execute_wrapper(timing.db_execute_wrapper):
+                        chunk = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    timing.end_request(token)
+                yield chunk
+        finally:
+            self.record(request, response, (time.perf_counter() - started_at) * 1000, timings)
+
+    async def atimed_stream(self, request, response, content, started_at, timings):
+        """
+        Versión de ``timed_stream`` para contenido asíncrono
+        """
+        iterator = aiter(content)
+        try:
+            while True:
+                token = timing.start_request(timings)
+                try:
+                    with connection.execute_wrapper(timing.db_execute_wrapper):
+                        chunk = await anext(iterator)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    timing.end_request(token)
+                yield chunk
+        finally:
+            self.record(request, response, (time.perf_counter() - started_at) * 1000, timings)
+
+    def record(self, request, response, elapsed_ms, timings):
+        endpoint = self.get_endpoint(request)
+        # Las rutas que no resuelven (404) se agrupan: cada URL distinta
+        # sería una serie nueva en Prometheus
+        resolved = getattr(request, 'resolver_match', None) is not None
+        metrics.observe_request(
+            endpoint if resolved else 'unmatched', request.method,
+            response.status_code, elapsed_ms / 1000
+        )
+        if response.status_code >= 400:
+            metrics.count_error(self.get_error_code(response))
+        
+        usage_recorder.record(
+            endpoint=endpoint,
+            method=request.method,
+            ip_address=get_client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            response_status=response.status_code,
+            response_time=elapsed_ms,
+            inference_time=timings.get('inference', 0.0),
+            db_time=timings.get('db', 0.0)
+        )
+
+    @staticmethod
+    def get_error_code(response):
+        """
+        Campo ``code`` de una respuesta de error (``HTTP_<estado>`` si no lo tiene)
+        """
+        data = getattr(response, 'data', None)
+        if data is None and not getattr(response, 'streaming', False) \
+                and response.get('Content-Type', '').startswith('application/json'):
+            try:
+                data = json.loads(response.content)
+            except ValueError:
+                data = None
+        
+        if isinstance(data, dict) and data.get('code'):
+            return str(data['code'])
+        return f'HTTP_{response.status_code}'
+    
+    @staticmethod
+    def get_endpoint(request):
+        """
+        Ruta de la URL resuelta (``/api/analysis/<uuid:analysis_id>/``) en lugar
+        de la ruta concreta, para poder agrupar por endpoint
+        """
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.route:
+            return '/' + match.route
+        return request.path
+
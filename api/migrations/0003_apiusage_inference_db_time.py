@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_apiusage_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiusage',
+            name='db_time',
+            field=models.FloatField(default=0.0, verbose_name='Tiempo en base de datos (ms)'),
+        ),
+        migrations.AddField(
+            model_name='apiusage',
+            name='inference_time',
+            field=models.FloatField(default=0.0, verbose_name='Tiempo de inferencia (ms)'),
+        ),
+    ]
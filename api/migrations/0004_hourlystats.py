@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:04
+
+from django.db import migrations, models
+
+
+def backfill_hourly_stats(apps, schema_editor):
+    from api.stats import rebuild_hourly_stats
+    rebuild_hourly_stats(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_apiusage_inference_db_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(unique=True, verbose_name='Hora (UTC)')),
+                ('analyses_fake', models.BigIntegerField(default=0, verbose_name='Análisis FALSA')),
+                ('analyses_real', models.BigIntegerField(default=0, verbose_name='Análisis VERDADERA')),
+                ('api_calls_success', models.BigIntegerField(default=0, verbose_name='Llamadas 200')),
+                ('api_calls_client_error', models.BigIntegerField(default=0, verbose_name='Llamadas 4xx')),
+                ('api_calls_server_error', models.BigIntegerField(default=0, verbose_name='Llamadas 5xx')),
+                ('api_calls_other', models.BigIntegerField(default=0, verbose_name='Otras llamadas')),
+            ],
+            options={
+                'verbose_name': 'Estadísticas por Hora',
+                'verbose_name_plural': 'Estadísticas por Hora',
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.RunPython(backfill_hourly_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:05
+
+from django.db import migrations, models
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    AddIndex que en PostgreSQL usa CREATE INDEX CONCURRENTLY para no bloquear
+    las escrituras mientras se indexan tablas grandes. En otros motores se
+    comporta como AddIndex.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('api', '0004_hourlystats'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='apiusage',
+            index=models.Index(fields=['-timestamp'], name='apiusage_timestamp_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='apiusage',
+            index=models.Index(fields=['response_status', 'timestamp'], name='apiusage_status_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='apiusage',
+            index=models.Index(fields=['endpoint', 'timestamp'], name='apiusage_endpoint_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='apiusage',
+            index=models.Index(condition=models.Q(('response_status__gte', 500)), fields=['timestamp'], name='apiusage_5xx_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='newsanalysis',
+            index=models.Index(fields=['-created_at'], name='newsanalysis_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='newsanalysis',
+            index=models.Index(fields=['prediction', 'created_at'], name='newsanalysis_pred_created_idx'),
+        ),
+    ]
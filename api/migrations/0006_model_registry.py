@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:34
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsanalysis',
+            name='model_version',
+            field=models.CharField(blank=True, default='', help_text='Modelo que hizo la predicción (ver MODEL_VARIANTS)', max_length=20, verbose_name='Versión del modelo'),
+        ),
+        migrations.CreateModel(
+            name='ModelDisagreement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(verbose_name='Texto de la noticia')),
+                ('served_version', models.CharField(max_length=20, verbose_name='Versión del modelo servido')),
+                ('served_prediction', models.CharField(choices=[('VERDADERA', 'Noticia Verdadera'), ('FALSA', 'Noticia Falsa')], max_length=10, verbose_name='Predicción servida')),
+                ('served_probability_fake', models.FloatField(verbose_name='Probabilidad de ser falsa (servido)')),
+                ('shadow_model', models.CharField(max_length=100, verbose_name='Modelo en sombra')),
+                ('shadow_version', models.CharField(max_length=20, verbose_name='Versión del modelo en sombra')),
+                ('shadow_prediction', models.CharField(choices=[('VERDADERA', 'Noticia Verdadera'), ('FALSA', 'Noticia Falsa')], max_length=10, verbose_name='Predicción en sombra')),
+                ('shadow_probability_fake', models.FloatField(verbose_name='Probabilidad de ser falsa (sombra)')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de creación')),
+            ],
+            options={
+                'verbose_name': 'Desacuerdo entre Modelos',
+                'verbose_name_plural': 'Desacuerdos entre Modelos',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['shadow_model', 'created_at'], name='disagreement_model_created_idx')],
+            },
+        ),
+    ]
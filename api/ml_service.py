@@ -6,15 +6,178 @@ Maneja la carga del modelo y las predicciones
 
 import os
 import json
-import joblib
+import time
+import queue
+import signal
 import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, Optional, Tuple
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 from django.conf import settings
-import numpy as np
+from django.utils.functional import SimpleLazyObject, empty
+
+from . import metrics, pipeline_profiler, timing
+from .inference_backends import create_backend, staged_predict_proba
+from .model_artifacts import compute_model_version, load_artifact
+from .model_metadata import build_model_records, render_model_info, sync_model_info_once
+from .model_registry import ModelRegistry, ShadowScorer, parse_names, parse_weights
+from .prediction_cache import PredictionCache
+from .text_normalizer import normalize_text
+from .utils import BackgroundThread, percentile
 
 logger = logging.getLogger(__name__)
 
+# Etiqueta de clase con la que se entrenó el modelo para las noticias falsas
+FAKE_CLASS_LABEL = 1
+
+# Textos para calentar un modelo recién cargado antes de activarlo
+WARMUP_TEXTS = [
+    'el gobierno anunció nuevas medidas económicas para combatir la inflación',
+    'el agua del grifo contiene microchips para controlar nuestras mentes',
+]
+
+
+class MicroBatcher:
+    """
+    Agrupa predicciones individuales concurrentes en un solo ``predict_proba``
+    
+    Un hilo en segundo plano toma la primera petición en cola y espera hasta
+    ``max_wait_ms`` (o hasta juntar ``max_batch_size`` textos) antes de
+    ejecutar el modelo sobre el lote completo; cada llamador recibe su fila.
+    Cada texto se puntúa con el modelo con el que se encoló: un lote que
+    mezcla modelos (durante una recarga) se ejecuta por grupos.
+    Solo aporta con workers que atienden varias peticiones a la vez (hilos
+    o ASGI); con workers síncronos de una petición solo añade espera.
+    """
+    
+    # Límites superiores de los intervalos del histograma de tamaños de lote
+    SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+    
+    def __init__(self, predict_fn: Callable, max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        
+        self._queue = queue.Queue()
+        self._worker = BackgroundThread(self._run, 'micro-batcher')
+        
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._size_histogram = {bucket: 0 for bucket in self.SIZE_BUCKETS}
+        self._size_histogram['+Inf'] = 0
+        self._queue_delays = deque(maxlen=1000)
+        self._max_queue_delay = 0.0
+    
+    def submit(self, processed_text: str, model: 'LoadedModel'):
+        """
+        Encolar un texto preprocesado y esperar su fila de probabilidades
+        con ``model``
+        """
+        future = Future()
+        self._worker.ensure_started()
+        self._queue.put((processed_text, model, time.perf_counter(), future))
+        return future.result()
+    
+    def get_stats(self) -> Dict:
+        """
+        Distribución de tamaños de lote y demora en cola (ms)
+        """
+        with self._stats_lock:
+            delays = sorted(self._queue_delays)
+            return {
+                'enabled': True,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'batches': self._batches,
+                'items': self._items,
+                'avg_batch_size': round(self._items / self._batches, 2) if self._batches else 0.0,
+                'batch_size_histogram': {str(k): v for k, v in self._size_histogram.items()},
+                'queue_delay_ms': {
+                    'p50': percentile(delays, 0.50),
+                    'p95': percentile(delays, 0.95),
+                    'p99': percentile(delays, 0.99),
+                    'max': round(self._max_queue_delay, 3),
+                },
+                'queued': self._queue.qsize(),
+            }
+    
+    def _collect_batch(self) -> List:
+        first = self._queue.get()
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Tiempo agotado: tomar solo lo que ya está en cola
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _record(self, batch: List, started_at: float):
+        size = len(batch)
+        delays = [(started_at - enqueued_at) * 1000 for _, _, enqueued_at, _ in batch]
+        bucket = next((b for b in self.SIZE_BUCKETS if size <= b), '+Inf')
+        
+        with self._stats_lock:
+            self._batches += 1
+            self._items += size
+            self._size_histogram[bucket] += 1
+            self._queue_delays.extend(delays)
+            self._max_queue_delay = max(self._max_queue_delay, *delays)
+    
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started_at = time.perf_counter()
+            self._record(batch, started_at)
+            
+            # LoadedModel no es hashable: se agrupa por versión
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[1].version, []).append(item)
+            
+            for items in groups.values():
+                try:
+                    probabilities = self.predict_fn([text for text, _, _, _ in items], items[0][1])
+                except Exception as e:
+                    for _, _, _, future in items:
+                        future.set_exception(e)
+                    continue
+                
+                for (_, _, _, future), row in zip(items, probabilities):
+                    future.set_result(row)
+
+
+class LoadedModel(NamedTuple):
+    """
+    Modelo activo con todo lo que se deriva de él
+
+    Se sustituye entero con una sola asignación, de modo que una petición
+    nunca mezcla el estimador de un modelo con la versión o las columnas de
+    otro.
+    """
+    estimator: object
+    version: str
+    fake_class_index: int
+    real_class_index: int
+    info: Dict
+    name: str
+    path: str
+    mtime: float
+    loaded_at: str
+
 
 class FakeNewsDetectorService:
     """
@@ -22,46 +185,72 @@ class FakeNewsDetectorService:
     """
     
     def __init__(self):
-        self.model = None
-        self.model_info = {}
+        self.active: Optional[LoadedModel] = None
         self.model_loaded = False
+        self.prediction_cache = PredictionCache.from_settings()
+        self.inference_backend = create_backend(settings.ML_CONFIG, lambda: self.model)
+        self.micro_batcher = None
+        if settings.ML_CONFIG.get('MICRO_BATCHING', False):
+            self.micro_batcher = MicroBatcher(
+                self.predict_proba,
+                max_batch_size=settings.ML_CONFIG.get('MICRO_BATCH_MAX_SIZE', 32),
+                max_wait_ms=settings.ML_CONFIG.get('MICRO_BATCH_MAX_WAIT_MS', 5.0)
+            )
+        self.profiler = pipeline_profiler.PipelineProfiler.from_settings()
+        self.registry = ModelRegistry(Path(settings.ML_CONFIG['MODEL_PATH']).stem)
+        self.shadow_scorer = ShadowScorer(
+            self._build_result,
+            max_queue=settings.ML_CONFIG.get('SHADOW_QUEUE_SIZE', 1000),
+            batch_size=settings.ML_CONFIG.get('SHADOW_BATCH_SIZE', 64),
+            sample_rate=settings.ML_CONFIG.get('SHADOW_SAMPLE_RATE', 1.0)
+        )
+        # (cuerpo JSON, ETag) de /api/model/info/, ver ``_publish_model_info``
+        self.model_info_response: Optional[Tuple[bytes, str]] = None
+        self.reload_status: Dict = {}
+        self._reload_lock = threading.Lock()
+        self._reload_thread = None
+        self._watcher = None
         self.load_model()
     
+    @property
+    def model(self):
+        return self.active.estimator if self.active is not None else None
+    
+    @property
+    def model_version(self) -> Optional[str]:
+        return self.active.version if self.active is not None else None
+    
+    @property
+    def model_info(self) -> Dict:
+        return self.active.info if self.active is not None else {}
+    
+    @property
+    def fake_class_index(self) -> int:
+        return self.active.fake_class_index if self.active is not None else 1
+    
+    @property
+    def real_class_index(self) -> int:
+        return self.active.real_class_index if self.active is not None else 0
+    
     def load_model(self) -> bool:
         """
         Cargar el modelo de machine learning
         """
         try:
             model_path = settings.ML_CONFIG['MODEL_PATH']
-            model_info_path = settings.ML_CONFIG['MODEL_INFO_PATH']
             
             # Verificar que existan los archivos
             if not os.path.exists(model_path):
                 logger.error(f"Archivo del modelo no encontrado: {model_path}")
                 return False
             
-            # Cargar el modelo
-            self.model = joblib.load(model_path)
-            logger.info(f"Modelo cargado exitosamente desde: {model_path}")
-            
-            # Cargar información del modelo si existe
-            if os.path.exists(model_info_path):
-                with open(model_info_path, 'r', encoding='utf-8') as f:
-                    self.model_info = json.load(f)
-                logger.info("Información del modelo cargada exitosamente")
-            else:
-                logger.warning(f"Archivo de información del modelo no encontrado: {model_info_path}")
-                self.model_info = {
-                    'nombre': 'Modelo de Detección de Noticias Falsas',
-                    'fecha_entrenamiento': 'Desconocida',
-                    'metricas_validacion': {
-                        'accuracy': 0.0,
-                        'f1': 0.0,
-                        'auc': 0.0
-                    }
-                }
-            
-            self.model_loaded = True
+            self._activate(self._build_model(
+                model_path,
+                settings.ML_CONFIG['MODEL_INFO_PATH'],
+                settings.ML_CONFIG.get('MODEL_ARTIFACT_PATH')
+            ))
+            self.registry = self._build_registry()
+            self._publish_model_info()
             return True
             
         except Exception as e:
@@ -69,28 +258,315 @@ class FakeNewsDetectorService:
             self.model_loaded = False
             return False
     
+    def reload_model(self) -> bool:
+        """
+        Cargar de nuevo el modelo sin dejar de atender peticiones
+        
+        El modelo nuevo se carga y se calienta aparte; solo si todo va bien
+        sustituye al activo. Si falla, se sigue sirviendo el anterior.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            logger.info("Ya hay una recarga del modelo en curso")
+            return False
+        
+        started_at = time.perf_counter()
+        previous_version = self.model_version
+        try:
+            model_path = settings.ML_CONFIG['MODEL_PATH']
+            artifact_path = settings.ML_CONFIG.get('MODEL_ARTIFACT_PATH')
+            loaded = self._build_model(model_path, settings.ML_CONFIG['MODEL_INFO_PATH'], artifact_path)
+            self._warm_up(loaded)
+            registry = self._build_registry()
+            # El pool nuevo ya está calentado cuando se sustituye; las
+            # peticiones que aún usan el modelo anterior se ejecutan con él
+            # en este proceso (el backend comprueba la versión)
+            self.inference_backend.reload(model_path, artifact_path)
+            self._activate(loaded)
+            self.registry = registry
+            self._publish_model_info()
+            
+            self.reload_status = {
+                'status': 'success',
+                'previous_version': previous_version,
+                'model_version': loaded.version,
+                'duration_ms': round((time.perf_counter() - started_at) * 1000, 1),
+                'timestamp': datetime.now().isoformat(),
+            }
+            logger.info(f"Modelo recargado: {previous_version} -> {loaded.version}")
+            return True
+        
+        except Exception as e:
+            self.reload_status = {
+                'status': 'failed',
+                'model_version': previous_version,
+                'error': str(e),
+                'timestamp': datetime.now().isoformat(),
+            }
+            logger.error(f"Error al recargar el modelo, se mantiene la versión {previous_version}: {str(e)}")
+            return False
+        
+        finally:
+            self._reload_lock.release()
+    
+    def request_reload(self) -> bool:
+        """
+        Recargar el modelo en un hilo en segundo plano
+        
+        Returns:
+            bool: False si ya había una recarga en curso
+        """
+        if self._reload_thread is not None and self._reload_thread.is_alive():
+            return False
+        
+        self._reload_thread = threading.Thread(target=self.reload_model, name='model-reload', daemon=True)
+        self._reload_thread.start()
+        return True
+    
+    def install_reload_signal(self):
+        """
+        Recargar el modelo al recibir ``ML_CONFIG['MODEL_RELOAD_SIGNAL']``
+        (debe llamarse desde el hilo principal del worker)
+        """
+        signal_name = settings.ML_CONFIG.get('MODEL_RELOAD_SIGNAL')
+        if signal_name:
+            signal.signal(getattr(signal, signal_name), lambda signum, frame: self.request_reload())
+    
+    def start_model_watcher(self):
+        """
+        Vigilar el archivo del modelo cada ``MODEL_RELOAD_INTERVAL`` segundos
+        y recargarlo cuando cambie (0 desactiva la vigilancia)
+        """
+        interval = settings.ML_CONFIG.get('MODEL_RELOAD_INTERVAL', 0)
+        if interval <= 0:
+            return
+        
+        if self._watcher is None:
+            self._watcher = BackgroundThread(self._watch_model, 'model-watcher', args=(interval,))
+        self._watcher.ensure_started()
+    
+    def _watch_model(self, interval: float):
+        model_path = settings.ML_CONFIG['MODEL_PATH']
+        pending = None
+        attempted = None
+        
+        while True:
+            time.sleep(interval)
+            try:
+                stat = os.stat(model_path)
+            except OSError:
+                continue
+            
+            current = (stat.st_mtime, stat.st_size)
+            if (self.active is not None and stat.st_mtime == self.active.mtime) or current == attempted:
+                pending = None
+                continue
+            
+            # Esperar a que el archivo deje de cambiar (copia en curso)
+            if current != pending:
+                pending = current
+                continue
+            
+            # Un archivo que no se pudo cargar no se reintenta hasta que cambie
+            pending = None
+            attempted = current
+            self.reload_model()
+    
+    def _build_model(self, model_path, model_info_path, artifact_path=None) -> LoadedModel:
+        """
+        Cargar el estimador y su información sin tocar el modelo activo
+        """
+        started_at = time.perf_counter()
+        mtime = os.stat(model_path).st_mtime
+        estimator, version = self._load_estimator(model_path, artifact_path)
+        fake_class_index, real_class_index = self._resolve_class_indexes(estimator)
+        logger.info(f"Modelo cargado exitosamente desde: {model_path}")
+        
+        # Cargar información del modelo si existe
+        if os.path.exists(model_info_path):
+            with open(model_info_path, 'r', encoding='utf-8') as f:
+                model_info = json.load(f)
+            logger.info("Información del modelo cargada exitosamente")
+        else:
+            logger.warning(f"Archivo de información del modelo no encontrado: {model_info_path}")
+            model_info = {
+                'nombre': 'Modelo de Detección de Noticias Falsas',
+                'fecha_entrenamiento': 'Desconocida',
+                'metricas_validacion': {
+                    'accuracy': 0.0,
+                    'f1': 0.0,
+                    'auc': 0.0
+                }
+            }
+        
+        metrics.MODEL_LOAD_SECONDS.labels(Path(model_path).stem, version).set(
+            time.perf_counter() - started_at
+        )
+        
+        return LoadedModel(
+            estimator=estimator,
+            version=version,
+            fake_class_index=fake_class_index,
+            real_class_index=real_class_index,
+            info=model_info,
+            name=Path(model_path).stem,
+            path=str(model_path),
+            mtime=mtime,
+            loaded_at=datetime.now().isoformat(),
+        )
+    
+    def _build_registry(self) -> ModelRegistry:
+        """
+        Cargar los modelos de ``MODEL_VARIANTS`` y ``SHADOW_MODELS``
+        
+        Cada modelo se busca en ``MODEL_DIR`` como ``<nombre>.pkl`` (con su
+        artefacto ``<nombre>.joblib`` e información ``info_<nombre>.json``
+        opcionales). Un modelo que no se puede cargar se descarta y su
+        tráfico pasa al principal.
+        """
+        primary_name = Path(settings.ML_CONFIG['MODEL_PATH']).stem
+        weights = parse_weights(settings.ML_CONFIG.get('MODEL_VARIANTS', ''))
+        shadow_names = parse_names(settings.ML_CONFIG.get('SHADOW_MODELS', ''))
+        model_dir = Path(settings.ML_CONFIG['MODEL_DIR'])
+        
+        loaded = {}
+        for name in [name for name, _ in weights] + shadow_names:
+            if name == primary_name or name in loaded:
+                continue
+            try:
+                variant = self._build_model(
+                    model_dir / f'{name}.pkl', model_dir / f'info_{name}.json', model_dir / f'{name}.joblib'
+                )
+                self._warm_up(variant)
+                loaded[name] = variant
+            except Exception as e:
+                logger.error(f"No se pudo cargar el modelo {name}, se descarta: {str(e)}")
+        
+        return ModelRegistry(
+            primary_name,
+            variants={name: loaded[name] for name, _ in weights if name in loaded},
+            weights=weights,
+            shadows={name: loaded[name] for name in shadow_names if name in loaded},
+        )
+    
+    def _route(self, processed_text: str, active: LoadedModel) -> LoadedModel:
+        """
+        Modelo que debe puntuar el texto según el reparto de ``MODEL_VARIANTS``
+        """
+        registry = self.registry
+        if not registry.has_variants:
+            return active
+        return registry.variants.get(registry.route(processed_text), active)
+    
+    def _publish_model_info(self):
+        """
+        Preparar la respuesta de ``/api/model/info/`` y sincronizar ``ModelInfo``
+        (una vez por carga, no en cada petición)
+        """
+        try:
+            records = build_model_records(self.active, self.registry)
+        except Exception as e:
+            logger.error(f"Error al preparar la información del modelo: {str(e)}")
+            return
+        
+        if settings.ML_CONFIG.get('MODEL_INFO_SYNC', True):
+            sync_model_info_once(records)
+        
+        try:
+            self.model_info_response = render_model_info(records)
+        except Exception as e:
+            logger.error(f"Error al preparar la información del modelo: {str(e)}")
+    
+    def _activate(self, loaded: LoadedModel):
+        # Una sola asignación: las peticiones en curso siguen con el anterior
+        previous, self.active = self.active, loaded
+        self.model_loaded = True
+        # Las claves llevan la versión; vaciar solo libera las del modelo anterior
+        if (self.prediction_cache is not None and previous is not None
+                and previous.version != loaded.version):
+            self.prediction_cache.clear()
+    
+    @staticmethod
+    def _warm_up(loaded: LoadedModel):
+        """
+        Predicciones de prueba con el modelo nuevo antes de activarlo
+        """
+        import numpy as np
+        
+        probabilities = np.asarray(loaded.estimator.predict_proba(WARMUP_TEXTS))
+        if probabilities.shape != (len(WARMUP_TEXTS), 2) or not np.all(np.isfinite(probabilities)):
+            raise ValueError(f"El modelo nuevo devuelve probabilidades no válidas: {probabilities.shape}")
+    
+    @staticmethod
+    def _load_estimator(model_path, artifact_path=None) -> Tuple[object, str]:
+        """
+        Cargar el estimador y su versión
+        
+        Si hay un artefacto exportado (``manage.py export_model_artifact``)
+        para este modelo, se carga con memoria mapeada; si no, se carga el
+        pickle original.
+        """
+        if settings.ML_CONFIG.get('MODEL_MMAP', True) and artifact_path:
+            try:
+                loaded = load_artifact(model_path, artifact_path)
+                if loaded is not None:
+                    logger.info(f"Modelo cargado con memoria mapeada desde: {artifact_path}")
+                    return loaded
+            except Exception as e:
+                logger.warning(f"No se pudo cargar el artefacto mapeado: {str(e)}")
+        
+        import joblib
+        
+        return joblib.load(model_path), compute_model_version(model_path)
+    
+    @staticmethod
+    def _resolve_class_indexes(estimator) -> Tuple[int, int]:
+        """
+        Ubicar las columnas de ``predict_proba`` según ``classes_`` del modelo
+        
+        Returns:
+            Tuple[int, int]: (columna de FALSA, columna de VERDADERA)
+        """
+        classes = list(getattr(estimator, 'classes_', [0, FAKE_CLASS_LABEL]))
+        if len(classes) != 2 or FAKE_CLASS_LABEL not in classes:
+            raise ValueError(f"Clases del modelo no soportadas: {classes}")
+        
+        fake_class_index = classes.index(FAKE_CLASS_LABEL)
+        return fake_class_index, 1 - fake_class_index
+    
     def is_ready(self) -> bool:
         """
         Verificar si el servicio está listo para hacer predicciones
         """
         return self.model_loaded and self.model is not None
     
-    def preprocess_text(self, text: str) -> str:
+    def predict_proba(self, processed_texts: List[str], active: Optional[LoadedModel] = None):
         """
-        Preprocesar el texto antes de la predicción
+        Ejecutar el modelo sobre textos ya preprocesados en el backend de
+        inferencia configurado (``ML_CONFIG['INFERENCE_BACKEND']``)
+        
+        Los modelos del registro distintos del principal se ejecutan en este
+        proceso: el backend solo tiene cargado el principal (y, si durante una
+        recarga tiene otra versión, el backend también lo ejecuta aquí). Las
+        predicciones que muestrea el perfilador también, para medir cada paso
+        del pipeline.
         """
-        # Limpieza básica del texto
-        text = text.strip()
+        active = active if active is not None else self.active
         
-        # Convertir a minúsculas
-        text = text.lower()
+        sample = pipeline_profiler.current_sample()
+        if sample is not None:
+            return staged_predict_proba(active.estimator, processed_texts, on_step=sample.add_step)
         
-        # Remover caracteres extra
-        import re
-        text = re.sub(r'\s+', ' ', text)  # Espacios múltiples
-        text = re.sub(r'[^\w\sáéíóúüñ]', ' ', text)  # Caracteres especiales
+        if active.name != self.registry.primary_name:
+            return staged_predict_proba(active.estimator, processed_texts)
         
-        return text
+        return self.inference_backend.predict_proba(processed_texts, active.estimator, active.version)
+    
+    def preprocess_text(self, text: str) -> str:
+        """
+        Preprocesar el texto antes de la predicción (ver ``api.text_normalizer``)
+        """
+        with metrics.observe_stage('preprocess'), pipeline_profiler.track('preprocess'):
+            return normalize_text(text)
     
     def predict(self, text: str) -> Dict:
         """
@@ -105,6 +581,13 @@ class FakeNewsDetectorService:
         if not self.is_ready():
             raise Exception("El modelo no está disponible")
         
+        with self._profile(1):
+            return self._predict(text)
+    
+    def _predict(self, text: str) -> Dict:
+        # El mismo modelo durante toda la petición aunque haya una recarga
+        active = self.active
+        
         try:
             # Preprocesar el texto
             processed_text = self.preprocess_text(text)
@@ -112,35 +595,183 @@ class FakeNewsDetectorService:
             if len(processed_text) < 5:
                 raise Exception("El texto procesado es demasiado corto")
             
-            # Hacer predicción
-            prediction = self.model.predict([processed_text])[0]
-            probabilities = self.model.predict_proba([processed_text])[0]
-            
-            # Extraer probabilidades
-            prob_real = float(probabilities[0])
-            prob_fake = float(probabilities[1])
-            confidence = float(max(probabilities))
-            
-            # Determinar la etiqueta
-            prediction_label = "FALSA" if prediction == 1 else "VERDADERA"
-            
-            result = {
-                'prediction': prediction_label,
-                'confidence': confidence,
-                'probability_real': prob_real,
-                'probability_fake': prob_fake,
-                'text_length': len(text),
-                'processed_text_length': len(processed_text),
-                'timestamp': datetime.now().isoformat()
-            }
+            served = self._route(processed_text, active)
+            
+            # Consultar la caché antes de ejecutar el modelo
+            cache_key = None
+            probabilities = None
+            if self.prediction_cache is not None:
+                cache_key = PredictionCache.make_key(processed_text, served.version)
+                probabilities = self.prediction_cache.get(cache_key)
+            
+            if probabilities is None:
+                # Hacer predicción (una sola pasada por el vectorizador)
+                with timing.track('inference'):
+                    if (self.micro_batcher is not None
+                            and pipeline_profiler.current_sample() is None):
+                        row = self.micro_batcher.submit(processed_text, served)
+                    else:
+                        row = self.predict_proba([processed_text], served)[0]
+                    probabilities = tuple(float(p) for p in row)
+                if cache_key is not None:
+                    self.prediction_cache.set(cache_key, probabilities)
             
-            logger.info(f"Predicción realizada: {prediction_label} (confianza: {confidence:.3f})")
+            result = self._build_result(text, processed_text, probabilities, active=served)
+            metrics.count_prediction(result)
+            self.shadow_scorer.submit(self.registry.shadows, text, processed_text, result)
+            
+            logger.info(f"Predicción realizada: {result['prediction']} (confianza: {result['confidence']:.3f})")
             return result
             
         except Exception as e:
             logger.error(f"Error en la predicción: {str(e)}")
             raise Exception(f"Error al procesar el texto: {str(e)}")
     
+    def predict_batch(self, texts: List[str], use_cache: bool = True) -> List[Dict]:
+        """
+        Hacer predicciones sobre varios textos con una sola llamada al modelo
+        
+        Todos los textos válidos se vectorizan y clasifican juntos en una
+        única llamada a ``predict_proba`` sobre la matriz completa.
+        
+        Args:
+            texts (List[str]): Textos de las noticias a analizar
+            use_cache (bool): Consultar y guardar en la caché de predicciones
+                (se desactiva para textos de un solo uso, como archivos masivos)
+            
+        Returns:
+            List[Dict]: Un resultado por texto, en el mismo orden de entrada.
+                Los textos que no se pueden procesar devuelven un diccionario
+                con la clave ``error`` en lugar de la predicción.
+        """
+        if not self.is_ready():
+            raise Exception("El modelo no está disponible")
+        
+        with self._profile(len(texts)):
+            return self._predict_batch(texts, use_cache)
+    
+    def _predict_batch(self, texts: List[str], use_cache: bool) -> List[Dict]:
+        active = self.active
+        results: List[Dict] = [None] * len(texts)
+        pending_indexes = []
+        pending_texts = []
+        
+        for index, text in enumerate(texts):
+            is_valid, error_message = self.validate_text(text)
+            if not is_valid:
+                results[index] = {'error': error_message, 'code': 'INVALID_TEXT'}
+                metrics.count_error('INVALID_TEXT')
+                continue
+            
+            processed_text = self.preprocess_text(text)
+            if len(processed_text) < 5:
+                results[index] = {
+                    'error': 'El texto procesado es demasiado corto',
+                    'code': 'INVALID_TEXT'
+                }
+                metrics.count_error('INVALID_TEXT')
+                continue
+            
+            pending_indexes.append(index)
+            pending_texts.append(processed_text)
+        
+        if not pending_texts:
+            return results
+        
+        # Modelo de cada texto según el reparto de tráfico
+        served = [self._route(processed_text, active) for processed_text in pending_texts]
+        
+        # Resolver desde la caché los textos ya conocidos
+        cached = {}
+        cache_keys = []
+        if use_cache and self.prediction_cache is not None:
+            cache_keys = [
+                PredictionCache.make_key(t, model.version) for t, model in zip(pending_texts, served)
+            ]
+            cached = self.prediction_cache.get_many(cache_keys)
+        
+        uncached_positions = [
+            position for position in range(len(pending_texts))
+            if not cache_keys or cache_keys[position] not in cached
+        ]
+        
+        rows = [None] * len(pending_texts)
+        for position, key in enumerate(cache_keys):
+            rows[position] = cached.get(key)
+        
+        # Una sola pasada del pipeline por modelo sobre sus textos del lote
+        positions_by_model = {}
+        for position in uncached_positions:
+            positions_by_model.setdefault(served[position].version, []).append(position)
+        
+        new_entries = {}
+        for positions in positions_by_model.values():
+            model = served[positions[0]]
+            try:
+                with timing.track('inference'):
+                    probabilities = self.predict_proba(
+                        [pending_texts[position] for position in positions], model
+                    )
+            except Exception as e:
+                logger.error(f"Error en la predicción por lotes: {str(e)}")
+                raise Exception(f"Error al procesar el lote: {str(e)}")
+            
+            for position, row in zip(positions, probabilities):
+                rows[position] = tuple(float(p) for p in row)
+                if cache_keys:
+                    new_entries[cache_keys[position]] = rows[position]
+            
+        if new_entries:
+            self.prediction_cache.set_many(new_entries)
+        
+        timestamp = datetime.now().isoformat()
+        shadows = self.registry.shadows
+        for index, processed_text, row, model in zip(pending_indexes, pending_texts, rows, served):
+            results[index] = self._build_result(texts[index], processed_text, row, timestamp, model)
+            metrics.count_prediction(results[index])
+            self.shadow_scorer.submit(shadows, texts[index], processed_text, results[index])
+        
+        logger.info(f"Predicción por lotes realizada: {len(pending_texts)}/{len(texts)} textos")
+        return results
+    
+    def _profile(self, n_texts: int):
+        """
+        Muestrear la predicción con el perfilador del pipeline, si está activo
+        """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.sample(n_texts)
+    
+    def _build_result(self, text: str, processed_text: str, probabilities,
+                      timestamp: Optional[str] = None,
+                      active: Optional[LoadedModel] = None) -> Dict:
+        """
+        Construir el resultado a partir de una fila de ``predict_proba``
+        
+        La etiqueta se deriva de las probabilidades (igual que ``predict``
+        del clasificador) sin volver a ejecutar el pipeline.
+        """
+        active = active or self.active
+        prob_real = float(probabilities[active.real_class_index])
+        prob_fake = float(probabilities[active.fake_class_index])
+        
+        # En empate gana la primera clase de classes_, igual que argmax
+        if active.fake_class_index < active.real_class_index:
+            is_fake = prob_fake >= prob_real
+        else:
+            is_fake = prob_fake > prob_real
+        
+        return {
+            'prediction': "FALSA" if is_fake else "VERDADERA",
+            'confidence': max(prob_real, prob_fake),
+            'probability_real': prob_real,
+            'probability_fake': prob_fake,
+            'text_length': len(text),
+            'processed_text_length': len(processed_text),
+            'model_version': active.version,
+            'timestamp': timestamp or datetime.now().isoformat()
+        }
+    
     def get_model_info(self) -> Dict:
         """
         Obtener información del modelo
@@ -198,9 +829,47 @@ class FakeNewsDetectorService:
             'model_loaded': self.model_loaded,
             'model_path_exists': os.path.exists(settings.ML_CONFIG['MODEL_PATH']),
             'model_info_available': bool(self.model_info),
+            'model_version': self.model_version,
+            'model_loaded_at': self.active.loaded_at if self.active is not None else None,
+            'model_reload': self.reload_status or {'status': 'never'},
+            'prediction_cache': (
+                self.prediction_cache.get_stats()
+                if self.prediction_cache is not None
+                else {'enabled': False}
+            ),
+            'micro_batching': (
+                self.micro_batcher.get_stats()
+                if self.micro_batcher is not None
+                else {'enabled': False}
+            ),
+            'inference_backend': self.inference_backend.get_stats(),
+            'model_registry': {
+                **self.registry.describe(),
+                'shadow': self.shadow_scorer.get_stats(),
+            },
             'timestamp': datetime.now().isoformat()
         }
 
 
-# Instancia global del servicio
-ml_service = FakeNewsDetectorService()
\ No newline at end of file
+# Instancia global del servicio. Se construye (y carga el modelo) en el
+# primer uso y no al importar el módulo, para que los comandos de manage.py
+# y los tests que no predicen no paguen la carga. Los procesos que sirven
+# peticiones la cargan al arrancar con ``load_ml_service``.
+ml_service = SimpleLazyObject(FakeNewsDetectorService)
+
+
+def load_ml_service() -> bool:
+    """
+    Construir el servicio y cargar el modelo ahora
+
+    Returns:
+        bool: Si el modelo quedó listo para predecir
+    """
+    return ml_service.is_ready()
+
+
+def is_ml_service_loaded() -> bool:
+    """
+    Si el servicio ya se construyó en este proceso (sin forzar su carga)
+    """
+    return ml_service._wrapped is not empty
\ No newline at end of file
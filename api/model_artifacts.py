@@ -0,0 +1,113 @@
+"""
+Artefactos del Modelo con Memoria Mapeada
+=========================================
+Exporta el pipeline entrenado a un archivo joblib sin comprimir cuyos
+arreglos de numpy (idf, log-probabilidades, coeficientes, ...) se cargan
+con ``mmap_mode='r'``. Así el sistema operativo comparte esas páginas
+entre todos los procesos de la máquina y la carga es casi instantánea.
+
+El vocabulario del vectorizador es un diccionario de Python y no se puede
+mapear; sigue cargándose en memoria de cada proceso.
+
+Cada artefacto guarda la versión (hash del contenido) del ``.pkl`` del que
+se exportó y solo se usa si coincide con la del ``.pkl`` actual: una copia
+que no conserva la fecha de modificación (``cp``, ``docker COPY``, un
+checkout de git) no lo invalida.
+
+joblib (y con él numpy) se importa solo al cargar o exportar un modelo, para
+no alargar el arranque de los procesos que no lo usan.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def compute_model_version(model_path) -> str:
+    """
+    Versión del modelo derivada del contenido del archivo
+    """
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def metadata_path(artifact_path) -> str:
+    return f"{artifact_path}.json"
+
+
+def unwrap_estimator(model):
+    """
+    Quitar envoltorios de búsqueda (GridSearchCV) y atributos que solo
+    sirven para inspección, como ``stop_words_`` del vectorizador
+    """
+    estimator = getattr(model, 'best_estimator_', model)
+
+    steps = getattr(estimator, 'steps', [(None, estimator)])
+    for _, step in steps:
+        if hasattr(step, 'stop_words_'):
+            delattr(step, 'stop_words_')
+
+    return estimator
+
+
+def export_artifact(source_path, artifact_path) -> Dict:
+    """
+    Exportar el modelo ``source_path`` a un artefacto mapeable en memoria
+
+    Returns:
+        Dict: Metadatos escritos junto al artefacto
+    """
+    import joblib
+
+    model = joblib.load(source_path)
+    estimator = unwrap_estimator(model)
+
+    # Sin compresión: joblib solo puede mapear arreglos guardados en crudo
+    tmp_path = f"{artifact_path}.tmp"
+    joblib.dump(estimator, tmp_path, compress=0)
+    os.replace(tmp_path, artifact_path)
+
+    metadata = {
+        'source': os.path.basename(str(source_path)),
+        'model_version': compute_model_version(source_path),
+        'exported_at': datetime.now().isoformat(),
+    }
+    with open(metadata_path(artifact_path), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+
+    return metadata
+
+
+def load_artifact(source_path, artifact_path) -> Optional[Tuple[object, str]]:
+    """
+    Cargar el artefacto mapeado si existe y corresponde a ``source_path``
+
+    Returns:
+        Optional[Tuple]: (estimador, versión del modelo) o None si no hay un
+            artefacto válido para el modelo actual
+    """
+    meta_path = metadata_path(artifact_path)
+    if not os.path.exists(artifact_path) or not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+
+    # Leer el .pkl para el hash es mucho más barato que deserializarlo
+    version = compute_model_version(source_path)
+    if metadata.get('model_version') != version:
+        logger.warning(f"Artefacto del modelo desactualizado, se ignora: {artifact_path}")
+        return None
+
+    import joblib
+
+    estimator = joblib.load(artifact_path, mmap_mode='r')
+    return estimator, version
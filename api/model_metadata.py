@@ -0,0 +1,168 @@
+"""
+Metadatos de los Modelos Cargados
+=================================
+Información de ``/api/model/info/`` y su copia en la tabla ``ModelInfo``.
+
+Ambas se calculan una sola vez, al cargar o recargar un modelo:
+
+- ``sync_model_info`` actualiza ``ModelInfo`` con el modelo principal y los
+  del registro (``MODEL_VARIANTS``/``SHADOW_MODELS``), y marca como
+  inactivos los que ya no se sirven. Solo escribe si algo cambió.
+- ``render_model_info`` prepara después el cuerpo JSON de la respuesta (y su
+  ETag), con el ``created_at`` de cada fila de ``ModelInfo``, y el endpoint
+  lo sirve desde memoria sin tocar la base de datos.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, time as dt_time
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+logger = logging.getLogger(__name__)
+
+# Campos de ModelInfo que se sincronizan con el modelo cargado
+SYNC_FIELDS = ['accuracy', 'f1_score', 'training_date', 'is_active']
+
+
+def _training_date(info: Dict, loaded) -> datetime:
+    """
+    Fecha de entrenamiento de la información del modelo; si no se puede
+    leer, la fecha de modificación del archivo
+    """
+    value = info.get('fecha_entrenamiento')
+    parsed = None
+    if isinstance(value, str):
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None and parse_date(value) is not None:
+                parsed = datetime.combine(parse_date(value), dt_time())
+        except ValueError:
+            parsed = None
+
+    if parsed is None:
+        parsed = datetime.fromtimestamp(loaded.mtime)
+
+    if settings.USE_TZ and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def build_model_records(active, registry) -> List[Tuple[str, object, Dict]]:
+    """
+    Registros de ModelInfo (sin guardar) de los modelos cargados
+
+    Returns:
+        List[Tuple]: (nombre en el registro, ModelInfo, datos del reparto),
+            empezando por el modelo principal
+    """
+    from .models import ModelInfo
+
+    models = [(registry.primary_name, active)]
+    models += [(name, loaded) for name, loaded in registry.variants.items()]
+    models += [(name, loaded) for name, loaded in registry.shadows.items()
+               if name not in registry.variants]
+
+    records = []
+    for name, loaded in models:
+        metrics = loaded.info.get('metricas_validacion', {})
+        share = registry.weights.get(name, 0.0)
+        records.append((name, ModelInfo(
+            model_name=loaded.info.get('nombre', name),
+            version=loaded.version,
+            accuracy=metrics.get('accuracy', 0.0),
+            f1_score=metrics.get('f1', metrics.get('f1_score', 0.0)),
+            training_date=_training_date(loaded.info, loaded),
+            # Activo = recibe tráfico; los modelos solo en sombra no responden
+            is_active=share > 0,
+        ), {
+            'traffic_share': share,
+            'shadow': name in registry.shadows,
+            'loaded_at': loaded.loaded_at,
+            'parameters': loaded.info.get('parametros', {}),
+        }))
+    return records
+
+
+def render_model_info(records) -> Tuple[bytes, str]:
+    """
+    Cuerpo JSON de ``/api/model/info/`` y su ETag
+    """
+    def describe(name, record, extra):
+        return {
+            'name': name,
+            'model_name': record.model_name,
+            'version': record.version,
+            'accuracy': record.accuracy,
+            'f1_score': record.f1_score,
+            'training_date': record.training_date.isoformat(),
+            'is_active': record.is_active,
+            # Fecha de la fila de ModelInfo (None si no se sincronizó)
+            'created_at': record.created_at.isoformat() if record.created_at else None,
+            **extra,
+        }
+
+    models = [describe(*item) for item in records]
+    body = json.dumps({**models[0], 'models': models}, ensure_ascii=False).encode('utf-8')
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    return body, etag
+
+
+def sync_model_info(records):
+    """
+    Guardar en ``ModelInfo`` los modelos cargados y desactivar el resto
+
+    Los registros reciben la clave y el ``created_at`` de su fila.
+    """
+    from .models import ModelInfo
+
+    with transaction.atomic():
+        current_ids = []
+        for _, record, _ in records:
+            existing = ModelInfo.objects.filter(
+                model_name=record.model_name, version=record.version
+            ).order_by('-created_at').first()
+
+            if existing is None:
+                record.save()
+                current_ids.append(record.pk)
+                continue
+
+            changed = {
+                field: getattr(record, field) for field in SYNC_FIELDS
+                if getattr(existing, field) != getattr(record, field)
+            }
+            if changed:
+                ModelInfo.objects.filter(pk=existing.pk).update(**changed)
+            record.pk, record.created_at = existing.pk, existing.created_at
+            current_ids.append(existing.pk)
+
+        ModelInfo.objects.filter(is_active=True).exclude(pk__in=current_ids).update(is_active=False)
+
+
+def sync_model_info_once(records, timeout: float = 10.0):
+    """
+    ``sync_model_info`` en un hilo propio, esperando a que termine
+
+    Así la conexión a la BD es del hilo y se cierra al acabar: la carga
+    puede ocurrir en el proceso maestro de gunicorn antes del fork y los
+    workers no deben heredar conexiones abiertas. Los errores solo se
+    registran; no impiden servir el modelo.
+    """
+    def run():
+        try:
+            sync_model_info(records)
+        except Exception as e:
+            logger.warning(f"No se pudo actualizar ModelInfo: {str(e)}")
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=run, name='model-info-sync', daemon=True)
+    thread.start()
+    thread.join(timeout)
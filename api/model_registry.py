@@ -0,0 +1,237 @@
+"""
+Registro de Modelos: Reparto de Tráfico y Modo Sombra
+=====================================================
+Permite servir varios modelos de ``ml_models/`` a la vez:
+
+- Reparto de tráfico (A/B): ``MODEL_VARIANTS="candidato:10"`` envía el 10%
+  de los textos distintos a ``ml_models/candidato.pkl`` y el resto al modelo
+  principal. La asignación depende del texto preprocesado, así que un mismo
+  texto siempre va al mismo modelo (y su predicción en caché sigue
+  sirviendo). Los pesos son por texto distinto, no por petición: si unos
+  pocos textos se repiten mucho, la parte real de las peticiones que recibe
+  cada modelo puede alejarse de los pesos.
+- Modo sombra: ``SHADOW_MODELS="candidato"`` puntúa una muestra de los
+  textos (``SHADOW_SAMPLE_RATE``) también con el candidato en un hilo en
+  segundo plano, fuera del camino de la petición, y guarda en
+  ``ModelDisagreement`` los casos en que no coincide con el modelo que
+  respondió. Ese hilo está en el proceso web y compite por el GIL con las
+  peticiones: la muestra limita cuánta CPU del worker se lleva.
+"""
+
+import logging
+import queue
+import random
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from django.db import close_old_connections
+
+from .utils import BackgroundThread
+
+logger = logging.getLogger(__name__)
+
+# Resolución del reparto: centésimas de punto porcentual
+ROUTING_BUCKETS = 10000
+
+
+def parse_weights(value: str) -> List[Tuple[str, float]]:
+    """
+    ``"modelo_a:90,modelo_b:10"`` -> ``[('modelo_a', 90.0), ('modelo_b', 10.0)]``
+    """
+    weights = []
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, weight = item.partition(':')
+        weights.append((name.strip(), float(weight) if weight else 0.0))
+    return weights
+
+
+def parse_names(value: str) -> List[str]:
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class ModelRegistry:
+    """
+    Modelos cargados además del principal y tabla de reparto de tráfico
+
+    Es inmutable: una recarga construye un registro nuevo y lo sustituye.
+    """
+
+    def __init__(self, primary_name: str, variants: Optional[Dict] = None,
+                 weights: Optional[List[Tuple[str, float]]] = None,
+                 shadows: Optional[Dict] = None):
+        self.primary_name = primary_name
+        self.variants = variants or {}
+        self.shadows = shadows or {}
+
+        # Los modelos que no se pudieron cargar ceden su tráfico al principal
+        weights = [(name, weight) for name, weight in (weights or [])
+                   if weight > 0 and (name == primary_name or name in self.variants)]
+        if not any(name == primary_name for name, _ in weights):
+            assigned = sum(weight for _, weight in weights)
+            weights.append((primary_name, max(0.0, 100.0 - assigned)))
+
+        total = sum(weight for _, weight in weights) or 1.0
+        self.weights = {name: round(weight * 100 / total, 2) for name, weight in weights}
+
+        # Límite superior (exclusivo) de cada modelo en [0, ROUTING_BUCKETS)
+        self._routes = []
+        upper = 0.0
+        for name, weight in weights:
+            upper += weight * ROUTING_BUCKETS / total
+            self._routes.append((upper, name))
+
+    @property
+    def has_variants(self) -> bool:
+        return any(name != self.primary_name for name in self.weights if self.weights[name] > 0)
+
+    def route(self, processed_text: str) -> str:
+        """
+        Nombre del modelo que debe puntuar ``processed_text``
+
+        Determinista (crc32 del texto): los pesos se cumplen sobre los
+        textos distintos, no sobre las peticiones.
+        """
+        bucket = zlib.crc32(processed_text.encode('utf-8')) % ROUTING_BUCKETS
+        for upper, name in self._routes:
+            if bucket < upper:
+                return name
+        return self.primary_name
+
+    def describe(self) -> Dict:
+        return {
+            'primary': self.primary_name,
+            'traffic': self.weights,
+            'versions': {name: loaded.version for name, loaded in self.variants.items()},
+            'shadow_versions': {name: loaded.version for name, loaded in self.shadows.items()},
+        }
+
+
+class ShadowScorer:
+    """
+    Cola acotada de textos a puntuar con los modelos en sombra
+
+    Solo se encola una fracción ``sample_rate`` de los textos. Un hilo en
+    segundo plano toma lotes de la cola, los puntúa con cada modelo en
+    sombra y guarda los desacuerdos con ``bulk_create``. Si la cola se
+    llena, los textos nuevos se descartan: el modo sombra nunca frena las
+    peticiones.
+    """
+
+    def __init__(self, build_result, max_queue: int = 1000, batch_size: int = 64,
+                 sample_rate: float = 1.0):
+        self.build_result = build_result
+        self.batch_size = batch_size
+        self.sample_rate = sample_rate
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = BackgroundThread(self._run, 'shadow-scorer')
+
+        self._stats_lock = threading.Lock()
+        self._dropped = 0
+        self._scored = defaultdict(int)
+        self._disagreements = defaultdict(int)
+        self._errors = defaultdict(int)
+
+    def submit(self, shadows: Dict, text: str, processed_text: str, served_result: Dict):
+        """
+        Encolar un texto ya respondido (no bloquea)
+        """
+        # Un modelo no se compara consigo mismo (si también recibe tráfico)
+        shadows = {
+            name: loaded for name, loaded in shadows.items()
+            if loaded.version != served_result.get('model_version')
+        }
+        if not shadows or random.random() >= self.sample_rate:
+            return
+
+        self._worker.ensure_started()
+        try:
+            self._queue.put_nowait((shadows, text, processed_text, served_result))
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                'sample_rate': self.sample_rate,
+                'queued': self._queue.qsize(),
+                'dropped': self._dropped,
+                'models': {
+                    name: {
+                        'scored': scored,
+                        'disagreements': self._disagreements[name],
+                        'disagreement_rate': round(self._disagreements[name] / scored, 4) if scored else 0.0,
+                        'errors': self._errors[name],
+                    }
+                    for name, scored in self._scored.items()
+                },
+            }
+
+    def _collect_batch(self) -> List:
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+
+            close_old_connections()
+            try:
+                self._score(batch)
+            except Exception as e:
+                logger.error(f"Error en el modo sombra: {str(e)}")
+            finally:
+                close_old_connections()
+
+    def _score(self, batch: List):
+        from .models import ModelDisagreement
+
+        # Agrupar por modelo en sombra para una sola predicción por modelo
+        by_shadow = {}
+        for shadows, text, processed_text, served_result in batch:
+            for name, loaded in shadows.items():
+                entry = by_shadow.setdefault((name, loaded.version), (loaded, []))
+                entry[1].append((text, processed_text, served_result))
+
+        disagreements = []
+        for (name, _), (loaded, items) in by_shadow.items():
+            try:
+                probabilities = loaded.estimator.predict_proba([item[1] for item in items])
+            except Exception as e:
+                logger.error(f"Error al puntuar con el modelo en sombra {name}: {str(e)}")
+                with self._stats_lock:
+                    self._errors[name] += len(items)
+                continue
+
+            found = 0
+            for (text, processed_text, served_result), row in zip(items, probabilities):
+                shadow_result = self.build_result(text, processed_text, row, active=loaded)
+                if shadow_result['prediction'] == served_result['prediction']:
+                    continue
+
+                found += 1
+                disagreements.append(ModelDisagreement(
+                    text=text[:1000],
+                    served_version=served_result.get('model_version', ''),
+                    served_prediction=served_result['prediction'],
+                    served_probability_fake=served_result['probability_fake'],
+                    shadow_model=name,
+                    shadow_version=loaded.version,
+                    shadow_prediction=shadow_result['prediction'],
+                    shadow_probability_fake=shadow_result['probability_fake'],
+                ))
+
+            with self._stats_lock:
+                self._scored[name] += len(items)
+                self._disagreements[name] += found
+
+        if disagreements:
+            ModelDisagreement.objects.bulk_create(disagreements, batch_size=500)
@@ -5,6 +5,7 @@ Modelos de datos para la API de Detección de Noticias Falsas
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 import uuid
 
 
@@ -48,6 +49,14 @@ class NewsAnalysis(models.Model):
         help_text="Probabilidad de que la noticia sea verdadera"
     )
     
+    model_version = models.CharField(
+        max_length=20,
+        blank=True,
+        default='',
+        verbose_name="Versión del modelo",
+        help_text="Modelo que hizo la predicción (ver MODEL_VARIANTS)"
+    )
+    
     # Metadatos
     ip_address = models.GenericIPAddressField(
         null=True, 
@@ -76,6 +85,12 @@ class NewsAnalysis(models.Model):
         verbose_name = "Análisis de Noticia"
         verbose_name_plural = "Análisis de Noticias"
         ordering = ['-created_at']
+        indexes = [
+            # Orden por defecto y rangos de fecha (hoy, última semana)
+            models.Index(fields=['-created_at'], name='newsanalysis_created_idx'),
+            # Conteos por predicción dentro de un rango de fechas
+            models.Index(fields=['prediction', 'created_at'], name='newsanalysis_pred_created_idx'),
+        ]
         
     def __str__(self):
         text_preview = self.text[:50] + "..." if len(self.text) > 50 else self.text
@@ -124,8 +139,20 @@ class APIUsage(models.Model):
         verbose_name="Tiempo de respuesta (ms)"
     )
     
+    inference_time = models.FloatField(
+        default=0.0,
+        verbose_name="Tiempo de inferencia (ms)"
+    )
+    
+    db_time = models.FloatField(
+        default=0.0,
+        verbose_name="Tiempo en base de datos (ms)"
+    )
+    
+    # Se asigna al recibir la petición; los registros se guardan por lotes
+    # más tarde, así que no puede usarse auto_now_add
     timestamp = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
         verbose_name="Timestamp"
     )
     
@@ -133,6 +160,20 @@ class APIUsage(models.Model):
         verbose_name = "Uso de API"
         verbose_name_plural = "Uso de API"
         ordering = ['-timestamp']
+        indexes = [
+            # Orden por defecto y rangos de tiempo
+            models.Index(fields=['-timestamp'], name='apiusage_timestamp_idx'),
+            # Conteos por rango de estado (2xx/4xx/5xx) en el tiempo
+            models.Index(fields=['response_status', 'timestamp'], name='apiusage_status_ts_idx'),
+            # Latencias por endpoint (p50/p95/p99)
+            models.Index(fields=['endpoint', 'timestamp'], name='apiusage_endpoint_ts_idx'),
+            # Índice parcial: los errores de servidor son pocos y se consultan a menudo
+            models.Index(
+                fields=['timestamp'],
+                name='apiusage_5xx_ts_idx',
+                condition=models.Q(response_status__gte=500)
+            ),
+        ]
         
     def __str__(self):
         return f"{self.method} {self.endpoint} - {self.response_status}"
@@ -181,3 +222,120 @@ class ModelInfo(models.Model):
         
     def __str__(self):
         return f"{self.model_name} v{self.version}"
+
+
+
+class HourlyStats(models.Model):
+    """
+    Contadores agregados por hora para /api/stats/
+
+    Se mantienen de forma incremental (ver ``api.stats``) para que las
+    estadísticas no tengan que recorrer NewsAnalysis y APIUsage completas.
+    """
+    hour = models.DateTimeField(
+        unique=True,
+        verbose_name="Hora (UTC)"
+    )
+    
+    analyses_fake = models.BigIntegerField(
+        default=0,
+        verbose_name="Análisis FALSA"
+    )
+    
+    analyses_real = models.BigIntegerField(
+        default=0,
+        verbose_name="Análisis VERDADERA"
+    )
+    
+    api_calls_success = models.BigIntegerField(
+        default=0,
+        verbose_name="Llamadas 200"
+    )
+    
+    api_calls_client_error = models.BigIntegerField(
+        default=0,
+        verbose_name="Llamadas 4xx"
+    )
+    
+    api_calls_server_error = models.BigIntegerField(
+        default=0,
+        verbose_name="Llamadas 5xx"
+    )
+    
+    api_calls_other = models.BigIntegerField(
+        default=0,
+        verbose_name="Otras llamadas"
+    )
+    
+    class Meta:
+        verbose_name = "Estadísticas por Hora"
+        verbose_name_plural = "Estadísticas por Hora"
+        ordering = ['-hour']
+        
+    def __str__(self):
+        return f"{self.hour.isoformat()}"
+
+
+class ModelDisagreement(models.Model):
+    """
+    Texto en el que un modelo en sombra no coincide con el que respondió
+
+    Los guarda ``api.model_registry.ShadowScorer`` fuera del camino de la
+    petición.
+    """
+    text = models.TextField(
+        verbose_name="Texto de la noticia"
+    )
+    
+    served_version = models.CharField(
+        max_length=20,
+        verbose_name="Versión del modelo servido"
+    )
+    
+    served_prediction = models.CharField(
+        max_length=10,
+        choices=NewsAnalysis.PREDICTION_CHOICES,
+        verbose_name="Predicción servida"
+    )
+    
+    served_probability_fake = models.FloatField(
+        verbose_name="Probabilidad de ser falsa (servido)"
+    )
+    
+    shadow_model = models.CharField(
+        max_length=100,
+        verbose_name="Modelo en sombra"
+    )
+    
+    shadow_version = models.CharField(
+        max_length=20,
+        verbose_name="Versión del modelo en sombra"
+    )
+    
+    shadow_prediction = models.CharField(
+        max_length=10,
+        choices=NewsAnalysis.PREDICTION_CHOICES,
+        verbose_name="Predicción en sombra"
+    )
+    
+    shadow_probability_fake = models.FloatField(
+        verbose_name="Probabilidad de ser falsa (sombra)"
+    )
+    
+    # Se guardan por lotes desde un hilo en segundo plano
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Fecha de creación"
+    )
+    
+    class Meta:
+        verbose_name = "Desacuerdo entre Modelos"
+        verbose_name_plural = "Desacuerdos entre Modelos"
+        ordering = ['-created_at']
+        indexes = [
+            # Desacuerdos de un candidato en un rango de fechas
+            models.Index(fields=['shadow_model', 'created_at'], name='disagreement_model_created_idx'),
+        ]
+        
+    def __str__(self):
+        return f"{self.shadow_model}: {self.served_prediction} -> {self.shadow_prediction}"
@@ -0,0 +1,245 @@
+"""
+Perfilado del Pipeline por Etapas
+=================================
+Modo de diagnóstico (desactivado por defecto) que mide, en una fracción
+de las predicciones (``PROFILE_SAMPLE_RATE``), cuánto tarda cada parte:
+el preprocesamiento y cada paso del pipeline ajustado (``vectorizer``,
+``classifier``...), para saber dónde se va realmente el tiempo con la
+carga de producción.
+
+En las predicciones muestreadas el modelo se ejecuta en el propio proceso
+web, paso a paso, aunque haya micro-batching o pool de procesos; las que
+resuelve la caché de predicciones solo miden el preprocesamiento.
+
+Con ``PROFILE_SLOW_MS`` las muestras se ejecutan además bajo ``cProfile``
+y las que superan ese umbral se guardan en ``PROFILE_DIR`` (las últimas
+``PROFILE_MAX_DUMPS``) para abrirlas con ``pstats`` o snakeviz. cProfile
+añade sobrecoste: con la captura activa los tiempos de las muestras son
+mayores que los reales.
+
+Los datos son de cada worker y se consultan en ``GET /api/debug/profile/``.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from .utils import percentile
+
+logger = logging.getLogger(__name__)
+
+_current_sample: ContextVar[Optional['ProfileSample']] = ContextVar('profile_sample', default=None)
+
+
+class ProfileSample:
+    """
+    Tiempos de una predicción (o lote) muestreada
+    """
+
+    def __init__(self, n_texts: int, capture: bool):
+        self.n_texts = n_texts
+        self.stages: Dict[str, float] = {}
+        self.profile = cProfile.Profile() if capture else None
+        self.started_at = time.perf_counter()
+
+    def add(self, stage: str, elapsed_ms: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + elapsed_ms
+
+    def add_step(self, step_name: str, elapsed_seconds: float):
+        """
+        Callback ``on_step`` de ``staged_predict_proba``
+        """
+        self.add(step_name, elapsed_seconds * 1000)
+
+
+def current_sample() -> Optional[ProfileSample]:
+    """
+    Muestra en curso en este contexto (None si la predicción no se muestrea)
+    """
+    return _current_sample.get()
+
+
+@contextmanager
+def track(stage: str):
+    """
+    Medir un bloque en la muestra en curso (no hace nada si no hay muestra)
+    """
+    sample = _current_sample.get()
+    if sample is None:
+        yield
+        return
+
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample.add(stage, (time.perf_counter() - started_at) * 1000)
+
+
+class PipelineProfiler:
+    """
+    Muestreo de predicciones y estadísticas por etapa (thread-safe)
+    """
+
+    def __init__(self, sample_rate: float, slow_threshold_ms: float = 0.0,
+                 profile_dir: Optional[str] = None, max_dumps: int = 20,
+                 window: int = 1000):
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.slow_threshold_ms = slow_threshold_ms
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.capture = slow_threshold_ms > 0 and self.profile_dir is not None
+        self.max_dumps = max_dumps
+        self.window = window
+
+        self._lock = threading.Lock()
+        # Milisegundos por texto de cada etapa en las últimas muestras
+        self._stages: Dict[str, deque] = {}
+        self._samples = 0
+        self._slow_samples = 0
+        self._dumps = deque()
+
+    @classmethod
+    def from_settings(cls) -> Optional['PipelineProfiler']:
+        """
+        Crear el perfilador según ``settings.ML_CONFIG`` (None si está desactivado)
+        """
+        ml_config = settings.ML_CONFIG
+        sample_rate = ml_config.get('PROFILE_SAMPLE_RATE', 0.0)
+        if sample_rate <= 0:
+            return None
+
+        return cls(
+            sample_rate=sample_rate,
+            slow_threshold_ms=ml_config.get('PROFILE_SLOW_MS', 0.0),
+            profile_dir=ml_config.get('PROFILE_DIR'),
+            max_dumps=ml_config.get('PROFILE_MAX_DUMPS', 20),
+        )
+
+    @contextmanager
+    def sample(self, n_texts: int = 1):
+        """
+        Muestrear (o no) la predicción que se ejecuta dentro del bloque
+
+        Produce la ``ProfileSample`` en curso, o None si no se muestrea.
+        """
+        if _current_sample.get() is not None or random.random() >= self.sample_rate:
+            yield None
+            return
+
+        sample = ProfileSample(n_texts, self.capture)
+        token = _current_sample.set(sample)
+        if sample.profile is not None:
+            sample.profile.enable()
+        try:
+            yield sample
+        finally:
+            if sample.profile is not None:
+                sample.profile.disable()
+            _current_sample.reset(token)
+            self._record(sample, (time.perf_counter() - sample.started_at) * 1000)
+
+    def _record(self, sample: ProfileSample, total_ms: float):
+        per_text = max(sample.n_texts, 1)
+        is_slow = self.slow_threshold_ms > 0 and total_ms >= self.slow_threshold_ms
+
+        with self._lock:
+            self._samples += 1
+            self._slow_samples += int(is_slow)
+            for stage, elapsed_ms in [*sample.stages.items(), ('total', total_ms)]:
+                values = self._stages.get(stage)
+                if values is None:
+                    values = self._stages[stage] = deque(maxlen=self.window)
+                values.append(elapsed_ms / per_text)
+
+        if is_slow and sample.profile is not None:
+            self._save_profile(sample, total_ms)
+
+    def _save_profile(self, sample: ProfileSample, total_ms: float):
+        """
+        Guardar el cProfile de una muestra lenta y descartar los más antiguos
+        """
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{int(total_ms)}ms.prof"
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            sample.profile.dump_stats(str(self.profile_dir / name))
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el perfil de una predicción lenta: {str(e)}")
+            return
+
+        output = io.StringIO()
+        pstats.Stats(sample.profile, stream=output).sort_stats('cumulative').print_stats(15)
+
+        with self._lock:
+            self._dumps.append({
+                'name': name,
+                'total_ms': round(total_ms, 3),
+                'n_texts': sample.n_texts,
+                'stages_ms': {stage: round(ms, 3) for stage, ms in sample.stages.items()},
+                'created_at': datetime.now().isoformat(),
+                'top_functions': output.getvalue(),
+            })
+            expired = []
+            while len(self._dumps) > self.max_dumps:
+                expired.append(self._dumps.popleft()['name'])
+
+        for expired_name in expired:
+            try:
+                (self.profile_dir / expired_name).unlink()
+            except OSError:
+                pass
+
+    def profile_path(self, name: str) -> Optional[Path]:
+        """
+        Ruta de un perfil guardado por este proceso (None si no existe)
+        """
+        with self._lock:
+            known = any(dump['name'] == name for dump in self._dumps)
+        if not known:
+            return None
+        path = self.profile_dir / name
+        return path if path.exists() else None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stages = {stage: sorted(values) for stage, values in self._stages.items()}
+            samples, slow_samples = self._samples, self._slow_samples
+            dumps: List[Dict] = list(self._dumps)
+
+        def summarize(values):
+            return {
+                'count': len(values),
+                'p50_ms': percentile(values, 0.50, ndigits=4),
+                'p95_ms': percentile(values, 0.95, ndigits=4),
+                'p99_ms': percentile(values, 0.99, ndigits=4),
+                'mean_ms': round(sum(values) / len(values), 4),
+            }
+
+        summary = {stage: summarize(values) for stage, values in stages.items()}
+        total_mean = summary.get('total', {}).get('mean_ms', 0.0)
+        for stage, values in summary.items():
+            if stage != 'total' and total_mean:
+                values['share_of_total'] = round(values['mean_ms'] / total_mean, 4)
+
+        return {
+            'enabled': True,
+            'sample_rate': self.sample_rate,
+            'slow_threshold_ms': self.slow_threshold_ms,
+            'capture_profiles': self.capture,
+            'samples': samples,
+            'slow_samples': slow_samples,
+            'stages': summary,
+            'slow_profiles': list(reversed(dumps)),
+        }
@@ -0,0 +1,194 @@
+"""
+Caché de Predicciones
+=====================
+Caché direccionada por contenido para los resultados del modelo ML.
+
+Tiene dos niveles:
+- Un LRU en memoria del proceso, con TTL, para los textos más repetidos.
+- Opcionalmente, el framework de caché de Django (alias ``predictions``,
+  Redis o Memcached), compartido entre los workers y los nodos.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Caché LRU en memoria con expiración por entrada (thread-safe)
+    """
+
+    def __init__(self, max_entries: int, timeout: float):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PredictionCache:
+    """
+    Caché de dos niveles para las probabilidades del modelo
+
+    Las claves se calculan a partir del hash del texto preprocesado y de la
+    versión del modelo, de modo que un modelo nuevo nunca reutiliza
+    resultados del anterior.
+    """
+
+    def __init__(self, timeout: int = 3600, max_entries: int = 10000,
+                 cache_alias: Optional[str] = 'predictions'):
+        self.timeout = timeout
+        self.local = LRUCache(max_entries, timeout)
+        self.shared = None
+
+        if cache_alias:
+            try:
+                self.shared = caches[cache_alias]
+            except InvalidCacheBackendError:
+                logger.warning(f"Caché compartida '{cache_alias}' no configurada, se usará solo memoria local")
+
+        self._stats_lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional['PredictionCache']:
+        """
+        Crear la caché según ``settings.ML_CONFIG`` (None si está desactivada)
+        """
+        ml_config = settings.ML_CONFIG
+        if not ml_config.get('CACHE_PREDICTIONS', False):
+            return None
+
+        return cls(
+            timeout=ml_config.get('CACHE_TIMEOUT', 3600),
+            max_entries=ml_config.get('CACHE_MAX_ENTRIES', 10000),
+            cache_alias=ml_config.get('CACHE_ALIAS', 'predictions'),
+        )
+
+    @staticmethod
+    def make_key(processed_text: str, model_version: str) -> str:
+        """
+        Clave direccionada por contenido: versión del modelo + hash del texto
+        """
+        digest = hashlib.sha256(processed_text.encode('utf-8')).hexdigest()
+        return f"prediction:{model_version}:{digest}"
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, tuple]:
+        """
+        Buscar varias claves; devuelve solo las encontradas
+        """
+        found = {}
+        missing = []
+
+        for key in keys:
+            value = self.local.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+
+        local_hits = len(found)
+        shared_found = {}
+        if missing and self.shared is not None:
+            try:
+                shared_found = self.shared.get_many(missing)
+            except Exception as e:
+                logger.warning(f"Error al leer la caché compartida: {str(e)}")
+
+        for key, value in shared_found.items():
+            self.local.set(key, value)
+            found[key] = value
+
+        with self._stats_lock:
+            self.local_hits += local_hits
+            self.shared_hits += len(shared_found)
+            self.misses += len(missing) - len(shared_found)
+
+        return found
+
+    def get(self, key: str) -> Optional[tuple]:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, values: Dict[str, tuple]):
+        """
+        Guardar valores en ambos niveles
+        """
+        for key, value in values.items():
+            self.local.set(key, value)
+
+        if values and self.shared is not None:
+            try:
+                self.shared.set_many(values, timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f"Error al escribir en la caché compartida: {str(e)}")
+
+    def set(self, key: str, value: tuple):
+        self.set_many({key: value})
+
+    def clear(self):
+        """
+        Vaciar ambos niveles
+        """
+        self.local.clear()
+
+        if self.shared is not None:
+            try:
+                self.shared.clear()
+            except Exception as e:
+                logger.warning(f"Error al vaciar la caché compartida: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        """
+        Contadores de aciertos/fallos de este proceso
+        """
+        with self._stats_lock:
+            hits = self.local_hits + self.shared_hits
+            lookups = hits + self.misses
+            return {
+                'enabled': True,
+                'local_entries': len(self.local),
+                'local_hits': self.local_hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'shared_backend': type(self.shared).__name__ if self.shared is not None else None,
+            }
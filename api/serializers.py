@@ -4,6 +4,7 @@ Serializers para la API de Detección de Noticias Falsas
 Convierte objetos Django en JSON y viceversa
 """
 
+from django.conf import settings
 from rest_framework import serializers
 from .models import NewsAnalysis, APIUsage, ModelInfo
 
@@ -24,6 +25,7 @@ class NewsAnalysisSerializer(serializers.ModelSerializer):
             'confidence',
             'probability_fake',
             'probability_real',
+            'model_version',
             'text_length',
             'is_fake',
             'created_at'
@@ -34,6 +36,7 @@ class NewsAnalysisSerializer(serializers.ModelSerializer):
             'confidence',
             'probability_fake',
             'probability_real',
+            'model_version',
             'text_length',
             'is_fake',
             'created_at'
@@ -75,6 +78,32 @@ class NewsAnalysisRequestSerializer(serializers.Serializer):
         return value.strip()
 
 
+class NewsAnalysisBatchRequestSerializer(serializers.Serializer):
+    """
+    Serializer para las peticiones de análisis por lotes
+    
+    Cada texto se valida individualmente en el servicio ML para que un
+    texto inválido no haga fallar el lote completo.
+    """
+    texts = serializers.ListField(
+        child=serializers.CharField(allow_blank=True),
+        allow_empty=False,
+        help_text="Lista de textos de noticias a analizar"
+    )
+    
+    def validate_texts(self, value):
+        """
+        Validar el tamaño del lote
+        """
+        max_batch_size = settings.ML_CONFIG.get('MAX_BATCH_SIZE', 500)
+        if len(value) > max_batch_size:
+            raise serializers.ValidationError(
+                f"El lote no puede exceder los {max_batch_size} textos."
+            )
+        
+        return value
+
+
 class NewsAnalysisResponseSerializer(serializers.Serializer):
     """
     Serializer para las respuestas de análisis
@@ -0,0 +1,239 @@
+"""
+Estadísticas Agregadas
+======================
+Mantiene la tabla HourlyStats (contadores por hora) de forma incremental y
+calcula /api/stats/ a partir de ella en lugar de contar las tablas
+NewsAnalysis y APIUsage completas.
+
+Las peticiones no escriben en HourlyStats: ``record_analyses`` solo inserta
+los análisis y deja sus contadores en el ``usage_recorder``, que los suma
+por hora junto con los de APIUsage en cada vaciado, en la misma transacción
+que los registros de uso (una actualización por hora y vaciado en lugar
+de una por petición). Los contadores pendientes son tan duraderos como los
+registros de uso del buffer: si un worker muere se pierden unos segundos de
+ambos, y ``manage.py rebuild_hourly_stats`` los vuelve a calcular desde las tablas.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional
+
+from django.apps import apps as django_apps
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = [
+    'analyses_fake',
+    'analyses_real',
+    'api_calls_success',
+    'api_calls_client_error',
+    'api_calls_server_error',
+    'api_calls_other',
+]
+
+
+def truncate_to_hour(value):
+    """
+    Inicio de la hora (UTC) a la que pertenece un datetime
+    """
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def prediction_counter(prediction: str) -> str:
+    return 'analyses_fake' if prediction == 'FALSA' else 'analyses_real'
+
+
+def status_counter(response_status: int) -> str:
+    if response_status == 200:
+        return 'api_calls_success'
+    if 400 <= response_status < 500:
+        return 'api_calls_client_error'
+    if response_status >= 500:
+        return 'api_calls_server_error'
+    return 'api_calls_other'
+
+
+def apply_hourly_counters(counters_by_hour: Dict):
+    """
+    Sumar contadores (pueden ser negativos) a las filas de HourlyStats
+
+    Debe llamarse dentro de una transacción.
+    """
+    from .models import HourlyStats
+
+    for hour, counters in counters_by_hour.items():
+        HourlyStats.objects.get_or_create(hour=hour)
+        HourlyStats.objects.filter(hour=hour).update(**{
+            field: F(field) + amount for field, amount in counters.items()
+        })
+
+
+def analysis_counters(analyses: Iterable) -> Dict:
+    """
+    Contadores de HourlyStats de unos análisis, por hora
+    """
+    counters = defaultdict(Counter)
+    for analysis in analyses:
+        counters[truncate_to_hour(analysis.created_at)][prediction_counter(analysis.prediction)] += 1
+    return counters
+
+
+def record_analyses(analyses: Iterable) -> List:
+    """
+    Guardar análisis nuevos (sin guardar) con un solo INSERT; sus contadores
+    se suman a HourlyStats en el siguiente vaciado del ``usage_recorder``
+
+    Returns:
+        List: Los análisis guardados
+    """
+    from .models import NewsAnalysis
+    from .usage import usage_recorder
+
+    created = NewsAnalysis.objects.bulk_create(list(analyses))
+    usage_recorder.count_analyses(analysis_counters(created))
+    return created
+
+
+async def arecord_analyses(analyses: Iterable) -> List:
+    """
+    Versión asíncrona de ``record_analyses`` (``abulk_create`` del ORM async)
+    """
+    from asgiref.sync import sync_to_async
+
+    from .models import NewsAnalysis
+    from .usage import usage_recorder
+
+    created = await NewsAnalysis.objects.abulk_create(list(analyses))
+    counters = analysis_counters(created)
+    if usage_recorder.async_enabled:
+        # Solo suma en memoria: no toca la BD
+        usage_recorder.count_analyses(counters)
+    else:
+        await sync_to_async(usage_recorder.count_analyses)(counters)
+    return created
+
+
+def record_usage(records: List, extra_counters: Optional[Dict] = None):
+    """
+    Guardar registros de APIUsage y sumar a HourlyStats sus contadores (y
+    ``extra_counters``, los de los análisis pendientes) en una sola transacción
+    """
+    from .models import APIUsage
+
+    counters = defaultdict(Counter)
+    for usage in records:
+        counters[truncate_to_hour(usage.timestamp)][status_counter(usage.response_status)] += 1
+    for hour, hour_counters in (extra_counters or {}).items():
+        counters[hour].update(hour_counters)
+
+    with transaction.atomic():
+        if records:
+            APIUsage.objects.bulk_create(records, batch_size=500)
+        apply_hourly_counters(counters)
+
+
+def rebuild_hourly_stats(apps=None) -> int:
+    """
+    Recalcular HourlyStats desde NewsAnalysis y APIUsage
+
+    Una consulta agregada (agrupada por hora) por tabla. ``apps`` permite
+    usarla desde una migración con los modelos históricos.
+    """
+    apps = apps or django_apps
+    NewsAnalysis = apps.get_model('api', 'NewsAnalysis')
+    APIUsage = apps.get_model('api', 'APIUsage')
+    HourlyStats = apps.get_model('api', 'HourlyStats')
+
+    rows = defaultdict(Counter)
+
+    analyses = (
+        NewsAnalysis.objects
+        .annotate(hour=TruncHour('created_at', tzinfo=dt_timezone.utc))
+        .values('hour')
+        .annotate(
+            fake=Count('pk', filter=Q(prediction='FALSA')),
+            real=Count('pk', filter=~Q(prediction='FALSA')),
+        )
+        .order_by()
+    )
+    for row in analyses:
+        rows[row['hour']].update(analyses_fake=row['fake'], analyses_real=row['real'])
+
+    usage = (
+        APIUsage.objects
+        .annotate(hour=TruncHour('timestamp', tzinfo=dt_timezone.utc))
+        .values('hour')
+        .annotate(
+            success=Count('pk', filter=Q(response_status=200)),
+            client_error=Count('pk', filter=Q(response_status__gte=400, response_status__lt=500)),
+            server_error=Count('pk', filter=Q(response_status__gte=500)),
+            other=Count('pk', filter=Q(response_status__lt=400) & ~Q(response_status=200)),
+        )
+        .order_by()
+    )
+    for row in usage:
+        rows[row['hour']].update(
+            api_calls_success=row['success'],
+            api_calls_client_error=row['client_error'],
+            api_calls_server_error=row['server_error'],
+            api_calls_other=row['other'],
+        )
+
+    with transaction.atomic():
+        HourlyStats.objects.all().delete()
+        HourlyStats.objects.bulk_create(
+            [HourlyStats(hour=hour, **counters) for hour, counters in rows.items()],
+            batch_size=1000
+        )
+
+    return len(rows)
+
+
+def get_usage_stats() -> Dict:
+    """
+    Estadísticas de /api/stats/ a partir de HourlyStats (una consulta)
+
+    Los rangos "hoy" y "última semana" se resuelven con precisión de hora.
+    """
+    from .models import HourlyStats
+
+    now = timezone.now()
+    today_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = truncate_to_hour(now - timedelta(days=7))
+
+    def window_sum(since):
+        total = F('analyses_fake') + F('analyses_real')
+        return Sum(Case(When(hour__gte=since, then=total), default=Value(0),
+                        output_field=IntegerField()))
+
+    totals = HourlyStats.objects.aggregate(
+        analyses_today=window_sum(today_start),
+        analyses_last_week=window_sum(week_start),
+        **{field: Sum(field) for field in COUNTER_FIELDS}
+    )
+    totals = {key: value or 0 for key, value in totals.items()}
+
+    return {
+        'total_analyses': totals['analyses_fake'] + totals['analyses_real'],
+        'total_api_calls': sum(
+            totals[field] for field in COUNTER_FIELDS if field.startswith('api_calls_')
+        ),
+        'analyses_today': totals['analyses_today'],
+        'analyses_last_week': totals['analyses_last_week'],
+        'predictions_by_result': {
+            'fake': totals['analyses_fake'],
+            'real': totals['analyses_real'],
+        },
+        'api_calls_by_status': {
+            'success': totals['api_calls_success'],
+            'client_error': totals['api_calls_client_error'],
+            'server_error': totals['api_calls_server_error'],
+        },
+        'timestamp': now.isoformat(),
+    }
+
@@ -1,3 +1,1072 @@
-from django.test import TestCase
+"""
+Tests de la API
+===============
+Se ejecutan con ``python manage.py test api``. No cargan el modelo ML del
+proyecto: el servicio y las vistas se prueban con clasificadores pequeños
+definidos aquí, y las piezas de infraestructura (cachés, registro de uso,
+estadísticas, throttling...) por separado.
+"""
 
-# Create your tests here.
+import io
+import json
+import os
+import random
+import re
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from collections import Counter
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from . import async_views
+from .analysis_cache import analysis_cache
+from .inference_backends import ProcessPoolInferenceBackend, _worker_pid, default_pool_size
+from .ml_service import FakeNewsDetectorService, LoadedModel, MicroBatcher
+from .model_artifacts import compute_model_version, export_artifact, load_artifact
+from .model_metadata import build_model_records, render_model_info, sync_model_info
+from .model_registry import ModelRegistry, ShadowScorer, parse_weights
+from .models import APIUsage, HourlyStats, ModelInfo, NewsAnalysis
+from .prediction_cache import LRUCache, PredictionCache
+from .stats import get_usage_stats, rebuild_hourly_stats, record_analyses
+from .text_normalizer import normalize_text
+from .throttling import CacheCounterStore, SharedAnonRateThrottle, SQLiteCounterStore
+from .usage import UsageRecorder
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'predictions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests-predictions',
+    },
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests-throttle',
+    },
+}
+
+
+class LRUCacheTests(SimpleTestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2, timeout=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_entries_expire(self):
+        cache = LRUCache(max_entries=10, timeout=60)
+        with mock.patch('api.prediction_cache.time.monotonic', return_value=1000.0):
+            cache.set('a', 1)
+        with mock.patch('api.prediction_cache.time.monotonic', return_value=1059.0):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('api.prediction_cache.time.monotonic', return_value=1061.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PredictionCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.cache = PredictionCache(timeout=60, max_entries=100, cache_alias='predictions')
+        self.cache.shared.clear()
+
+    def test_keys_depend_on_text_and_model_version(self):
+        key = PredictionCache.make_key('texto de prueba', 'v1')
+        self.assertEqual(key, PredictionCache.make_key('texto de prueba', 'v1'))
+        self.assertNotEqual(key, PredictionCache.make_key('texto de prueba', 'v2'))
+        self.assertNotEqual(key, PredictionCache.make_key('otro texto', 'v1'))
+
+    def test_local_hit_shared_hit_and_miss(self):
+        key = PredictionCache.make_key('texto', 'v1')
+        self.assertIsNone(self.cache.get(key))
+
+        self.cache.set(key, (0.2, 0.8))
+        self.assertEqual(self.cache.get(key), (0.2, 0.8))
+
+        # Otro worker: memoria local vacía, mismo nivel compartido
+        other = PredictionCache(timeout=60, max_entries=100, cache_alias='predictions')
+        self.assertEqual(other.get(key), (0.2, 0.8))
+        # El acierto compartido se copia al nivel local
+        self.assertEqual(len(other.local), 1)
+
+        self.assertEqual(self.cache.get_stats()['local_hits'], 1)
+        self.assertEqual(self.cache.get_stats()['misses'], 1)
+        self.assertEqual(other.get_stats()['shared_hits'], 1)
+
+    def test_get_many_returns_only_found_keys(self):
+        keys = [PredictionCache.make_key(f'texto {i}', 'v1') for i in range(3)]
+        self.cache.set_many({keys[0]: (0.1, 0.9), keys[2]: (0.7, 0.3)})
+
+        self.assertEqual(self.cache.get_many(keys), {keys[0]: (0.1, 0.9), keys[2]: (0.7, 0.3)})
+
+    def test_local_entries_expire_after_timeout(self):
+        key = PredictionCache.make_key('texto', 'v1')
+        cache = PredictionCache(timeout=60, max_entries=100, cache_alias=None)
+        with mock.patch('api.prediction_cache.time.monotonic', return_value=1000.0):
+            cache.set(key, (0.5, 0.5))
+        with mock.patch('api.prediction_cache.time.monotonic', return_value=1061.0):
+            self.assertIsNone(cache.get(key))
+
+    def test_clear_empties_both_levels(self):
+        key = PredictionCache.make_key('texto', 'v1')
+        self.cache.set(key, (0.2, 0.8))
+        self.cache.clear()
+
+        self.assertEqual(len(self.cache.local), 0)
+        self.assertIsNone(self.cache.shared.get(key))
+
+    def test_without_shared_alias_uses_only_memory(self):
+        cache = PredictionCache(timeout=60, max_entries=100, cache_alias=None)
+        key = PredictionCache.make_key('texto', 'v1')
+        cache.set(key, (0.2, 0.8))
+
+        self.assertIsNone(cache.shared)
+        self.assertEqual(cache.get(key), (0.2, 0.8))
+        self.assertIsNone(cache.get_stats()['shared_backend'])
+
+
+class UsageRecorderTests(TestCase):
+
+    def make_recorder(self, **kwargs):
+        options = {'flush_size': 1000, 'flush_on_shutdown': False, **kwargs}
+        recorder = UsageRecorder(**options)
+        # Sin hilo de fondo: los vaciados se lanzan desde el test
+        recorder._flusher.ensure_started = lambda: None
+        return recorder
+
+    def record(self, recorder, status=200):
+        recorder.record('/api/analyze/', 'POST', '127.0.0.1', 'tests', status, 12.5)
+
+    def test_records_are_buffered_until_flush(self):
+        recorder = self.make_recorder()
+        for _ in range(3):
+            self.record(recorder)
+
+        self.assertEqual(APIUsage.objects.count(), 0)
+        self.assertEqual(recorder.get_stats()['pending'], 3)
+
+        self.assertEqual(recorder.flush(), 3)
+        self.assertEqual(APIUsage.objects.count(), 3)
+        self.assertEqual(recorder.get_stats(), {
+            'async': True, 'pending': 0, 'flushed': 3, 'dropped': 0,
+        })
+
+    def test_flush_size_wakes_up_the_flusher(self):
+        recorder = self.make_recorder(flush_size=2)
+        self.record(recorder)
+        self.assertFalse(recorder._wakeup.is_set())
+        self.record(recorder)
+        self.assertTrue(recorder._wakeup.is_set())
+
+    def test_full_buffer_drops_oldest_records(self):
+        recorder = self.make_recorder(max_buffer=2)
+        for status in (200, 201, 404):
+            self.record(recorder, status)
+
+        self.assertEqual(recorder.get_stats()['dropped'], 1)
+        recorder.flush()
+        self.assertEqual(
+            sorted(APIUsage.objects.values_list('response_status', flat=True)), [201, 404]
+        )
+
+    def test_sync_mode_writes_immediately(self):
+        recorder = self.make_recorder(async_enabled=False)
+        self.record(recorder)
+        self.assertEqual(APIUsage.objects.count(), 1)
+
+    def test_shutdown_flush_is_registered_with_atexit(self):
+        with mock.patch('api.usage.atexit.register') as register:
+            recorder = UsageRecorder(flush_size=1000, flush_on_shutdown=True)
+            UsageRecorder(flush_on_shutdown=False)
+        register.assert_called_once_with(recorder.shutdown)
+
+        recorder._flusher.ensure_started = lambda: None
+        self.record(recorder)
+        recorder.shutdown()
+        self.assertEqual(APIUsage.objects.count(), 1)
+
+
+def use_usage_recorder(test, **kwargs):
+    """
+    Sustituir el ``usage_recorder`` global (sin hilo de fondo) durante el test
+    """
+    recorder = UsageRecorder(**{'flush_size': 1000, 'flush_on_shutdown': False, **kwargs})
+    recorder._flusher.ensure_started = lambda: None
+    patcher = mock.patch('api.usage.usage_recorder', recorder)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    return recorder
+
+
+class HourlyStatsTests(TestCase):
+
+    def make_analysis(self, prediction):
+        return NewsAnalysis(
+            text='texto de prueba', prediction=prediction, confidence=0.9,
+            probability_real=0.1, probability_fake=0.9, model_version='tests',
+        )
+
+    def snapshot(self):
+        return list(HourlyStats.objects.order_by('hour').values('hour', *[
+            'analyses_fake', 'analyses_real', 'api_calls_success',
+            'api_calls_client_error', 'api_calls_server_error', 'api_calls_other',
+        ]))
+
+    def test_analyses_are_counted_on_flush(self):
+        recorder = use_usage_recorder(self)
+
+        # En la petición solo el INSERT de los análisis
+        with self.assertNumQueries(1):
+            record_analyses([self.make_analysis('FALSA'), self.make_analysis('VERDADERA')])
+        record_analyses([self.make_analysis('FALSA')])
+        for status in (200, 200, 404, 500, 302):
+            recorder.record('/api/analyze/', 'POST', '127.0.0.1', 'tests', status, 12.5)
+        self.assertFalse(HourlyStats.objects.exists())
+
+        recorder.flush()
+
+        # Sin vaciados pendientes: las estadísticas ya están al día
+        stats = get_usage_stats()
+        self.assertEqual(stats['total_analyses'], 3)
+        self.assertEqual(stats['predictions_by_result'], {'fake': 2, 'real': 1})
+        self.assertEqual(stats['total_api_calls'], 5)
+
+        incremental = self.snapshot()
+        rebuild_hourly_stats()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_flush_with_only_analyses(self):
+        recorder = use_usage_recorder(self)
+        record_analyses([self.make_analysis('VERDADERA')])
+
+        self.assertEqual(recorder.flush(), 0)
+        self.assertEqual(get_usage_stats()['predictions_by_result'], {'fake': 0, 'real': 1})
+        self.assertEqual(recorder.flush(), 0)
+        self.assertEqual(get_usage_stats()['total_analyses'], 1)
+
+    def test_failed_write_does_not_count(self):
+        recorder = UsageRecorder(async_enabled=False, flush_on_shutdown=False)
+        with mock.patch('api.stats.apply_hourly_counters', side_effect=RuntimeError('bd caída')):
+            recorder.record('/api/analyze/', 'POST', '127.0.0.1', 'tests', 200, 12.5)
+
+        # La transacción se deshace: ni la fila ni el contador
+        self.assertEqual(APIUsage.objects.count(), 0)
+        self.assertEqual(get_usage_stats()['total_api_calls'], 0)
+
+
+class ProcessPoolBackendTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import joblib
+        from sklearn.dummy import DummyClassifier
+
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.model_path = os.path.join(cls.tmpdir.name, 'modelo.joblib')
+        joblib.dump(DummyClassifier(strategy='prior').fit([[0], [1]], [0, 1]), cls.model_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+        super().tearDownClass()
+
+    def kill_worker(self, backend):
+        pid = backend._get_executor().submit(_worker_pid, 0).result()
+        os.kill(pid, signal.SIGKILL)
+
+    def test_pool_is_disabled_after_max_restarts(self):
+        backend = ProcessPoolInferenceBackend(
+            self.model_path, pool_size=1, warmup=False,
+            max_restarts=2, restart_window=60.0, start_method='fork',
+        )
+        self.addCleanup(backend.shutdown)
+
+        for _ in range(2):
+            self.kill_worker(backend)
+            self.assertEqual(backend.predict_proba(['texto']).shape, (1, 2))
+        self.assertEqual(backend.get_stats()['restarts'], 2)
+
+        broken = backend._executor
+        self.kill_worker(backend)
+        with mock.patch.object(broken, 'shutdown', wraps=broken.shutdown) as shutdown:
+            with self.assertRaises(RuntimeError):
+                backend.predict_proba(['texto'])
+        shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+        # No se recrea en silencio mientras dure la ventana
+        with self.assertRaises(RuntimeError):
+            backend.predict_proba(['texto'])
+        self.assertIsNone(backend._executor)
+        self.assertTrue(backend.get_stats()['failed'])
+
+        backend._failed_until = time.monotonic() - 1
+        self.assertEqual(backend.predict_proba(['texto']).shape, (1, 2))
+        self.assertFalse(backend.get_stats()['failed'])
+
+    def test_call_counters_from_several_threads(self):
+        backend = ProcessPoolInferenceBackend(
+            self.model_path, pool_size=2, warmup=False, start_method='fork',
+        )
+        self.addCleanup(backend.shutdown)
+
+        def call():
+            for _ in range(10):
+                backend.predict_proba(['texto'])
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(backend.get_stats()['calls'], 80)
+
+    def test_other_model_version_runs_in_the_web_process(self):
+        from sklearn.dummy import DummyClassifier
+
+        backend = ProcessPoolInferenceBackend(
+            self.model_path, pool_size=1, warmup=False, start_method='fork',
+        )
+        self.addCleanup(backend.shutdown)
+        previous = DummyClassifier(strategy='prior').fit([[0], [0], [1]], [0, 0, 1])
+
+        pool_row = backend.predict_proba(
+            ['texto'], previous, compute_model_version(self.model_path)
+        )[0]
+        self.assertEqual(list(pool_row), [0.5, 0.5])
+
+        local_row = backend.predict_proba(['texto'], previous, 'anterior')[0]
+        self.assertAlmostEqual(local_row[0], 2 / 3)
+        self.assertEqual(backend.get_stats()['local_calls'], 1)
+
+    def test_default_pool_size_splits_cores_between_web_workers(self):
+        with mock.patch('api.inference_backends.os.cpu_count', return_value=8):
+            with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+                self.assertEqual(default_pool_size(), 2)
+            with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '16'}):
+                self.assertEqual(default_pool_size(), 1)
+
+
+class FakeRescoreService:
+    """
+    Servicio ML de prueba: FALSA si el texto contiene "falsa"
+    """
+    model_version = 'v2'
+
+    def __init__(self, fail_on_call=None):
+        self.calls = []
+        self.fail_on_call = fail_on_call
+
+    def is_ready(self):
+        return True
+
+    def predict_proba(self, processed_texts):
+        self.calls.append(list(processed_texts))
+        if len(self.calls) == self.fail_on_call:
+            raise RuntimeError('interrumpido')
+        return [(0.9, 0.1) if 'falsa' in text else (0.2, 0.8) for text in processed_texts]
+
+    def _build_result(self, text, processed_text, row):
+        prob_fake, prob_real = row
+        return {
+            'prediction': 'FALSA' if prob_fake > prob_real else 'VERDADERA',
+            'confidence': max(prob_fake, prob_real),
+            'probability_real': prob_real,
+            'probability_fake': prob_fake,
+            'model_version': self.model_version,
+        }
+
+
+class RescoreAnalysesTests(TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.checkpoint = os.path.join(tmpdir.name, 'rescore.json')
+        use_usage_recorder(self, async_enabled=False)
+
+    def create(self, text, prediction):
+        analysis, = record_analyses([NewsAnalysis(
+            text=text, prediction=prediction, confidence=0.6,
+            probability_real=0.4, probability_fake=0.6, model_version='v1',
+        )])
+        return analysis
+
+    def rescore(self, service, **options):
+        stdout = io.StringIO()
+        with mock.patch('api.ml_service.ml_service', service):
+            call_command('rescore_analyses', workers=0, checkpoint=self.checkpoint,
+                         stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_counts_rows_whose_prediction_changed(self):
+        # Dos cambios opuestos en la misma hora
+        self.create('noticia falsa', 'VERDADERA')
+        self.create('noticia cierta', 'FALSA')
+        self.create('otra noticia cierta', 'VERDADERA')
+
+        output = self.rescore(FakeRescoreService())
+
+        self.assertIn('Recalculadas 3 filas (2 con otra predicción', output)
+        self.assertEqual(
+            dict(NewsAnalysis.objects.values_list('text', 'prediction')),
+            {'noticia falsa': 'FALSA', 'noticia cierta': 'VERDADERA',
+             'otra noticia cierta': 'VERDADERA'},
+        )
+        self.assertEqual(set(NewsAnalysis.objects.values_list('model_version', flat=True)), {'v2'})
+
+        incremental = list(HourlyStats.objects.values('hour', 'analyses_fake', 'analyses_real'))
+        rebuild_hourly_stats()
+        self.assertEqual(
+            list(HourlyStats.objects.values('hour', 'analyses_fake', 'analyses_real')), incremental
+        )
+
+    def test_resumes_from_checkpoint(self):
+        for index in range(5):
+            self.create(f'noticia falsa {index}', 'VERDADERA')
+
+        with self.assertRaises(RuntimeError):
+            self.rescore(FakeRescoreService(fail_on_call=2), chunk_size=2)
+
+        with open(self.checkpoint, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        self.assertEqual(checkpoint['processed'], 2)
+        self.assertEqual(checkpoint['changed'], 2)
+
+        service = FakeRescoreService()
+        output = self.rescore(service, chunk_size=2)
+
+        self.assertIn('Reanudando tras 2 filas', output)
+        self.assertIn('Recalculadas 5 filas (5 con otra predicción', output)
+        self.assertEqual(sum(len(texts) for texts in service.calls), 3)
+        self.assertFalse(os.path.exists(self.checkpoint))
+        self.assertFalse(NewsAnalysis.objects.filter(prediction='VERDADERA').exists())
+
+    def test_checkpoint_of_another_model_is_ignored(self):
+        self.create('noticia falsa', 'VERDADERA')
+        with open(self.checkpoint, 'w', encoding='utf-8') as f:
+            json.dump({'model_version': 'v1', 'last_pk': 'zzz', 'processed': 7}, f)
+
+        output = self.rescore(FakeRescoreService())
+
+        self.assertIn('Recalculadas 1 filas', output)
+
+    def test_truncated_texts_are_skipped(self):
+        truncated = self.create('falsa ' * 200, 'VERDADERA')
+
+        output = self.rescore(FakeRescoreService())
+        self.assertIn('1 recortadas sin recalcular', output)
+        truncated.refresh_from_db()
+        self.assertEqual(truncated.prediction, 'VERDADERA')
+
+        self.rescore(FakeRescoreService(), include_truncated=True)
+        truncated.refresh_from_db()
+        self.assertEqual(truncated.prediction, 'FALSA')
+
+
+def fake_loaded_model(version):
+    return LoadedModel(
+        estimator=None, version=version, fake_class_index=1, real_class_index=0,
+        info={}, name='modelo', path='modelo.pkl', mtime=0.0, loaded_at='',
+    )
+
+
+class MicroBatcherTests(SimpleTestCase):
+
+    def test_each_text_is_scored_with_its_own_model(self):
+        calls = []
+
+        def predict_fn(texts, model):
+            calls.append((model.version, list(texts)))
+            return [(model.version, text) for text in texts]
+
+        batcher = MicroBatcher(predict_fn, max_batch_size=8, max_wait_ms=200)
+        submissions = [('a', 'v1'), ('b', 'v2'), ('c', 'v1')]
+        results = {}
+
+        def submit(text, version):
+            results[text] = batcher.submit(text, fake_loaded_model(version))
+
+        threads = [threading.Thread(target=submit, args=item) for item in submissions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(results, {text: (version, text) for text, version in submissions})
+        for version, texts in calls:
+            self.assertTrue(all(dict(submissions)[text] == version for text in texts))
+        self.assertEqual(batcher.get_stats()['items'], 3)
+
+
+class ModelRegistryTests(SimpleTestCase):
+
+    def test_parse_weights(self):
+        self.assertEqual(
+            parse_weights(' principal:90, candidato:10 ,,sin_peso'),
+            [('principal', 90.0), ('candidato', 10.0), ('sin_peso', 0.0)],
+        )
+        self.assertEqual(parse_weights(''), [])
+
+    def test_primary_gets_the_remaining_traffic(self):
+        registry = ModelRegistry('principal', {'candidato': object()}, [('candidato', 10.0)])
+        self.assertEqual(registry.weights, {'candidato': 10.0, 'principal': 90.0})
+        self.assertTrue(registry.has_variants)
+
+    def test_unloaded_variants_fall_back_to_primary(self):
+        registry = ModelRegistry('principal', {}, [('candidato', 10.0)])
+        self.assertEqual(registry.weights, {'principal': 100.0})
+        self.assertFalse(registry.has_variants)
+
+    def test_distinct_texts_follow_the_weights(self):
+        registry = ModelRegistry('principal', {'candidato': object()}, [('candidato', 20.0)])
+        routes = Counter(registry.route(f'noticia número {i}') for i in range(20000))
+        self.assertAlmostEqual(routes['candidato'] / 20000, 0.20, delta=0.01)
+
+    def test_same_text_always_gets_the_same_model(self):
+        registry = ModelRegistry('principal', {'candidato': object()}, [('candidato', 50.0)])
+        self.assertEqual(len({registry.route('el mismo texto') for _ in range(100)}), 1)
+
+    def test_shadow_scoring_is_sampled(self):
+        shadows = {'candidato': fake_loaded_model('v2')}
+        served = {'model_version': 'v1'}
+
+        scorer = ShadowScorer(build_result=None, max_queue=4000, sample_rate=0.25)
+        scorer._worker.ensure_started = lambda: None
+        random.seed(0)
+        for i in range(4000):
+            scorer.submit(shadows, f'noticia {i}', f'noticia {i}', served)
+        self.assertAlmostEqual(scorer._queue.qsize() / 4000, 0.25, delta=0.03)
+
+        # Un modelo que ya respondió no se compara consigo mismo
+        scorer = ShadowScorer(build_result=None, sample_rate=1.0)
+        scorer._worker.ensure_started = lambda: None
+        scorer.submit(shadows, 'texto', 'texto', {'model_version': 'v2'})
+        self.assertEqual(scorer._queue.qsize(), 0)
+
+
+class FixedClockThrottle(SharedAnonRateThrottle):
+    rate = '3/min'
+    now = 0.0
+
+    def timer(self):
+        return self.now
+
+
+class SlidingWindowThrottleTestsMixin:
+    """
+    Casos comunes a los dos almacenes de contadores (``make_store``)
+    """
+
+    def setUp(self):
+        patcher = mock.patch('api.throttling._store', self.make_store())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.request = RequestFactory().get('/api/analyze/', REMOTE_ADDR='10.0.0.1')
+        self.request.user = AnonymousUser()
+
+    def attempt(self, now, ip='10.0.0.1'):
+        self.request.META['REMOTE_ADDR'] = ip
+        throttle = FixedClockThrottle()
+        throttle.now = now
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_blocks_after_the_limit_in_a_window(self):
+        results = [self.attempt(6000.0 + i)[0] for i in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+        # Otro cliente tiene su propio contador
+        self.assertTrue(self.attempt(6004.0, ip='10.0.0.2')[0])
+
+    def test_previous_window_weighs_by_remaining_fraction(self):
+        for i in range(3):
+            self.attempt(6000.0 + i)
+
+        # A mitad de la ventana siguiente la anterior cuenta 1.5
+        results = [self.attempt(6090.0)[0] for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+
+    def test_wait_until_the_estimate_drops_below_the_limit(self):
+        for i in range(3):
+            self.attempt(6000.0)
+        allowed, throttle = self.attempt(6000.0)
+        self.assertFalse(allowed)
+        self.assertEqual(throttle.wait(), 60.0)
+
+        for _ in range(2):
+            self.attempt(6090.0)
+        allowed, throttle = self.attempt(6090.0)
+        self.assertFalse(allowed)
+        # 3 * (1 - 2/3) + 2 = 3 a dos tercios de la ventana
+        self.assertAlmostEqual(throttle.wait(), 10.0)
+
+    def test_store_errors_let_requests_through(self):
+        with mock.patch('api.throttling._store.get_many', side_effect=RuntimeError('caído')):
+            self.assertTrue(all(self.attempt(6000.0)[0] for _ in range(5)))
+
+
+class SQLiteThrottleTests(SlidingWindowThrottleTestsMixin, SimpleTestCase):
+
+    def make_store(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        return SQLiteCounterStore(os.path.join(tmpdir.name, 'throttle.sqlite3'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheThrottleTests(SlidingWindowThrottleTestsMixin, SimpleTestCase):
+
+    def make_store(self):
+        store = CacheCounterStore('throttle')
+        store.cache.clear()
+        return store
+
+
+def reference_normalize_text(text):
+    """
+    Preprocesamiento original (dos re.sub) con el que debe coincidir ``normalize_text``
+    """
+    text = text.strip().lower()
+    text = re.sub(r'\s+', ' ', text)
+    return re.sub(r'[^\w\sáéíóúüñ]', ' ', text)
+
+
+class NormalizeTextTests(SimpleTestCase):
+
+    CASES = [
+        '',
+        '   ',
+        '  Texto con espacios en los extremos \t\n',
+        'Varios   espacios\t\tmezclados \t \n\r\x0b\x0c aquí',
+        'Puntuación, junto a espacios . ¡Hola!¿Qué tal? -- fin.',
+        'coma,sin espacio;y:más/signos\\ ',
+        ' .  , ;\t!\n ',
+        'Ñandú PINGÜINO canción ÁÉÍÓÚ',
+        'unicode: naïve façade straße ǅ ١٢٣ 中文 ΑΘΗΝΑ',
+        'emoji 😀 y símbolos © ® ™ € $ %',
+        'espacios unicode\u00a0\u2003\u3000entre\u200bpalabras',
+        'guion_bajo_es_\\w y dígitos 123',
+        '\u2028salto de línea unicode\u2029',
+    ]
+
+    def test_matches_reference_on_edge_cases(self):
+        for text in self.CASES:
+            with self.subTest(text=text):
+                self.assertEqual(normalize_text(text), reference_normalize_text(text))
+
+    def test_matches_reference_on_random_texts(self):
+        alphabet = 'aZñÜ1_ \t\n\u00a0\u3000.,;!¿?-😀'
+        rng = random.Random(8)
+        for _ in range(2000):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            self.assertEqual(normalize_text(text), reference_normalize_text(text), repr(text))
+
+
+class KeywordClassifier:
+    """
+    Clasificador de prueba: la probabilidad de FALSA depende de si el texto
+    contiene "falsa" (0.9), "empate" (0.5) o ninguna de las dos (0.2)
+    """
+
+    def __init__(self, classes=(0, 1)):
+        self.classes_ = list(classes)
+
+    def predict_proba(self, texts):
+        import numpy as np
+
+        fake_column = self.classes_.index(1)
+        rows = np.zeros((len(texts), 2))
+        for index, text in enumerate(texts):
+            prob_fake = 0.5 if 'empate' in text else 0.9 if 'falsa' in text else 0.2
+            rows[index, fake_column] = prob_fake
+            rows[index, 1 - fake_column] = 1 - prob_fake
+        return rows
+
+
+def make_service(test, estimator):
+    """
+    Servicio ML real sobre ``estimator`` guardado en un directorio temporal,
+    sin caché, micro-batching, pool ni modelos adicionales
+    """
+    import joblib
+
+    tmpdir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmpdir.cleanup)
+    model_path = os.path.join(tmpdir.name, 'modelo.pkl')
+    joblib.dump(estimator, model_path)
+
+    overrides = override_settings(ML_CONFIG={
+        **settings.ML_CONFIG,
+        'MODEL_PATH': model_path,
+        'MODEL_INFO_PATH': os.path.join(tmpdir.name, 'info_modelo.json'),
+        'MODEL_ARTIFACT_PATH': None,
+        'MODEL_DIR': tmpdir.name,
+        'MODEL_VARIANTS': '',
+        'SHADOW_MODELS': '',
+        'MODEL_INFO_SYNC': False,
+        'MODEL_RELOAD_INTERVAL': 0.0,
+        'INFERENCE_BACKEND': 'local',
+        'MICRO_BATCHING': False,
+        'CACHE_PREDICTIONS': False,
+        'PROFILE_SAMPLE_RATE': 0.0,
+    })
+    overrides.enable()
+    test.addCleanup(overrides.disable)
+
+    service = FakeNewsDetectorService()
+    test.assertTrue(service.is_ready())
+    return service
+
+
+class PredictionResultTests(SimpleTestCase):
+
+    FAKE_TEXT = 'esta noticia es falsa de principio a fin'
+    REAL_TEXT = 'el gobierno publicó hoy el presupuesto anual'
+    TIE_TEXT = 'un caso de empate entre las dos clases'
+
+    def test_label_follows_classes_order(self):
+        for classes in [(0, 1), (1, 0)]:
+            with self.subTest(classes=classes):
+                service = make_service(self, KeywordClassifier(classes))
+
+                fake = service.predict(self.FAKE_TEXT)
+                self.assertEqual(fake['prediction'], 'FALSA')
+                self.assertAlmostEqual(fake['probability_fake'], 0.9)
+                self.assertAlmostEqual(fake['probability_real'], 0.1)
+                self.assertAlmostEqual(fake['confidence'], 0.9)
+
+                real = service.predict(self.REAL_TEXT)
+                self.assertEqual(real['prediction'], 'VERDADERA')
+                self.assertAlmostEqual(real['probability_fake'], 0.2)
+
+    def test_tie_goes_to_the_first_class_like_argmax(self):
+        expected = {(0, 1): 'VERDADERA', (1, 0): 'FALSA'}
+        for classes, label in expected.items():
+            with self.subTest(classes=classes):
+                service = make_service(self, KeywordClassifier(classes))
+                result = service.predict(self.TIE_TEXT)
+                self.assertEqual(result['prediction'], label)
+                self.assertEqual(result['confidence'], 0.5)
+
+    def test_batch_agrees_with_single_predictions(self):
+        service = make_service(self, KeywordClassifier((1, 0)))
+        texts = [self.FAKE_TEXT, self.REAL_TEXT, self.TIE_TEXT, 'corto', self.FAKE_TEXT.upper()]
+
+        batch = service.predict_batch(texts)
+
+        self.assertEqual(batch[3]['code'], 'INVALID_TEXT')
+        fields = ['prediction', 'confidence', 'probability_real', 'probability_fake', 'model_version']
+        for text, result in zip(texts, batch):
+            if 'error' in result:
+                continue
+            single = service.predict(text)
+            self.assertEqual({f: result[f] for f in fields}, {f: single[f] for f in fields})
+
+
+class AnalyzeBatchViewTests(TestCase):
+
+    def setUp(self):
+        self.service = make_service(self, KeywordClassifier())
+        use_usage_recorder(self, async_enabled=False)
+        throttle_store = CacheCounterStore('throttle')
+        throttle_store.cache.clear()
+        for target, value in [
+            ('api.views.ml_service', self.service),
+            ('api.throttling._store', throttle_store),
+            ('api.middleware.usage_recorder', mock.Mock()),
+        ]:
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = Client()
+
+    def post(self, texts):
+        return self.client.post('/api/analyze/batch/', {'texts': texts}, content_type='application/json')
+
+    def test_results_follow_input_order(self):
+        texts = [f'noticia número {i} ' + ('falsa' if i % 3 == 0 else 'cierta') for i in range(12)]
+        response = self.post(texts)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['total'], body['successful'], body['failed']), (12, 12, 0))
+        self.assertEqual([r['index'] for r in body['results']], list(range(12)))
+        self.assertEqual(
+            [r['prediction'] for r in body['results']],
+            ['FALSA' if i % 3 == 0 else 'VERDADERA' for i in range(12)],
+        )
+        self.assertEqual(NewsAnalysis.objects.count(), 12)
+
+    def test_invalid_text_fails_only_its_item(self):
+        texts = ['primera noticia sobre el clima', 'corto', '', 'tercera noticia que es falsa']
+        response = self.post(texts)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['successful'], body['failed']), (2, 2))
+        self.assertEqual(
+            [r['status'] for r in body['results']], ['success', 'error', 'error', 'success']
+        )
+        self.assertEqual(body['results'][1]['code'], 'INVALID_TEXT')
+        self.assertEqual(body['results'][3]['prediction'], 'FALSA')
+
+        # Solo se guardan los textos válidos
+        self.assertEqual(
+            sorted(NewsAnalysis.objects.values_list('text', flat=True)), sorted([texts[0], texts[3]])
+        )
+        for result in body['results'][0::3]:
+            self.assertTrue(NewsAnalysis.objects.filter(pk=result['analysis_id']).exists())
+
+    def test_batch_size_limit(self):
+        text = 'una noticia cualquiera de prueba'
+        self.assertEqual(self.post([text] * 500).status_code, 200)
+        self.assertEqual(NewsAnalysis.objects.count(), 500)
+
+        response = self.post([text] * 501)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('texts', response.json()['errors'])
+        self.assertEqual(NewsAnalysis.objects.count(), 500)
+
+    def test_empty_batch_is_rejected(self):
+        self.assertEqual(self.post([]).status_code, 400)
+
+
+class AnalyzeStreamViewTests(TestCase):
+
+    def setUp(self):
+        self.service = make_service(self, KeywordClassifier())
+        throttle_store = CacheCounterStore('throttle')
+        throttle_store.cache.clear()
+        self.usage = mock.Mock()
+        for target, value in [
+            ('api.views.ml_service', self.service),
+            ('api.throttling._store', throttle_store),
+            ('api.middleware.usage_recorder', self.usage),
+        ]:
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = Client()
+
+    def post(self, texts):
+        body = ''.join(json.dumps({'id': i, 'text': text}) + '\n' for i, text in enumerate(texts))
+        return self.client.post('/api/analyze/stream/', body, content_type='application/x-ndjson')
+
+    def read(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_lines_over_the_limit_are_not_scored(self):
+        with override_settings(ML_CONFIG={**settings.ML_CONFIG, 'STREAM_MAX_LINES': 3}):
+            response = self.post([f'noticia número {i} que es falsa' for i in range(5)])
+            results = self.read(response)
+
+        self.assertEqual([r['status'] for r in results], ['success'] * 3 + ['error'])
+        self.assertEqual(results[-1]['code'], 'TOO_MANY_LINES')
+        self.assertEqual(results[-1]['line'], 4)
+
+    def test_usage_is_recorded_after_the_body_is_sent(self):
+        response = self.post(['una noticia falsa', 'una noticia cierta'])
+        self.usage.record.assert_not_called()
+
+        predict_batch = self.service.predict_batch
+
+        def slow_predict_batch(*args, **kwargs):
+            time.sleep(0.05)
+            return predict_batch(*args, **kwargs)
+
+        with mock.patch.object(self.service, 'predict_batch', slow_predict_batch):
+            self.assertEqual(len(self.read(response)), 2)
+
+        self.usage.record.assert_called_once()
+        recorded = self.usage.record.call_args.kwargs
+        self.assertEqual(recorded['endpoint'], '/api/analyze/stream/')
+        self.assertGreaterEqual(recorded['response_time'], 50)
+        self.assertGreater(recorded['inference_time'], 0)
+
+
+class GetAnalysisViewTests(TestCase):
+
+    def setUp(self):
+        self.service = make_service(self, KeywordClassifier())
+        throttle_store = CacheCounterStore('throttle')
+        throttle_store.cache.clear()
+        for target, value in [
+            ('api.views.ml_service', self.service),
+            ('api.views.is_ml_service_loaded', lambda: True),
+            ('api.throttling._store', throttle_store),
+            ('api.middleware.usage_recorder', mock.Mock()),
+        ]:
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        analysis_cache.cache.clear()
+        self.client = Client()
+
+    def create(self, model_version):
+        return NewsAnalysis.objects.create(
+            text='una noticia', prediction='VERDADERA', confidence=0.8,
+            probability_real=0.8, probability_fake=0.2, model_version=model_version,
+        )
+
+    def test_active_model_analyses_are_cached(self):
+        analysis = self.create(self.service.model_version)
+        url = f'/api/analysis/{analysis.id}/'
+
+        response = self.client.get(url)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json()['prediction'], 'VERDADERA')
+
+    def test_other_versions_are_read_from_the_database(self):
+        analysis = self.create('version-anterior')
+        url = f'/api/analysis/{analysis.id}/'
+
+        response = self.client.get(url)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        # Como haría rescore_analyses desde otro proceso
+        NewsAnalysis.objects.filter(pk=analysis.pk).update(
+            prediction='FALSA', model_version=self.service.model_version
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.json()['prediction'], 'FALSA')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+
+
+class ModelInfoViewTests(TestCase):
+
+    def setUp(self):
+        self.service = make_service(self, KeywordClassifier())
+        throttle_store = CacheCounterStore('throttle')
+        throttle_store.cache.clear()
+        for target, value in [
+            ('api.throttling._store', throttle_store),
+            ('api.middleware.usage_recorder', mock.Mock()),
+        ]:
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = Client()
+
+    def get(self, service):
+        with mock.patch('api.views.ml_service', service):
+            return self.client.get('/api/model/info/')
+
+    def test_created_at_comes_from_the_synced_row(self):
+        records = build_model_records(self.service.active, self.service.registry)
+        sync_model_info(records)
+        self.service.model_info_response = render_model_info(records)
+
+        body = self.get(self.service).json()
+        row = ModelInfo.objects.get(version=self.service.model_version)
+        self.assertEqual(body['created_at'], row.created_at.isoformat())
+        self.assertEqual(body['models'][0]['created_at'], row.created_at.isoformat())
+
+    def test_stored_record_is_served_while_the_model_is_not_loaded(self):
+        unavailable = mock.Mock(is_ready=mock.Mock(return_value=False))
+        self.assertEqual(self.get(unavailable).status_code, 503)
+
+        records = build_model_records(self.service.active, self.service.registry)
+        sync_model_info(records)
+        response = self.get(unavailable)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], self.service.model_version)
+        self.assertIn('created_at', response.json())
+
+
+class AsyncAnalyzeViewTests(TestCase):
+
+    def setUp(self):
+        self.service = make_service(self, KeywordClassifier())
+        use_usage_recorder(self, async_enabled=False)
+        throttle_store = CacheCounterStore('throttle')
+        throttle_store.cache.clear()
+        for target, value in [
+            ('api.async_views.ml_service', self.service),
+            ('api.throttling._store', throttle_store),
+        ]:
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+
+    def analyze(self, request):
+        request.user = AnonymousUser()
+        return async_to_sync(async_views.analyze_news)(request)
+
+    def test_accepts_the_same_content_types_as_drf(self):
+        text = 'una noticia falsa sobre el clima'
+        requests = [
+            self.factory.post('/api/analyze/', {'text': text}, content_type='application/json'),
+            self.factory.post('/api/analyze/', f'text={text}',
+                              content_type='application/x-www-form-urlencoded'),
+            self.factory.post('/api/analyze/', {'text': text}),  # multipart
+        ]
+        for request in requests:
+            response = self.analyze(request)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.content)['prediction'], 'FALSA')
+
+        self.assertEqual(NewsAnalysis.objects.count(), 3)
+        self.assertEqual(HourlyStats.objects.get().analyses_fake, 3)
+
+    def test_malformed_and_unsupported_bodies(self):
+        malformed = self.factory.post('/api/analyze/', '{no es json', content_type='application/json')
+        self.assertEqual(self.analyze(malformed).status_code, 400)
+
+        plain = self.factory.post('/api/analyze/', 'texto', content_type='text/plain')
+        self.assertEqual(self.analyze(plain).status_code, 415)
+        self.assertFalse(NewsAnalysis.objects.exists())
+
+
+class ModelArtifactTests(SimpleTestCase):
+
+    def setUp(self):
+        import joblib
+        from sklearn.dummy import DummyClassifier
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.dir = tmpdir.name
+        self.source = os.path.join(self.dir, 'modelo.pkl')
+        self.artifact = os.path.join(self.dir, 'modelo.joblib')
+        joblib.dump(DummyClassifier(strategy='prior').fit([[0], [1]], [0, 1]), self.source)
+
+    def test_artifact_survives_a_copy_without_mtime(self):
+        metadata = export_artifact(self.source, self.artifact)
+
+        # Como ``cp`` o un checkout: mismo contenido, otra fecha
+        copy = os.path.join(self.dir, 'copia.pkl')
+        shutil.copyfile(self.source, copy)
+        os.utime(copy, (0, 0))
+
+        loaded = load_artifact(copy, self.artifact)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded[1], metadata['model_version'])
+        self.assertEqual(loaded[1], compute_model_version(self.source))
+
+    def test_artifact_of_another_model_is_ignored(self):
+        import joblib
+        from sklearn.dummy import DummyClassifier
+
+        export_artifact(self.source, self.artifact)
+        stat = os.stat(self.source)
+        joblib.dump(DummyClassifier(strategy='prior').fit([[0], [1], [2]], [0, 1, 1]), self.source)
+        os.utime(self.source, (stat.st_atime, stat.st_mtime))
+
+        self.assertIsNone(load_artifact(self.source, self.artifact))
@@ -0,0 +1,28 @@
+"""
+Normalización de Texto
+======================
+Limpieza del texto antes de la predicción, con los patrones compilados
+una sola vez al importar el módulo.
+"""
+
+import re
+
+# Una sola pasada equivalente a los dos re.sub del preprocesamiento original:
+#   re.sub(r'\s+', ' ', text)
+#   re.sub(r'[^\w\sáéíóúüñ]', ' ', text)
+# (las vocales acentuadas, la ü y la ñ ya son \w).
+#
+# - Primera rama: un carácter especial, o un espacio distinto de ' ' junto
+#   con los espacios que le siguen.
+# - Segunda rama: un ' ' seguido de más espacios.
+# Un ' ' aislado, el caso más común, no coincide y se deja tal cual, así que
+# hay muchos menos reemplazos que con \s+.
+_NORMALIZE_PATTERN = re.compile(r'[^\w ](?:(?<=\s)\s*)?| \s+')
+
+
+def normalize_text(text: str) -> str:
+    """
+    Quitar espacios de los extremos, pasar a minúsculas, colapsar espacios
+    y reemplazar caracteres especiales por espacios
+    """
+    return _NORMALIZE_PATTERN.sub(' ', text.strip().lower())
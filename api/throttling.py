@@ -0,0 +1,226 @@
+"""
+Límites de Peticiones Compartidos entre Workers
+===============================================
+Throttles de DRF (``anon`` y ``user``) con contadores compartidos por todos
+los workers, en lugar del historial de marcas de tiempo que los throttles
+de DRF guardan en la caché ``default`` (memoria local de cada worker: el
+límite real era el configurado por el número de workers y el historial
+de cada cliente crecía hasta el número de peticiones permitidas).
+
+Algoritmo de ventana deslizante aproximada: por cliente se guardan solo
+dos contadores, el de la ventana actual y el de la anterior, y el número
+de peticiones recientes se estima como::
+
+    anterior * (1 - fracción transcurrida de la ventana actual) + actual
+
+Memoria constante por cliente y dos lecturas y un incremento atómico por
+petición. Los contadores se guardan en (``THROTTLE['STORE']``):
+
+- ``sqlite``: un archivo SQLite local (``THROTTLE_SQLITE_PATH``) que
+  comparten los workers de un mismo nodo. Es la opción por defecto.
+- ``cache``: el alias de caché ``throttle``; con Redis o Memcached
+  (``THROTTLE_CACHE_BACKEND``/``THROTTLE_CACHE_LOCATION``) los límites se
+  comparten también entre nodos.
+
+La comprobación y el incremento son dos operaciones: con peticiones
+simultáneas de un mismo cliente justo en el límite puede pasar alguna de
+más. Si el almacén falla, la petición se deja pasar (el límite no debe
+tumbar la API).
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteCounterStore:
+    """
+    Contadores con caducidad en un archivo SQLite compartido por los procesos
+
+    Cada incremento es un único ``INSERT ... ON CONFLICT DO UPDATE``, atómico
+    entre procesos. Los contadores caducados se borran cada ``PURGE_INTERVAL``
+    segundos.
+    """
+
+    PURGE_INTERVAL = 60.0
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._purged_at = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Una conexión por hilo; las heredadas de un fork no se reutilizan
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS throttle_counters ('
+            'key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def get_many(self, keys: List[str]) -> Dict[str, int]:
+        placeholders = ', '.join('?' * len(keys))
+        rows = self._connection().execute(
+            f'SELECT key, count FROM throttle_counters '
+            f'WHERE key IN ({placeholders}) AND expires_at > ?',
+            [*keys, time.time()]
+        ).fetchall()
+        return dict(rows)
+
+    def incr(self, key: str, timeout: float) -> int:
+        now = time.time()
+        connection = self._connection()
+        count = connection.execute(
+            'INSERT INTO throttle_counters (key, count, expires_at) VALUES (?, 1, ?) '
+            'ON CONFLICT (key) DO UPDATE SET '
+            'count = CASE WHEN expires_at > ? THEN count + 1 ELSE 1 END, '
+            'expires_at = CASE WHEN expires_at > ? THEN expires_at ELSE excluded.expires_at END '
+            'RETURNING count',
+            (key, now + timeout, now, now)
+        ).fetchone()[0]
+
+        if now - self._purged_at > self.PURGE_INTERVAL:
+            self._purged_at = now
+            connection.execute('DELETE FROM throttle_counters WHERE expires_at <= ?', (now,))
+        return count
+
+
+class CacheCounterStore:
+    """
+    Contadores en un alias de caché de Django
+
+    ``incr`` es atómico con Redis y Memcached; con las cachés en memoria
+    local o en archivos los contadores no se comparten (o se comparten sin
+    atomicidad), así que solo sirven para desarrollo.
+    """
+
+    def __init__(self, cache_alias: str = 'throttle'):
+        self.cache = caches[cache_alias]
+
+    def get_many(self, keys: List[str]) -> Dict[str, int]:
+        return self.cache.get_many(keys)
+
+    def incr(self, key: str, timeout: float) -> int:
+        if self.cache.add(key, 1, timeout):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Caducó entre add e incr
+            self.cache.add(key, 1, timeout)
+            return 1
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Almacén de contadores configurado en ``settings.THROTTLE`` (se crea en
+    el primer uso)
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = settings.THROTTLE
+                if config.get('STORE', 'sqlite') == 'cache':
+                    _store = CacheCounterStore(config.get('CACHE_ALIAS', 'throttle'))
+                else:
+                    _store = SQLiteCounterStore(config['SQLITE_PATH'])
+    return _store
+
+
+class SlidingWindowThrottleMixin:
+    """
+    Sustituye el historial de DRF por la ventana deslizante aproximada
+
+    Mantiene ``get_cache_key`` (identificación del cliente) y las tasas
+    (``DEFAULT_THROTTLE_RATES``) del throttle de DRF con el que se combina.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = (now % self.duration) / self.duration
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+
+        store = get_store()
+        try:
+            counts = store.get_many([previous_key, current_key])
+            self.previous_count = counts.get(previous_key, 0)
+            self.current_count = counts.get(current_key, 0)
+
+            if self.estimate() >= self.num_requests:
+                return self.throttle_failure()
+
+            # Cada contador se lee también durante la ventana siguiente
+            self.current_count = store.incr(current_key, 2 * self.duration)
+        except Exception as e:
+            logger.warning(f"Error en el almacén de throttling, se permite la petición: {str(e)}")
+            return True
+
+        return self.throttle_success()
+
+    def estimate(self) -> float:
+        return self.previous_count * (1 - self.elapsed) + self.current_count
+
+    def throttle_success(self):
+        return True
+
+    def wait(self) -> Optional[float]:
+        """
+        Segundos hasta que la estimación baje del límite
+        """
+        limit = self.num_requests
+        if self.current_count < limit:
+            # El peso de la ventana anterior baja al avanzar la actual
+            if not self.previous_count:
+                return None
+            target = 1 - (limit - self.current_count) / self.previous_count
+            return max(target - self.elapsed, 0.0) * self.duration
+
+        # La ventana actual ya está llena: esperar a que pase a ser la anterior
+        target = 1 - limit / self.current_count
+        return (1 - self.elapsed + max(target, 0.0)) * self.duration
+
+
+class SharedAnonRateThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
+    """
+    ``AnonRateThrottle`` (por IP, solo clientes anónimos) compartido entre workers
+    """
+
+
+class SharedUserRateThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
+    """
+    ``UserRateThrottle`` (por usuario o IP) compartido entre workers
+    """
@@ -0,0 +1,62 @@
+"""
+Medición de Tiempos por Petición
+================================
+Acumula, para la petición en curso, el tiempo dedicado a cada etapa
+(inferencia del modelo, consultas a la base de datos, ...).
+
+Se basa en ``contextvars`` para que funcione igual con vistas síncronas
+y asíncronas.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+_current_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('request_timings', default=None)
+
+
+def start_request(timings: Optional[Dict[str, float]] = None):
+    """
+    Iniciar la medición para la petición actual (o seguir acumulando en
+    ``timings``, los de una medición anterior); devuelve el token del contexto
+    """
+    return _current_timings.set({} if timings is None else timings)
+
+
+def end_request(token) -> Dict[str, float]:
+    """
+    Terminar la medición y devolver los tiempos acumulados (ms)
+    """
+    timings = _current_timings.get() or {}
+    _current_timings.reset(token)
+    return timings
+
+
+def add(stage: str, elapsed_ms: float):
+    """
+    Sumar tiempo a una etapa (no hace nada fuera de una petición)
+    """
+    timings = _current_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + elapsed_ms
+
+
+@contextmanager
+def track(stage: str):
+    """
+    Medir un bloque de código y sumarlo a la etapa indicada
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(stage, (time.perf_counter() - started_at) * 1000)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """
+    Envoltorio para ``connection.execute_wrapper`` que mide el tiempo en BD
+    """
+    with track('db'):
+        return execute(sql, params, many, context)
@@ -4,21 +4,45 @@ URLs de la aplicación API
 Configuración de rutas para los endpoints de la API
 """
 
+from django.conf import settings
 from django.urls import path, include
 from . import views
 
+# En modo ASGI se sirven las versiones nativas async de las vistas calientes
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    analyze_news_view = async_views.analyze_news
+    get_analysis_view = async_views.get_analysis
+    health_check_view = async_views.health_check
+else:
+    analyze_news_view = views.analyze_news
+    get_analysis_view = views.get_analysis
+    health_check_view = views.health_check
+
 urlpatterns = [
     # Endpoint principal para análisis
-    path('analyze/', views.analyze_news, name='analyze_news'),
+    path('analyze/', analyze_news_view, name='analyze_news'),
+    
+    # Análisis por lotes
+    path('analyze/batch/', views.analyze_news_batch, name='analyze_news_batch'),
+    
+    # Puntuación masiva en streaming (NDJSON)
+    path('analyze/stream/', views.analyze_news_stream, name='analyze_news_stream'),
     
     # Obtener análisis específico
-    path('analysis/<uuid:analysis_id>/', views.get_analysis, name='get_analysis'),
+    path('analysis/<uuid:analysis_id>/', get_analysis_view, name='get_analysis'),
     
     # Información del modelo
     path('model/info/', views.model_info, name='model_info'),
     
+    # Recarga del modelo en caliente (administradores)
+    path('model/reload/', views.reload_model, name='reload_model'),
+    
+    # Perfilado del pipeline por etapas (administradores)
+    path('debug/profile/', views.pipeline_profile, name='pipeline_profile'),
+    
     # Health check
-    path('health/', views.health_check, name='health_check'),
+    path('health/', health_check_view, name='health_check'),
     
     # Estadísticas
     path('stats/', views.api_stats, name='api_stats'),
@@ -0,0 +1,182 @@
+"""
+Registro de Uso de la API
+=========================
+Acumula los registros de APIUsage y los contadores de HourlyStats de los
+análisis nuevos en memoria y los persiste por lotes (``bulk_create`` y una
+actualización de HourlyStats por hora, en una transacción) desde un hilo en
+segundo plano, fuera del camino de cada petición.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .stats import record_usage
+from .utils import BackgroundThread
+
+logger = logging.getLogger(__name__)
+
+
+class UsageRecorder:
+    """
+    Buffer de registros de uso con vaciado por tamaño o por tiempo
+    """
+
+    def __init__(self, async_enabled: bool = True, flush_size: int = 100,
+                 flush_interval: float = 5.0, max_buffer: int = 10000,
+                 flush_on_shutdown: bool = True):
+        self.async_enabled = async_enabled
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.flush_on_shutdown = flush_on_shutdown
+
+        self._buffer: List = []
+        # Contadores de HourlyStats de los análisis guardados, por hora
+        self._analysis_counters: Dict = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher = BackgroundThread(self._run, 'usage-recorder')
+        self._dropped = 0
+        self._flushed = 0
+
+        if self.flush_on_shutdown:
+            atexit.register(self.shutdown)
+
+    @classmethod
+    def from_settings(cls) -> 'UsageRecorder':
+        """
+        Crear el registrador según ``settings.USAGE_LOGGING``
+        """
+        usage_config = getattr(settings, 'USAGE_LOGGING', {})
+        return cls(
+            async_enabled=usage_config.get('ASYNC', True),
+            flush_size=usage_config.get('FLUSH_SIZE', 100),
+            flush_interval=usage_config.get('FLUSH_INTERVAL', 5.0),
+            max_buffer=usage_config.get('MAX_BUFFER', 10000),
+            flush_on_shutdown=usage_config.get('FLUSH_ON_SHUTDOWN', True),
+        )
+
+    def record(self, endpoint: str, method: str, ip_address: str, user_agent: str,
+               response_status: int, response_time: float,
+               inference_time: float = 0.0, db_time: float = 0.0):
+        """
+        Registrar una llamada a la API (no bloquea en la base de datos)
+
+        Args:
+            response_time (float): Tiempo de respuesta total en milisegundos
+            inference_time (float): Tiempo dentro del modelo ML (ms)
+            db_time (float): Tiempo en consultas a la base de datos (ms)
+        """
+        from .models import APIUsage
+
+        usage = APIUsage(
+            endpoint=endpoint[:100],
+            method=method[:10],
+            ip_address=ip_address,
+            user_agent=user_agent,
+            response_status=response_status,
+            response_time=response_time,
+            inference_time=inference_time,
+            db_time=db_time,
+            timestamp=timezone.now()
+        )
+
+        if not self.async_enabled:
+            self._write([usage])
+            return
+
+        with self._lock:
+            self._buffer.append(usage)
+            if len(self._buffer) > self.max_buffer:
+                # La BD no da abasto: descartar los registros más antiguos
+                overflow = len(self._buffer) - self.max_buffer
+                del self._buffer[:overflow]
+                self._dropped += overflow
+            should_flush = len(self._buffer) >= self.flush_size
+
+        self._flusher.ensure_started()
+        if should_flush:
+            self._wakeup.set()
+
+    def count_analyses(self, counters: Dict):
+        """
+        Sumar los contadores de unos análisis ya guardados (ver
+        ``api.stats.analysis_counters``) en el siguiente vaciado
+        """
+        if not self.async_enabled:
+            self._write([], counters)
+            return
+
+        with self._lock:
+            for hour, hour_counters in counters.items():
+                self._analysis_counters[hour].update(hour_counters)
+
+        self._flusher.ensure_started()
+
+    def flush(self) -> int:
+        """
+        Persistir todos los registros y contadores pendientes; devuelve
+        cuántos registros de uso se guardaron
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, []
+                counters, self._analysis_counters = self._analysis_counters, defaultdict(Counter)
+
+            if not pending and not counters:
+                return 0
+            return self._write(pending, counters)
+
+    def shutdown(self):
+        """
+        Vaciar el buffer al terminar el proceso
+        """
+        if self.flush_on_shutdown:
+            self.flush()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'async': self.async_enabled,
+                'pending': len(self._buffer),
+                'flushed': self._flushed,
+                'dropped': self._dropped,
+            }
+
+    def _write(self, records, analysis_counters=None) -> int:
+        try:
+            record_usage(records, analysis_counters)
+        except Exception as e:
+            logger.error(f"Error al guardar {len(records)} registros de uso: {str(e)}")
+            return 0
+
+        with self._lock:
+            self._flushed += len(records)
+        return len(records)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+            # Evitar un bucle caliente si llegan peticiones muy rápido
+            time.sleep(0.01)
+
+
+# Instancia global del registrador
+usage_recorder = UsageRecorder.from_settings()
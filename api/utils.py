@@ -0,0 +1,66 @@
+"""
+Utilidades de la API
+====================
+"""
+
+import os
+import threading
+from typing import Callable, Sequence
+
+
+def get_client_ip(request):
+    """
+    Obtener la IP del cliente
+    """
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip = x_forwarded_for.split(',')[0]
+    else:
+        ip = request.META.get('REMOTE_ADDR')
+    return ip
+
+
+def percentile(sorted_values: Sequence[float], p: float, ndigits: int = 3) -> float:
+    """
+    Percentil ``p`` (0-1, rango más cercano) de una lista ya ordenada;
+    0.0 si está vacía
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(p * len(sorted_values)))
+    return round(sorted_values[index], ndigits)
+
+
+class BackgroundThread:
+    """
+    Hilo daemon que se arranca al primer uso en cada proceso
+
+    Tras un fork (workers de gunicorn) el hilo del padre no existe: si el
+    hilo es de otro proceso o ha terminado, ``ensure_started`` lanza uno
+    nuevo.
+    """
+
+    def __init__(self, target: Callable, name: str, args: tuple = ()):
+        self.target = target
+        self.name = name
+        self.args = args
+
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def ensure_started(self):
+        if self.is_running():
+            return
+
+        with self._lock:
+            if self.is_running():
+                return
+
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self.target, args=self.args,
+                                            name=self.name, daemon=True)
+            self._thread.start()
@@ -6,25 +6,31 @@ Endpoints para la predicción y gestión del servicio de ML
 
 from django.shortcuts import render
 from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
-from django.views.decorators.csrf import csrf_exempt
-from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
-import json
 import logging
+import os
 from datetime import datetime
 
-from .models import NewsAnalysis, APIUsage, ModelInfo
+from .models import ModelInfo, NewsAnalysis
 from .serializers import (
-    NewsAnalysisRequestSerializer,
-    NewsAnalysisResponseSerializer,
     ModelInfoSerializer,
-    HealthCheckSerializer
+    NewsAnalysisRequestSerializer,
+    NewsAnalysisBatchRequestSerializer
 )
-from .ml_service import ml_service
+from . import metrics
+from .analysis_cache import analysis_cache
+from .bulk_scoring import stream_ndjson
+from .ml_service import is_ml_service_loaded, ml_service
+from .stats import get_usage_stats, record_analyses
+from .utils import get_client_ip
 
 logger = logging.getLogger(__name__)
 
@@ -59,23 +65,9 @@ def analyze_news(request):
     }
     """
     try:
-        # Registrar uso de la API
-        api_usage = APIUsage.objects.create(
-            endpoint='/api/analyze/',
-            method='POST',
-            ip_address=get_client_ip(request),
-            user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            response_status=500,  # Default, will be updated
-            response_time=0.0,    # Default, will be updated
-            timestamp=datetime.now()
-        )
-        
         # Validar datos de entrada
         serializer = NewsAnalysisRequestSerializer(data=request.data)
         if not serializer.is_valid():
-            api_usage.response_status = 400
-            api_usage.save()
-            
             return Response({
                 'status': 'error',
                 'message': 'Datos de entrada inválidos',
@@ -88,9 +80,6 @@ def analyze_news(request):
         
         # Verificar que el servicio ML esté listo
         if not ml_service.is_ready():
-            api_usage.response_status = 503
-            api_usage.save()
-            
             return Response({
                 'status': 'error',
                 'message': 'El servicio de análisis no está disponible temporalmente',
@@ -100,9 +89,6 @@ def analyze_news(request):
         # Validar el texto con el servicio ML
         is_valid, error_message = ml_service.validate_text(text)
         if not is_valid:
-            api_usage.response_status = 400
-            api_usage.save()
-            
             return Response({
                 'status': 'error',
                 'message': error_message,
@@ -114,43 +100,25 @@ def analyze_news(request):
             prediction_result = ml_service.predict(text)
             
             # Guardar análisis en la base de datos
-            news_analysis = NewsAnalysis.objects.create(
-                text=text[:1000],  # Limitar texto guardado
-                prediction=prediction_result['prediction'],
-                confidence=prediction_result['confidence'],
-                probability_real=prediction_result['probability_real'],
-                probability_fake=prediction_result['probability_fake'],
-                ip_address=get_client_ip(request)
-            )
+            with metrics.observe_stage('db_persist'):
+                news_analysis, = record_analyses([NewsAnalysis(
+                    text=text[:1000],  # Limitar texto guardado
+                    prediction=prediction_result['prediction'],
+                    confidence=prediction_result['confidence'],
+                    probability_real=prediction_result['probability_real'],
+                    probability_fake=prediction_result['probability_fake'],
+                    model_version=prediction_result['model_version'],
+                    ip_address=get_client_ip(request)
+                )])
+            cache_analyses([news_analysis])
             
             # Preparar respuesta
-            response_data = {
-                'analysis_id': str(news_analysis.id),
-                'prediction': prediction_result['prediction'],
-                'confidence': round(prediction_result['confidence'], 3),
-                'probabilities': {
-                    'real': round(prediction_result['probability_real'], 3),
-                    'fake': round(prediction_result['probability_fake'], 3)
-                },
-                'text_info': {
-                    'length': prediction_result['text_length'],
-                    'processed_length': prediction_result['processed_text_length']
-                },
-                'timestamp': prediction_result['timestamp'],
-                'status': 'success'
-            }
-            
-            # Finalizar registro de uso de API
-            api_usage.response_status = 200
-            api_usage.save()
+            response_data = build_analysis_response(news_analysis, prediction_result)
             
             logger.info(f"Análisis exitoso: {news_analysis.id}")
             return Response(response_data, status=status.HTTP_200_OK)
                 
         except Exception as e:
-            api_usage.response_status = 500
-            api_usage.save()
-            
             logger.error(f"Error en predicción: {str(e)}")
             return Response({
                 'status': 'error',
@@ -167,6 +135,152 @@ def analyze_news(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def analyze_news_batch(request):
+    """
+    Endpoint para analizar varias noticias en una sola petición
+    
+    POST /api/analyze/batch/
+    {
+        "texts": [
+            "Texto de la primera noticia",
+            "Texto de la segunda noticia"
+        ]
+    }
+    
+    Los resultados (y los errores por texto) se devuelven en el mismo
+    orden de entrada.
+    """
+    client_ip = get_client_ip(request)
+    
+    try:
+        # Validar datos de entrada
+        serializer = NewsAnalysisBatchRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'status': 'error',
+                'message': 'Datos de entrada inválidos',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        texts = serializer.validated_data['texts']
+        
+        # Verificar que el servicio ML esté listo
+        if not ml_service.is_ready():
+            return Response({
+                'status': 'error',
+                'message': 'El servicio de análisis no está disponible temporalmente',
+                'code': 'SERVICE_UNAVAILABLE'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        # Realizar predicciones en una sola llamada al modelo
+        try:
+            prediction_results = ml_service.predict_batch(texts)
+        except Exception as e:
+            logger.error(f"Error en predicción por lotes: {str(e)}")
+            return Response({
+                'status': 'error',
+                'message': 'Error interno en el análisis',
+                'code': 'PREDICTION_ERROR'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        # Guardar todos los análisis con un único INSERT por lotes
+        analyses = []
+        for text, prediction_result in zip(texts, prediction_results):
+            if 'error' in prediction_result:
+                analyses.append(None)
+                continue
+            
+            analyses.append(NewsAnalysis(
+                text=text[:1000],  # Limitar texto guardado
+                prediction=prediction_result['prediction'],
+                confidence=prediction_result['confidence'],
+                probability_real=prediction_result['probability_real'],
+                probability_fake=prediction_result['probability_fake'],
+                model_version=prediction_result['model_version'],
+                ip_address=client_ip
+            ))
+        
+        with metrics.observe_stage('db_persist'):
+            created = record_analyses([a for a in analyses if a is not None])
+        cache_analyses(created)
+        
+        # Preparar respuesta en el orden de entrada
+        results = []
+        for index, (analysis, prediction_result) in enumerate(zip(analyses, prediction_results)):
+            if analysis is None:
+                results.append({
+                    'index': index,
+                    'status': 'error',
+                    'message': prediction_result['error'],
+                    'code': prediction_result['code']
+                })
+                continue
+            
+            results.append({
+                'index': index,
+                **build_analysis_response(analysis, prediction_result)
+            })
+        
+        successful = sum(1 for a in analyses if a is not None)
+        logger.info(f"Análisis por lotes exitoso: {successful}/{len(texts)} textos")
+        return Response({
+            'status': 'success',
+            'total': len(texts),
+            'successful': successful,
+            'failed': len(texts) - successful,
+            'results': results
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f"Error general en analyze_news_batch: {str(e)}")
+        return Response({
+            'status': 'error',
+            'message': 'Error interno del servidor',
+            'code': 'INTERNAL_ERROR'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def analyze_news_stream(request):
+    """
+    Endpoint para puntuar archivos grandes en streaming
+    
+    POST /api/analyze/stream/
+    Content-Type: application/x-ndjson
+    
+    {"id": "nota-1", "text": "Texto de la primera noticia"}
+    {"id": "nota-2", "text": "Texto de la segunda noticia"}
+    
+    La entrada se procesa en bloques de ``STREAM_CHUNK_SIZE`` líneas y los
+    resultados se devuelven como NDJSON a medida que se calculan (ver
+    ``api.bulk_scoring``). Los análisis no se guardan en la base de datos.
+    
+    Con workers síncronos la petición ocupa un worker hasta el final y
+    gunicorn la corta a los ``GUNICORN_TIMEOUT`` segundos, así que se
+    admiten como mucho ``STREAM_MAX_LINES`` líneas; los trabajos mayores
+    van por ``manage.py score_ndjson``.
+    """
+    if not ml_service.is_ready():
+        return Response({
+            'status': 'error',
+            'message': 'El servicio de análisis no está disponible temporalmente',
+            'code': 'SERVICE_UNAVAILABLE'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    
+    # Leer el cuerpo línea a línea sin cargarlo entero en memoria
+    lines = request.stream or []
+    chunk_size = settings.ML_CONFIG.get('STREAM_CHUNK_SIZE', 256)
+    max_lines = settings.ML_CONFIG.get('STREAM_MAX_LINES', 0)
+    
+    return StreamingHttpResponse(
+        stream_ndjson(ml_service, lines, chunk_size, max_lines),
+        content_type='application/x-ndjson; charset=utf-8'
+    )
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_analysis(request, analysis_id):
@@ -174,23 +288,14 @@ def get_analysis(request, analysis_id):
     Obtener resultado de un análisis específico
     
     GET /api/analysis/{analysis_id}/
+    
+    Se sirve desde la caché de análisis (ver ``api.analysis_cache``) con
+    ``ETag`` y ``Cache-Control``; admite ``If-None-Match``.
     """
     try:
-        analysis = NewsAnalysis.objects.get(id=analysis_id)
+        entry = load_stored_analysis(analysis_id)
         
-        response_data = {
-            'analysis_id': str(analysis.id),
-            'prediction': analysis.prediction,
-            'confidence': analysis.confidence,
-            'probabilities': {
-                'real': analysis.probability_real,
-                'fake': analysis.probability_fake
-            },
-            'created_at': analysis.created_at.isoformat(),
-            'status': 'success'
-        }
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+        return stored_analysis_response(request, entry, Response)
         
     except NewsAnalysis.DoesNotExist:
         return Response({
@@ -214,24 +319,33 @@ def model_info(request):
     Obtener información del modelo ML
     
     GET /api/model/info/
+    
+    La respuesta se prepara al cargar el modelo (ver ``api.model_metadata``)
+    y se sirve desde memoria, sin consultar la base de datos. Lleva ``ETag``
+    y admite ``If-None-Match``. Si el modelo no está cargado se devuelve el
+    último registro activo de ``ModelInfo`` (503 si no hay ninguno).
     """
     try:
-        model_data = ml_service.get_model_info()
+        if not ml_service.is_ready() or ml_service.model_info_response is None:
+            stored = ModelInfo.objects.filter(is_active=True).order_by('-created_at').first()
+            if stored is not None:
+                return Response(ModelInfoSerializer(stored).data, status=status.HTTP_200_OK)
+            
+            return Response({
+                'status': 'error',
+                'message': 'Información del modelo no disponible',
+                'code': 'SERVICE_UNAVAILABLE'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         
-        # Actualizar o crear información del modelo en BD
-        model_info_obj, created = ModelInfo.objects.get_or_create(
-            model_name=model_data.get('model_name', 'default'),
-            defaults={
-                'version': '1.0.0',
-                'accuracy': model_data.get('metrics', {}).get('accuracy', 0.0),
-                'f1_score': model_data.get('metrics', {}).get('f1_score', 0.0),
-                'training_date': datetime.now(),
-                'is_active': model_data.get('model_loaded', False)
-            }
-        )
+        body, etag = ml_service.model_info_response
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type='application/json')
         
-        serializer = ModelInfoSerializer(model_info_obj)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Cambia al recargar el modelo: revalidar siempre (barato con el ETag)
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
         
     except Exception as e:
         logger.error(f"Error al obtener info del modelo: {str(e)}")
@@ -242,6 +356,65 @@ def model_info(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def reload_model(request):
+    """
+    Recargar el modelo en caliente (solo administradores)
+    
+    POST /api/model/reload/
+    
+    La recarga se hace en segundo plano en el worker que atiende la
+    petición; el resultado aparece en ``model_reload`` del health check.
+    Para recargar todos los workers, usar ``MODEL_RELOAD_INTERVAL`` o la
+    señal ``MODEL_RELOAD_SIGNAL``.
+    """
+    started = ml_service.request_reload()
+    
+    return Response({
+        'status': 'accepted' if started else 'in_progress',
+        'model_version': ml_service.model_version,
+        'worker_pid': os.getpid()
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def pipeline_profile(request):
+    """
+    Tiempos por etapa del pipeline medidos por el perfilador (solo administradores)
+    
+    GET /api/debug/profile/
+    GET /api/debug/profile/?download=<nombre>  (archivo .prof de una muestra lenta)
+    
+    Los datos son los del worker que atiende la petición (``worker_pid``).
+    """
+    profiler = ml_service.profiler
+    if profiler is None:
+        return Response({
+            'status': 'disabled',
+            'message': 'Perfilado desactivado (PROFILE_SAMPLE_RATE=0)',
+            'worker_pid': os.getpid()
+        })
+    
+    name = request.query_params.get('download')
+    if name:
+        path = profiler.profile_path(name)
+        if path is None:
+            return Response({
+                'status': 'error',
+                'message': 'Perfil no encontrado en este worker',
+                'code': 'NOT_FOUND'
+            }, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
+    
+    return Response({
+        'status': 'success',
+        'worker_pid': os.getpid(),
+        **profiler.get_stats()
+    })
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def health_check(request):
@@ -251,17 +424,7 @@ def health_check(request):
     GET /api/health/
     """
     try:
-        health_data = ml_service.get_health_status()
-        
-        # Añadir información adicional
-        health_data.update({
-            'database_connected': True,  # Si llega aquí, la BD está conectada
-            'api_version': '1.0.0',
-            'environment': 'production' if not settings.DEBUG else 'development'
-        })
-        
-        # Determinar código de estado HTTP
-        http_status = status.HTTP_200_OK if health_data['service_status'] == 'healthy' else status.HTTP_503_SERVICE_UNAVAILABLE
+        health_data, http_status = build_health_response()
         
         return Response(health_data, status=http_status)
         
@@ -281,33 +444,13 @@ def api_stats(request):
     Estadísticas de uso de la API
     
     GET /api/stats/
+    
+    Se calculan sobre los contadores por hora de HourlyStats, no sobre
+    las tablas de análisis y uso completas.
     """
     try:
-        from django.db.models import Count, Q
-        from datetime import timedelta
-        from django.utils import timezone
-        
-        now = timezone.now()
-        today = now.date()
-        week_ago = now - timedelta(days=7)
-        
-        stats = {
-            'total_analyses': NewsAnalysis.objects.count(),
-            'total_api_calls': APIUsage.objects.count(),
-            'analyses_today': NewsAnalysis.objects.filter(created_at__date=today).count(),
-            'analyses_last_week': NewsAnalysis.objects.filter(created_at__gte=week_ago).count(),
-            'predictions_by_result': {
-                'fake': NewsAnalysis.objects.filter(prediction='FALSA').count(),
-                'real': NewsAnalysis.objects.filter(prediction='VERDADERA').count()
-            },
-            'api_calls_by_status': {
-                'success': APIUsage.objects.filter(response_status=200).count(),
-                'client_error': APIUsage.objects.filter(response_status__gte=400, response_status__lt=500).count(),
-                'server_error': APIUsage.objects.filter(response_status__gte=500).count()
-            },
-            'model_status': ml_service.is_ready(),
-            'timestamp': now.isoformat()
-        }
+        stats = get_usage_stats()
+        stats['model_status'] = ml_service.is_ready()
         
         return Response(stats, status=status.HTTP_200_OK)
         
@@ -320,16 +463,146 @@ def api_stats(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-def get_client_ip(request):
+def build_analysis_response(news_analysis, prediction_result):
+    """
+    Respuesta de un análisis recién creado
     """
-    Obtener la IP del cliente
+    return {
+        'analysis_id': str(news_analysis.id),
+        'prediction': prediction_result['prediction'],
+        'confidence': round(prediction_result['confidence'], 3),
+        'probabilities': {
+            'real': round(prediction_result['probability_real'], 3),
+            'fake': round(prediction_result['probability_fake'], 3)
+        },
+        'text_info': {
+            'length': prediction_result['text_length'],
+            'processed_length': prediction_result['processed_text_length']
+        },
+        'model_version': prediction_result['model_version'],
+        'timestamp': prediction_result['timestamp'],
+        'status': 'success'
+    }
+
+
+@require_GET
+def metrics_endpoint(request):
+    """
+    Métricas en formato de exposición de Prometheus (ver ``api.metrics``)
+    
+    GET /metrics
+    
+    Si ``METRICS_TOKEN`` está definido se exige ``Authorization: Bearer <token>``.
+    """
+    token = settings.METRICS.get('TOKEN')
+    if token and not constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    
+    body, content_type = metrics.render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
+# Columnas que necesita la respuesta de un análisis guardado (sin el texto)
+STORED_ANALYSIS_FIELDS = [
+    'id', 'prediction', 'confidence', 'probability_real', 'probability_fake',
+    'model_version', 'created_at',
+]
+
+
+def build_stored_analysis_response(analysis):
     """
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
+    Respuesta de un análisis guardado
+    """
+    return {
+        'analysis_id': str(analysis.id),
+        'prediction': analysis.prediction,
+        'confidence': analysis.confidence,
+        'probabilities': {
+            'real': analysis.probability_real,
+            'fake': analysis.probability_fake
+        },
+        'model_version': analysis.model_version,
+        'created_at': analysis.created_at.isoformat(),
+        'status': 'success'
+    }
+
+
+def active_model_version():
+    """
+    Versión del modelo activo del worker, sin forzar la carga del servicio
+    """
+    return ml_service.model_version if is_ml_service_loaded() else None
+
+
+def cache_analyses(analyses):
+    """
+    Guardar en la caché las respuestas de análisis recién creados
+    """
+    analysis_cache.set_many({
+        str(analysis.id): build_stored_analysis_response(analysis) for analysis in analyses
+    }, active_model_version())
+
+
+def load_stored_analysis(analysis_id):
+    """
+    Entrada de la caché de un análisis; si no está, se lee de la base de
+    datos (solo las columnas de la respuesta) y se guarda
+    
+    Raises:
+        NewsAnalysis.DoesNotExist: Si el análisis no existe
+    """
+    model_version = active_model_version()
+    entry = analysis_cache.get(analysis_id, model_version)
+    if entry is None:
+        analysis = NewsAnalysis.objects.only(*STORED_ANALYSIS_FIELDS).get(id=analysis_id)
+        entry = analysis_cache.set(
+            str(analysis.id), build_stored_analysis_response(analysis), model_version
+        )
+    return entry
+
+
+def stored_analysis_response(request, entry, response_class):
+    """
+    Respuesta de un análisis guardado con ``ETag`` y ``Cache-Control``
+    (304 si el cliente ya tiene la misma versión)
+    
+    Solo los análisis del modelo activo se pueden guardar en cachés
+    compartidas (``public, max-age``); los de otras versiones puede
+    cambiarlos ``rescore_analyses`` y se sirven con ``no-cache``, que obliga
+    a revalidar con el ``ETag``.
+    """
+    response = get_conditional_response(request, etag=entry['etag'])
+    if response is None:
+        response = response_class(entry['body'])
+    
+    response['ETag'] = entry['etag']
+    model_version = active_model_version()
+    if model_version is not None and entry['body'].get('model_version') == model_version:
+        patch_cache_control(response, public=True, max_age=analysis_cache.max_age)
     else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def build_health_response():
+    """
+    Datos del health check y su código de estado HTTP
+    """
+    health_data = ml_service.get_health_status()
+    
+    # Añadir información adicional
+    health_data.update({
+        'database_connected': True,  # Si llega aquí, la BD está conectada
+        'api_version': '1.0.0',
+        'environment': 'production' if not settings.DEBUG else 'development'
+    })
+    
+    # Determinar código de estado HTTP
+    http_status = status.HTTP_200_OK if health_data['service_status'] == 'healthy' else status.HTTP_503_SERVICE_UNAVAILABLE
+    
+    return health_data, http_status
 
 
 # Vistas adicionales para la interfaz web (opcional)
@@ -348,6 +621,19 @@ def api_documentation(request):
                     'metadata': {'source': 'ejemplo'}
                 }
             },
+            {
+                'url': '/api/analyze/batch/',
+                'method': 'POST',
+                'description': 'Analizar varias noticias en una sola petición',
+                'example': {
+                    'texts': ['Texto de la primera noticia...', 'Texto de la segunda noticia...']
+                }
+            },
+            {
+                'url': '/api/analyze/stream/',
+                'method': 'POST',
+                'description': 'Puntuar un archivo NDJSON (un objeto {"id", "text"} por línea) con respuesta NDJSON en streaming'
+            },
             {
                 'url': '/api/analysis/{id}/',
                 'method': 'GET',
@@ -358,6 +644,16 @@ def api_documentation(request):
                 'method': 'GET',
                 'description': 'Información del modelo de ML'
             },
+            {
+                'url': '/api/model/reload/',
+                'method': 'POST',
+                'description': 'Recargar el modelo en caliente (solo administradores)'
+            },
+            {
+                'url': '/api/debug/profile/',
+                'method': 'GET',
+                'description': 'Tiempos por etapa del pipeline (solo administradores)'
+            },
             {
                 'url': '/api/health/',
                 'method': 'GET',
@@ -367,6 +663,11 @@ def api_documentation(request):
                 'url': '/api/stats/',
                 'method': 'GET',
                 'description': 'Estadísticas de uso'
+            },
+            {
+                'url': '/metrics',
+                'method': 'GET',
+                'description': 'Métricas en formato Prometheus'
             }
         ],
         'model_status': ml_service.is_ready()
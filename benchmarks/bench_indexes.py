@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Índices de Base de Datos
+=====================================
+Compara los planes de consulta y tiempos de las rutas calientes sobre
+NewsAnalysis y APIUsage antes y después de la migración
+0005_hot_path_indexes, con tablas sembradas de varios millones de filas.
+
+Uso:
+    python benchmarks/bench_indexes.py --rows 2000000
+    python benchmarks/bench_indexes.py --database-url postgres://.../scratch_db
+
+Sin --database-url se usa una base SQLite temporal. Con PostgreSQL la base
+indicada debe ser desechable: el script la migra y la llena de datos.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+BEFORE_MIGRATION = '0004_hourlystats'
+AFTER_MIGRATION = '0005_hot_path_indexes'
+
+
+def setup_django(database_url):
+    """
+    Configurar Django apuntando a la base de datos del benchmark
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fakenews_api.settings')
+
+    import dj_database_url
+    from django.conf import settings
+
+    if database_url:
+        settings.DATABASES['default'] = dj_database_url.parse(database_url)
+    else:
+        db_path = Path(tempfile.mkdtemp()) / 'bench_indexes.sqlite3'
+        settings.DATABASES['default'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': db_path,
+        }
+        print(f"🗄️  Base SQLite temporal: {db_path}")
+
+    import django
+    django.setup()
+
+
+def insert_rows(model, columns, rows):
+    from django.db import connection
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = ', '.join(connection.ops.quote_name(c) for c in columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    with connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {table} ({names}) VALUES ({placeholders})", rows)
+
+
+def seed(rows, days, chunk_size=50000):
+    """
+    Sembrar NewsAnalysis y APIUsage con ``rows`` filas cada una
+    """
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from api.models import APIUsage, NewsAnalysis
+
+    ops = connection.ops
+    uuid_field = NewsAnalysis._meta.get_field('id')
+    now = timezone.now()
+    span = days * 24 * 3600
+    endpoints = [
+        '/api/analyze/', '/api/analyze/batch/', '/api/analysis/<uuid:analysis_id>/',
+        '/api/stats/', '/api/health/', '/api/model/info/',
+    ]
+    statuses = [200] * 90 + [400] * 5 + [404] * 2 + [429] + [500] * 2
+
+    analysis_columns = [
+        'id', 'text', 'prediction', 'confidence', 'probability_fake',
+        'probability_real', 'ip_address', 'user_agent', 'created_at', 'updated_at',
+    ]
+    usage_columns = [
+        'endpoint', 'method', 'ip_address', 'user_agent', 'response_status',
+        'response_time', 'inference_time', 'db_time', 'timestamp',
+    ]
+
+    rng = random.Random(42)
+    started_at = time.perf_counter()
+    for offset in range(0, rows, chunk_size):
+        count = min(chunk_size, rows - offset)
+        analyses = []
+        usage = []
+        for _ in range(count):
+            created_at = ops.adapt_datetimefield_value(now - timedelta(seconds=rng.uniform(0, span)))
+            prob_fake = rng.random()
+            analyses.append((
+                uuid_field.get_db_prep_value(uuid.uuid4(), connection),
+                'Texto de prueba para el benchmark de índices',
+                'FALSA' if prob_fake > 0.5 else 'VERDADERA',
+                max(prob_fake, 1 - prob_fake), prob_fake, 1 - prob_fake,
+                '127.0.0.1', 'bench', created_at, created_at,
+            ))
+
+            timestamp = ops.adapt_datetimefield_value(now - timedelta(seconds=rng.uniform(0, span)))
+            usage.append((
+                rng.choice(endpoints), 'POST', '127.0.0.1', 'bench',
+                rng.choice(statuses), rng.uniform(1, 200), rng.uniform(0, 50),
+                rng.uniform(0, 20), timestamp,
+            ))
+
+        with transaction.atomic():
+            insert_rows(NewsAnalysis, analysis_columns, analyses)
+            insert_rows(APIUsage, usage_columns, usage)
+
+        done = offset + count
+        rate = done / (time.perf_counter() - started_at)
+        print(f"\r🌱 Sembrando: {done:,}/{rows:,} filas por tabla ({rate:,.0f} filas/s)", end='', flush=True)
+    print()
+
+
+def hot_queries():
+    """
+    Consultas representativas de las rutas calientes (nombre, callable)
+    """
+    from django.db.models import Avg
+    from django.utils import timezone
+
+    from api.models import APIUsage, NewsAnalysis
+
+    now = timezone.now()
+    today_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    day_ago = now - timedelta(days=1)
+    week_ago = now - timedelta(days=7)
+
+    return [
+        ('analyses_today',
+         lambda: NewsAnalysis.objects.filter(created_at__gte=today_start).count()),
+        ('analyses_last_week',
+         lambda: NewsAnalysis.objects.filter(created_at__gte=week_ago).count()),
+        ('fake_last_week',
+         lambda: NewsAnalysis.objects.filter(prediction='FALSA', created_at__gte=week_ago).count()),
+        ('latest_analyses',
+         lambda: list(NewsAnalysis.objects.values_list('id', flat=True)[:20])),
+        ('server_errors_last_day',
+         lambda: APIUsage.objects.filter(response_status__gte=500, timestamp__gte=day_ago).count()),
+        ('client_errors_last_day',
+         lambda: APIUsage.objects.filter(
+             response_status__gte=400, response_status__lt=500, timestamp__gte=day_ago
+         ).count()),
+        ('analyze_latency_last_day',
+         lambda: APIUsage.objects.filter(
+             endpoint='/api/analyze/', timestamp__gte=day_ago
+         ).aggregate(avg=Avg('response_time'))),
+        ('latest_usage',
+         lambda: list(APIUsage.objects.values_list('id', flat=True)[:20])),
+    ]
+
+
+def explain(sql):
+    from django.db import connection
+
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        rows = cursor.fetchall()
+
+    if connection.vendor == 'sqlite':
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def run_queries(repeat):
+    """
+    Ejecutar cada consulta ``repeat`` veces y capturar su plan
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    results = {}
+    for name, query in hot_queries():
+        with CaptureQueriesContext(connection) as captured:
+            query()
+        sql = captured.captured_queries[-1]['sql']
+
+        timings = []
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            query()
+            timings.append((time.perf_counter() - started_at) * 1000)
+
+        results[name] = {
+            'median_ms': round(statistics.median(timings), 3),
+            'plan': explain(sql),
+        }
+    return results
+
+
+def analyze_tables():
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def print_report(before, after):
+    print()
+    print("=" * 78)
+    print(f"{'Consulta':<28}{'Antes (ms)':>14}{'Después (ms)':>16}{'Mejora':>10}")
+    print("=" * 78)
+    for name in before:
+        b = before[name]['median_ms']
+        a = after[name]['median_ms']
+        speedup = f"{b / a:.1f}x" if a else '-'
+        print(f"{name:<28}{b:>14.3f}{a:>16.3f}{speedup:>10}")
+
+    print()
+    for name in before:
+        print(f"📋 {name}")
+        for line in before[name]['plan']:
+            print(f"   antes:   {line}")
+        for line in after[name]['plan']:
+            print(f"   después: {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de índices de la API')
+    parser.add_argument('--rows', type=int, default=2_000_000,
+                        help='Filas por tabla (default: 2000000)')
+    parser.add_argument('--days', type=int, default=365,
+                        help='Días de historia simulada (default: 365)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Repeticiones por consulta (default: 5)')
+    parser.add_argument('--database-url', default=None,
+                        help='Base de datos desechable (default: SQLite temporal)')
+    parser.add_argument('--output', default=None,
+                        help='Guardar resultados en un archivo JSON')
+    args = parser.parse_args()
+
+    setup_django(args.database_url)
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command('migrate', 'api', BEFORE_MIGRATION, verbosity=0)
+    seed(args.rows, args.days)
+
+    analyze_tables()
+    print(f"⏱️  Consultas sin índices ({connection.vendor})...")
+    before = run_queries(args.repeat)
+
+    started_at = time.perf_counter()
+    call_command('migrate', 'api', AFTER_MIGRATION, verbosity=0)
+    print(f"🔧 Índices creados en {time.perf_counter() - started_at:.1f}s")
+
+    analyze_tables()
+    print("⏱️  Consultas con índices...")
+    after = run_queries(args.repeat)
+
+    print_report(before, after)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'vendor': connection.vendor,
+                'rows': args.rows,
+                'before': before,
+                'after': after,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Prueba de Carga de la API
+=========================
+Envía peticiones concurrentes a un servidor local y mide throughput y
+latencias (p50/p95/p99) de cada escenario:
+
+- ``analyze``: ``POST /api/analyze/`` con textos distintos (sin aciertos
+  de la caché de predicciones, salvo con ``--repeat``)
+- ``analysis``: ``GET /api/analysis/<id>/`` de análisis creados al empezar
+- ``stats``: ``GET /api/stats/``
+
+Cada escenario se ejecuta con cada nivel de ``--concurrency`` durante
+``--duration`` segundos (tras ``--warmup`` segundos que no se miden). Los
+resultados se guardan en JSON; con ``--compare`` se comparan con una
+ejecución anterior y el script termina con código 1 si hay una regresión
+mayor que ``--max-regression``.
+
+Solo se ejecuta contra ``localhost`` o una IP de loopback: cada petición
+de ``analyze`` guarda un análisis en la base de datos del servidor y la
+carga generada puede afectar a un entorno real. Para otro servidor hay que
+indicarlo explícitamente con ``--allow-remote``.
+
+El servidor debe arrancarse con límites de peticiones altos (los dos
+throttles de DRF se aplican también a los clientes anónimos), por ejemplo::
+
+    THROTTLE_RATE_ANON=1000000/hour THROTTLE_RATE_USER=1000000/hour \
+        gunicorn fakenews_api.wsgi:application -c gunicorn.conf.py
+
+Para separar el coste del modelo del de la capa web, ver
+``benchmarks/bench_predict.py``.
+
+Uso:
+    python benchmarks/bench_load.py --url http://localhost:8000
+    python benchmarks/bench_load.py --concurrency 1 8 32 --duration 20
+    python benchmarks/bench_load.py --scenarios analyze --output base.json
+    python benchmarks/bench_load.py --compare base.json --max-regression 15
+    python benchmarks/bench_load.py --url http://staging:8000 --allow-remote
+"""
+
+import argparse
+import ipaddress
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from api.utils import percentile  # noqa: E402
+
+SCENARIOS = ['analyze', 'analysis', 'stats']
+
+SUBJECTS = ['El gobierno', 'Un grupo de científicos', 'La alcaldía', 'El banco central',
+            'Expertos anónimos', 'La organización mundial de la salud', 'Un estudio']
+ACTIONS = ['anunció', 'confirmó', 'desmintió', 'reveló', 'advirtió sobre', 'publicó']
+OBJECTS = ['nuevas medidas económicas contra la inflación',
+           'microchips en el agua del grifo para controlar mentes',
+           'una nueva especie de dinosaurio en la patagonia',
+           'una cura milagrosa que los médicos ocultan',
+           'el aumento del presupuesto para la educación pública',
+           'un plan secreto para cambiar el clima con aviones']
+
+
+def make_texts():
+    """
+    Textos de noticia distintos e infinitos (cada uno con un número propio)
+    """
+    for number in itertools.count(1):
+        yield (f"{random.choice(SUBJECTS)} {random.choice(ACTIONS)} {random.choice(OBJECTS)} "
+               f"según el informe número {number} publicado esta semana")
+
+
+def latency_summary(latencies_ms):
+    """
+    Percentiles (rango más cercano), media y máximo de una lista de latencias en ms
+    """
+    values = sorted(latencies_ms)
+    if not values:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'mean': 0.0, 'max': 0.0}
+
+    return {
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99),
+        'mean': round(sum(values) / len(values), 3),
+        'max': round(values[-1], 3),
+    }
+
+
+class LoadRunner:
+    """
+    Hilos que repiten las peticiones de un escenario hasta agotar el tiempo
+    """
+
+    def __init__(self, base_url, timeout=30.0, repeat=0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.analysis_ids = []
+
+        texts = make_texts()
+        if repeat:
+            # Un conjunto fijo de textos: mide el camino con caché
+            fixed = [next(texts) for _ in range(repeat)]
+            texts = itertools.cycle(fixed)
+        self._texts = texts
+        self._texts_lock = threading.Lock()
+
+    def next_text(self):
+        with self._texts_lock:
+            return next(self._texts)
+
+    def request(self, session, scenario):
+        if scenario == 'analyze':
+            return session.post(f"{self.base_url}/api/analyze/",
+                                json={'text': self.next_text()}, timeout=self.timeout)
+        if scenario == 'analysis':
+            analysis_id = random.choice(self.analysis_ids)
+            return session.get(f"{self.base_url}/api/analysis/{analysis_id}/", timeout=self.timeout)
+        return session.get(f"{self.base_url}/api/stats/", timeout=self.timeout)
+
+    def seed_analyses(self, count):
+        """
+        Crear los análisis que consulta el escenario ``analysis``
+        """
+        with requests.Session() as session:
+            for _ in range(count):
+                response = self.request(session, 'analyze')
+                if response.status_code == 200:
+                    self.analysis_ids.append(response.json()['analysis_id'])
+
+        if not self.analysis_ids:
+            raise RuntimeError('No se pudo crear ningún análisis (¿servidor con throttling?)')
+
+    def run(self, scenario, concurrency, duration, warmup):
+        """
+        Ejecutar un escenario y devolver sus métricas
+        """
+        measure_from = time.perf_counter() + warmup
+        deadline = measure_from + duration
+        samples = [[] for _ in range(concurrency)]
+        statuses = [Counter() for _ in range(concurrency)]
+
+        def worker(index):
+            with requests.Session() as session:
+                while True:
+                    started_at = time.perf_counter()
+                    if started_at >= deadline:
+                        return
+                    try:
+                        code = self.request(session, scenario).status_code
+                    except requests.RequestException as e:
+                        code = type(e).__name__
+                    finished_at = time.perf_counter()
+
+                    if started_at >= measure_from and finished_at <= deadline:
+                        samples[index].append((finished_at - started_at) * 1000)
+                        statuses[index][str(code)] += 1
+
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        latencies = [value for worker_samples in samples for value in worker_samples]
+        status_counts = sum(statuses, Counter())
+        errors = sum(count for code, count in status_counts.items()
+                     if not code.isdigit() or int(code) >= 400)
+
+        return {
+            'scenario': scenario,
+            'concurrency': concurrency,
+            'duration_s': duration,
+            'requests': len(latencies),
+            'errors': errors,
+            'throughput_rps': round(len(latencies) / duration, 2),
+            'latency_ms': latency_summary(latencies),
+            'status_codes': dict(sorted(status_counts.items())),
+        }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def is_local_url(url):
+    """
+    Si la URL apunta a esta máquina (``localhost`` o una IP de loopback)
+    """
+    host = urlsplit(url).hostname or ''
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def compare(results, baseline_path, max_regression):
+    """
+    Comparar con una ejecución anterior; devuelve las regresiones encontradas
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['scenario'], r['concurrency']): r for r in json.load(f)['results']}
+
+    print()
+    print(f"Comparación con {baseline_path} (regresión máxima {max_regression:.0f}%):")
+    regressions = []
+    for result in results:
+        key = (result['scenario'], result['concurrency'])
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+
+        rps_change = _change(previous['throughput_rps'], result['throughput_rps'])
+        p95_change = _change(previous['latency_ms']['p95'], result['latency_ms']['p95'])
+        print(f"  {key[0]:<9} c={key[1]:<4} req/s {rps_change:+7.1f}%   p95 {p95_change:+7.1f}%")
+
+        if rps_change < -max_regression:
+            regressions.append(f"{key[0]} c={key[1]}: req/s {rps_change:+.1f}%")
+        if p95_change > max_regression:
+            regressions.append(f"{key[0]} c={key[1]}: p95 {p95_change:+.1f}%")
+    return regressions
+
+
+def _change(before, after):
+    return (after - before) / before * 100 if before else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga de la API')
+    parser.add_argument('--url', default='http://localhost:8000', help='URL base de la API')
+    parser.add_argument('--allow-remote', action='store_true',
+                        help='Permitir una URL que no sea local (guarda análisis en ese servidor)')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16],
+                        help='Clientes simultáneos (uno o varios niveles)')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='Segundos medidos por escenario y nivel')
+    parser.add_argument('--warmup', type=float, default=2.0,
+                        help='Segundos iniciales que no se miden')
+    parser.add_argument('--seed-analyses', type=int, default=50,
+                        help='Análisis creados para el escenario analysis')
+    parser.add_argument('--repeat', type=int, default=0,
+                        help='Reutilizar N textos fijos en analyze (0 = siempre distintos)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Timeout por petición (s)')
+    parser.add_argument('--output', help='Archivo JSON de resultados '
+                        '(por defecto benchmarks/results/load-<fecha>.json)')
+    parser.add_argument('--compare', help='JSON de una ejecución anterior para comparar')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='Porcentaje de empeoramiento de req/s o p95 que se considera regresión')
+    args = parser.parse_args()
+
+    if not is_local_url(args.url) and not args.allow_remote:
+        print(f"❌ {args.url} no es un servidor local; usa --allow-remote si es intencionado")
+        sys.exit(2)
+
+    runner = LoadRunner(args.url, timeout=args.timeout, repeat=args.repeat)
+    try:
+        requests.get(f"{runner.base_url}/api/health/", timeout=args.timeout)
+        if 'analysis' in args.scenarios:
+            runner.seed_analyses(args.seed_analyses)
+    except (requests.RequestException, RuntimeError) as e:
+        print(f"❌ No se puede usar el servidor en {args.url}: {e}")
+        sys.exit(1)
+
+    print(f"{'escenario':<9} {'conc':>5} {'req':>7} {'err':>5} {'req/s':>9} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    results = []
+    for scenario in args.scenarios:
+        for concurrency in args.concurrency:
+            result = runner.run(scenario, concurrency, args.duration, args.warmup)
+            results.append(result)
+            latency = result['latency_ms']
+            print(f"{scenario:<9} {concurrency:>5} {result['requests']:>7} {result['errors']:>5} "
+                  f"{result['throughput_rps']:>9.1f} {latency['p50']:>9.2f} {latency['p95']:>9.2f} "
+                  f"{latency['p99']:>9.2f}")
+
+    output = args.output or str(
+        BASE_DIR / 'benchmarks' / 'results' / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {
+                'url': args.url,
+                'timestamp': datetime.now().isoformat(),
+                'git_commit': git_commit(),
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count(),
+                'duration_s': args.duration,
+                'warmup_s': args.warmup,
+                'repeat': args.repeat,
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"\nResultados guardados en {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.max_regression)
+        if regressions:
+            print()
+            for regression in regressions:
+                print(f"❌ Regresión: {regression}")
+            sys.exit(1)
+        print("✅ Sin regresiones")
+
+
+if __name__ == '__main__':
+    main()
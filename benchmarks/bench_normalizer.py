@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark del Normalizador de Texto
+===================================
+Compara ``api.text_normalizer.normalize_text`` con el preprocesamiento
+original de ``FakeNewsDetectorService.preprocess_text`` para distintas
+longitudes de texto, y verifica que ambas salidas sean idénticas.
+
+Uso:
+    python benchmarks/bench_normalizer.py
+    python benchmarks/bench_normalizer.py --lengths 100 1000 5000 --number 2000
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from api.text_normalizer import normalize_text  # noqa: E402
+
+SAMPLE = (
+    "  El Gobierno ANUNCIÓ hoy, 12 de marzo, nuevas medidas económicas!!! "
+    "¿Será cierto?   Según \"expertos\" anónimos: el agua del grifo contiene "
+    "microchips (¡increíble!)\t\tpara controlar nuestras mentes... "
+    "Más información en https://ejemplo.com/noticia?id=42 #fakenews @usuario\n"
+)
+
+ALPHABET = (
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    "áéíóúüñÁÉÍÓÚÜÑçÇàèß_"
+    " \t\n\r\x0b\x0c  "
+    ".,;:!?¡¿\"'()[]{}<>@#$%&*+-=/\\|~^`€£©®°…–—“”«»"
+    "İΣß中文🙂́"
+)
+
+
+def legacy_preprocess_text(text: str) -> str:
+    """
+    Implementación original de preprocess_text (referencia)
+    """
+    text = text.strip()
+    text = text.lower()
+    import re
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\sáéíóúüñ]', ' ', text)
+    return text
+
+
+def make_text(length: int) -> str:
+    repeated = SAMPLE * (length // len(SAMPLE) + 1)
+    return repeated[:length]
+
+
+def check_equivalence(samples: int, seed: int = 42) -> None:
+    """
+    Comparar ambas implementaciones sobre textos aleatorios
+    """
+    rng = random.Random(seed)
+    for _ in range(samples):
+        text = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 300)))
+        expected = legacy_preprocess_text(text)
+        actual = normalize_text(text)
+        if expected != actual:
+            raise AssertionError(f"Salida distinta para {text!r}: {expected!r} != {actual!r}")
+
+    for length in (0, 10, 100, 1000, 5000):
+        text = make_text(length)
+        assert legacy_preprocess_text(text) == normalize_text(text)
+
+    print(f"✅ Salidas idénticas en {samples + 5} textos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del normalizador de texto')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[50, 200, 1000, 5000],
+                        help='Longitudes de texto a medir')
+    parser.add_argument('--number', type=int, default=5000,
+                        help='Ejecuciones por medición')
+    parser.add_argument('--samples', type=int, default=20000,
+                        help='Textos aleatorios para la verificación de equivalencia')
+    args = parser.parse_args()
+
+    check_equivalence(args.samples)
+
+    print()
+    print(f"{'Longitud':>10}{'Original (µs)':>16}{'Nuevo (µs)':>14}{'Mejora':>10}")
+    print("-" * 50)
+    for length in args.lengths:
+        text = make_text(length)
+        legacy = min(timeit.repeat(lambda: legacy_preprocess_text(text), number=args.number, repeat=5))
+        current = min(timeit.repeat(lambda: normalize_text(text), number=args.number, repeat=5))
+        legacy_us = legacy / args.number * 1e6
+        current_us = current / args.number * 1e6
+        print(f"{length:>10}{legacy_us:>16.2f}{current_us:>14.2f}{legacy_us / current_us:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de FakeNewsDetectorService.predict
+==================================================
+Mide en este proceso, sin servidor ni base de datos, el coste de cada
+parte de una predicción:
+
+- ``normalize``: solo el preprocesamiento del texto
+- ``predict_proba``: solo el modelo sobre un texto ya preprocesado
+- ``predict``: la predicción completa de una petición (sin caché)
+- ``predict_batch``: coste por texto de ``predict_batch`` con lotes de
+  ``--batch-size`` textos
+
+Comparado con la latencia de ``POST /api/analyze/`` en
+``benchmarks/bench_load.py``, la diferencia es el coste de la capa web
+(Django, DRF, base de datos).
+
+Uso:
+    python benchmarks/bench_predict.py
+    python benchmarks/bench_predict.py --iterations 5000 --batch-size 64
+    python benchmarks/bench_predict.py --output predict.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+# Sin caché de predicciones ni micro-batching: se mide el modelo en cada llamada
+os.environ['CACHE_PREDICTIONS'] = 'False'
+os.environ['MICRO_BATCHING'] = 'False'
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fakenews_api.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from bench_load import latency_summary, make_texts  # noqa: E402
+
+
+def measure(func, inputs):
+    """
+    Latencias en ms de ``func`` para cada entrada
+    """
+    latencies = []
+    for item in inputs:
+        started_at = time.perf_counter()
+        func(item)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark de predict')
+    parser.add_argument('--iterations', type=int, default=1000, help='Predicciones por medición')
+    parser.add_argument('--batch-size', type=int, default=32, help='Textos por lote en predict_batch')
+    parser.add_argument('--output', help='Guardar los resultados en este archivo JSON')
+    args = parser.parse_args()
+
+    from api.ml_service import ml_service
+
+    load_started_at = time.perf_counter()
+    if not ml_service.is_ready():
+        print("❌ El modelo no está disponible")
+        sys.exit(1)
+    load_time = time.perf_counter() - load_started_at
+
+    texts = list(itertools.islice(make_texts(), args.iterations))
+    processed = [ml_service.preprocess_text(text) for text in texts]
+
+    # Calentamiento (cachés de CPU, asignaciones de numpy)
+    for text in texts[:20]:
+        ml_service.predict(text)
+
+    results = {
+        'normalize': measure(ml_service.preprocess_text, texts),
+        'predict_proba': measure(lambda text: ml_service.predict_proba([text]), processed),
+        'predict': measure(ml_service.predict, texts),
+    }
+
+    batches = [texts[i:i + args.batch_size] for i in range(0, len(texts), args.batch_size)]
+    batch_latencies = measure(ml_service.predict_batch, batches)
+    results['predict_batch'] = [
+        latency / len(batch) for latency, batch in zip(batch_latencies, batches)
+    ]
+
+    print(f"Modelo {ml_service.model_version} (carga {load_time:.2f}s), "
+          f"{args.iterations} textos, backend {ml_service.inference_backend.name}")
+    print()
+    print(f"{'medición':<14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'media ms':>9} {'textos/s':>10}")
+    summary = {}
+    for name, latencies in results.items():
+        latency = latency_summary(latencies)
+        per_second = 1000 / latency['mean'] if latency['mean'] else 0.0
+        summary[name] = {'latency_ms': latency, 'per_second': round(per_second, 1)}
+        print(f"{name:<14} {latency['p50']:>9.3f} {latency['p95']:>9.3f} {latency['p99']:>9.3f} "
+              f"{latency['mean']:>9.3f} {per_second:>10.0f}")
+    print()
+    print(f"predict_batch: coste por texto con lotes de {args.batch_size}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'timestamp': datetime.now().isoformat(),
+                    'model_version': ml_service.model_version,
+                    'inference_backend': ml_service.inference_backend.name,
+                    'iterations': args.iterations,
+                    'batch_size': args.batch_size,
+                },
+                'results': summary,
+            }, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Presupuesto de Tiempo de Arranque
+=================================
+Mide cuánto tarda en arrancar un proceso que no sirve peticiones
+(``manage.py check``, que importa todas las URLs y vistas) y verifica que
+importar el proyecto no construye ``ml_service`` ni carga el modelo.
+
+Termina con código 1 si se supera el presupuesto o si el modelo se carga
+al importar, para poder usarlo en CI.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget 0.8 --runs 10 --top 15
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Se ejecuta en un proceso nuevo: importar el proyecto como lo haría un
+# comando de manage.py e informar de los tiempos
+CHILD_SCRIPT = f"""
+import json, os, sys, time
+sys.path.insert(0, {str(BASE_DIR)!r})
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fakenews_api.settings')
+started_at = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+import fakenews_api.urls
+urls_done = time.perf_counter()
+from api.ml_service import is_ml_service_loaded
+print(json.dumps({{
+    'setup': setup_done - started_at,
+    'urls': urls_done - setup_done,
+    'ml_service_loaded': is_ml_service_loaded(),
+}}))
+"""
+
+
+def run_child(extra_args=()):
+    result = subprocess.run(
+        [sys.executable, *extra_args, '-c', CHILD_SCRIPT],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def time_command(args):
+    started_at = time.perf_counter()
+    subprocess.run([sys.executable, 'manage.py', *args], cwd=BASE_DIR,
+                   capture_output=True, check=True)
+    return time.perf_counter() - started_at
+
+
+def top_imports(stderr: str, count: int):
+    """
+    Módulos con mayor tiempo acumulado de importación (salida de ``-X importtime``)
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Presupuesto de tiempo de arranque')
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help='Segundos máximos (mediana) para `manage.py check`')
+    parser.add_argument('--runs', type=int, default=5, help='Repeticiones por medición')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Mostrar las N importaciones más lentas')
+    args = parser.parse_args()
+
+    samples = [run_child()[0] for _ in range(args.runs)]
+    setup = statistics.median(s['setup'] for s in samples)
+    urls = statistics.median(s['urls'] for s in samples)
+    loaded = any(s['ml_service_loaded'] for s in samples)
+    check = statistics.median(time_command(['check']) for _ in range(args.runs))
+
+    print(f"django.setup():          {setup * 1000:8.1f} ms")
+    print(f"importar URLs y vistas:  {urls * 1000:8.1f} ms")
+    print(f"manage.py check (total): {check * 1000:8.1f} ms (presupuesto {args.budget * 1000:.0f} ms)")
+    print(f"modelo cargado al importar: {'sí' if loaded else 'no'}")
+
+    if args.top:
+        _, stderr = run_child(['-X', 'importtime'])
+        print()
+        print("Importaciones más lentas (acumulado):")
+        for cumulative_us, name in top_imports(stderr, args.top):
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if loaded:
+        failures.append('importar el proyecto construye ml_service (carga el modelo)')
+    if check > args.budget:
+        failures.append(f'manage.py check tarda {check:.2f}s (presupuesto {args.budget:.2f}s)')
+
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Arranque dentro del presupuesto")
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,9 @@ python manage.py collectstatic --no-input
 python manage.py makemigrations
 python manage.py migrate
 
+echo "🤖 Exportando el modelo para carga con memoria mapeada..."
+python manage.py export_model_artifact
+
 echo "🔧 Creando superusuario (si no existe)..."
 python manage.py shell << EOF
 from django.contrib.auth import get_user_model
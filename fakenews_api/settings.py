@@ -36,6 +36,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -66,21 +67,45 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'fakenews_api.wsgi.application'
+ASGI_APPLICATION = 'fakenews_api.asgi.application'
+
+# Servir analyze/analysis/health con vistas nativas async (despliegue ASGI)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
 
 
 # Database Configuration
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 DATABASE_URL = config('DATABASE_URL', default='sqlite:///' + str(BASE_DIR / 'db.sqlite3'))
 
+# Conexiones persistentes: cada worker reutiliza su conexión durante
+# DB_CONN_MAX_AGE segundos en lugar de abrir una (con su handshake TLS) en
+# cada petición; 0 = una conexión por petición. Con ASYNC_VIEWS el valor
+# por defecto es 0: bajo ASGI Django recomienda no usar conexiones
+# persistentes y delegar el pool en PgBouncer.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=0 if ASYNC_VIEWS else 600, cast=int)
+# Comprobar una conexión reutilizada antes de usarla en cada petición (si
+# la cerró el servidor o un balanceador, se abre otra en vez de fallar)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+# Detrás de PgBouncer en modo transacción: sin cursores del lado del
+# servidor (no sobreviven entre transacciones en conexiones distintas)
+DB_PGBOUNCER = config('DB_PGBOUNCER', default=False, cast=bool)
+
 if DATABASE_URL.startswith('postgres'):
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL)
+        'default': dj_database_url.parse(
+            DATABASE_URL,
+            conn_max_age=DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
+            disable_server_side_cursors=DB_PGBOUNCER,
+        )
     }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
         }
     }
 
@@ -137,16 +162,27 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Versiones de AnonRateThrottle/UserRateThrottle con contadores
+    # compartidos entre workers (ver THROTTLE y api.throttling)
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'api.throttling.SharedAnonRateThrottle',
+        'api.throttling.SharedUserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '100/hour',
-        'user': '1000/hour'
+        'anon': config('THROTTLE_RATE_ANON', default='100/hour'),
+        'user': config('THROTTLE_RATE_USER', default='1000/hour')
     }
 }
 
+# Dónde se guardan los contadores de los throttles: 'sqlite' (archivo local
+# compartido por los workers del nodo) o 'cache' (alias 'throttle'; con
+# Redis/Memcached se comparten también entre nodos)
+THROTTLE = {
+    'STORE': config('THROTTLE_STORE', default='sqlite'),
+    'SQLITE_PATH': config('THROTTLE_SQLITE_PATH', default=str(BASE_DIR / 'cache' / 'throttle.sqlite3')),
+    'CACHE_ALIAS': 'throttle',
+}
+
 # =============================================================================
 # CORS CONFIGURATION
 # =============================================================================
@@ -164,11 +200,144 @@ CORS_ALLOW_CREDENTIALS = True
 ML_CONFIG = {
     'MODEL_PATH': BASE_DIR / 'ml_models' / 'mejor_modelo_fake_news.pkl',
     'MODEL_INFO_PATH': BASE_DIR / 'ml_models' / 'info_mejor_modelo.json',
+    # Artefacto exportado con `manage.py export_model_artifact` (memoria mapeada)
+    'MODEL_ARTIFACT_PATH': BASE_DIR / 'ml_models' / 'mejor_modelo_fake_news.joblib',
+    'MODEL_MMAP': config('MODEL_MMAP', default=True, cast=bool),
+    # Recarga en caliente: vigilar MODEL_PATH cada N segundos (0 = no) y/o
+    # recargar al recibir la señal indicada en cada worker
+    'MODEL_RELOAD_INTERVAL': config('MODEL_RELOAD_INTERVAL', default=0.0, cast=float),
+    'MODEL_RELOAD_SIGNAL': config('MODEL_RELOAD_SIGNAL', default='SIGUSR2'),
+    # Registro de modelos: otros modelos de MODEL_DIR (<nombre>.pkl) que
+    # reciben parte del tráfico ("candidato:10" = 10% de los textos distintos,
+    # el resto al principal)
+    # o que puntúan en sombra sin afectar a la respuesta ("candidato")
+    'MODEL_DIR': BASE_DIR / 'ml_models',
+    'MODEL_VARIANTS': config('MODEL_VARIANTS', default=''),
+    'SHADOW_MODELS': config('SHADOW_MODELS', default=''),
+    'SHADOW_QUEUE_SIZE': config('SHADOW_QUEUE_SIZE', default=1000, cast=int),
+    'SHADOW_BATCH_SIZE': config('SHADOW_BATCH_SIZE', default=64, cast=int),
+    # Fracción de los textos que se puntúa también con los modelos en sombra
+    # (en un hilo del worker web, que compite por el GIL con las peticiones)
+    'SHADOW_SAMPLE_RATE': config('SHADOW_SAMPLE_RATE', default=0.1, cast=float),
+    # Guardar en ModelInfo los modelos cargados (una vez por carga/recarga)
+    'MODEL_INFO_SYNC': config('MODEL_INFO_SYNC', default=True, cast=bool),
     'MAX_TEXT_LENGTH': config('MAX_TEXT_LENGTH', default=5000, cast=int),
-    'CACHE_PREDICTIONS': True,
-    'CACHE_TIMEOUT': 3600,  # 1 hora
+    'MAX_BATCH_SIZE': config('MAX_BATCH_SIZE', default=500, cast=int),
+    'STREAM_CHUNK_SIZE': config('STREAM_CHUNK_SIZE', default=256, cast=int),  # Líneas por bloque en /api/analyze/stream/
+    # Máximo de líneas por petición a /api/analyze/stream/ (0 = sin límite): con
+    # workers síncronos la respuesta entera tiene que caber en GUNICORN_TIMEOUT
+    'STREAM_MAX_LINES': config('STREAM_MAX_LINES', default=10000, cast=int),
+    'CACHE_PREDICTIONS': config('CACHE_PREDICTIONS', default=True, cast=bool),
+    'CACHE_TIMEOUT': config('CACHE_TIMEOUT', default=3600, cast=int),  # 1 hora
+    'CACHE_MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int),  # LRU en memoria
+    # Nivel compartido entre workers: solo con PREDICTION_CACHE_BACKEND
+    # (Redis/Memcached); sin él, solo el LRU en memoria de cada worker
+    'CACHE_ALIAS': 'predictions' if config('PREDICTION_CACHE_BACKEND', default='') else None,
+    # Agrupar predicciones concurrentes en un solo predict_proba (útil con
+    # workers con hilos o ASGI; con workers síncronos solo añade espera)
+    'MICRO_BATCHING': config('MICRO_BATCHING', default=False, cast=bool),
+    'MICRO_BATCH_MAX_SIZE': config('MICRO_BATCH_MAX_SIZE', default=32, cast=int),
+    'MICRO_BATCH_MAX_WAIT_MS': config('MICRO_BATCH_MAX_WAIT_MS', default=5.0, cast=float),
+    # Hilos del pool de inferencia de las vistas async (por worker)
+    'INFERENCE_THREADS': config('INFERENCE_THREADS', default=4, cast=int),
+    # Dónde se ejecuta el modelo: 'local' (en el worker web) o 'process_pool'
+    # (pool de procesos con el modelo precargado, usa todos los núcleos)
+    'INFERENCE_BACKEND': config('INFERENCE_BACKEND', default='local'),
+    'INFERENCE_POOL_SIZE': config('INFERENCE_POOL_SIZE', default=0, cast=int),  # 0 = núcleos / WEB_CONCURRENCY
+    'INFERENCE_POOL_WARMUP': config('INFERENCE_POOL_WARMUP', default=True, cast=bool),
+    'INFERENCE_POOL_MAX_RESTARTS': config('INFERENCE_POOL_MAX_RESTARTS', default=5, cast=int),
+    'INFERENCE_POOL_RESTART_WINDOW': config('INFERENCE_POOL_RESTART_WINDOW', default=60.0, cast=float),  # segundos
+    # Perfilado por etapas del pipeline (ver api.pipeline_profiler): fracción
+    # de predicciones medidas (0 = desactivado) y umbral en ms a partir del
+    # cual se guarda el cProfile de la muestra en PROFILE_DIR (0 = no)
+    'PROFILE_SAMPLE_RATE': config('PROFILE_SAMPLE_RATE', default=0.0, cast=float),
+    'PROFILE_SLOW_MS': config('PROFILE_SLOW_MS', default=0.0, cast=float),
+    'PROFILE_DIR': BASE_DIR / 'cache' / 'profiles',
+    'PROFILE_MAX_DUMPS': config('PROFILE_MAX_DUMPS', default=20, cast=int),
+    'INFERENCE_POOL_TIMEOUT': config('INFERENCE_POOL_TIMEOUT', default=30.0, cast=float),  # segundos
+}
+
+# =============================================================================
+# USAGE LOGGING CONFIGURATION
+# =============================================================================
+# Los registros de APIUsage se acumulan en memoria y se guardan con
+# bulk_create desde un hilo en segundo plano al alcanzar FLUSH_SIZE
+# registros o cada FLUSH_INTERVAL segundos.
+USAGE_LOGGING = {
+    'ASYNC': config('USAGE_LOGGING_ASYNC', default=True, cast=bool),
+    'FLUSH_SIZE': config('USAGE_LOGGING_FLUSH_SIZE', default=100, cast=int),
+    'FLUSH_INTERVAL': config('USAGE_LOGGING_FLUSH_INTERVAL', default=5.0, cast=float),  # segundos
+    'MAX_BUFFER': config('USAGE_LOGGING_MAX_BUFFER', default=10000, cast=int),
+    'FLUSH_ON_SHUTDOWN': config('USAGE_LOGGING_FLUSH_ON_SHUTDOWN', default=True, cast=bool),
+    'PATH_PREFIX': '/api/',  # Peticiones medidas por RequestTimingMiddleware
 }
 
+# =============================================================================
+# METRICS CONFIGURATION
+# =============================================================================
+# Endpoint /metrics en formato Prometheus (ver api.metrics). Con gunicorn
+# las métricas de todos los workers se agregan en PROMETHEUS_MULTIPROC_DIR.
+METRICS = {
+    'ENABLED': config('METRICS_ENABLED', default=True, cast=bool),
+    'TOKEN': config('METRICS_TOKEN', default=''),  # Vacío = sin autenticación
+}
+
+# =============================================================================
+# ANALYSIS CACHE CONFIGURATION
+# =============================================================================
+# Respuestas de GET /api/analysis/<id>/ guardadas al crear cada análisis
+# (ver api.analysis_cache). MAX_AGE es el Cache-Control para clientes y CDN.
+ANALYSIS_CACHE = {
+    'ENABLED': config('ANALYSIS_CACHE_ENABLED', default=True, cast=bool),
+    'ALIAS': 'analyses',
+    'TIMEOUT': config('ANALYSIS_CACHE_TIMEOUT', default=300, cast=int),  # segundos
+    'MAX_AGE': config('ANALYSIS_CACHE_MAX_AGE', default=60, cast=int),  # segundos
+}
+
+# =============================================================================
+# CACHE CONFIGURATION
+# =============================================================================
+# 'predictions' es el nivel compartido de la caché de predicciones y solo
+# existe si se configura PREDICTION_CACHE_BACKEND/PREDICTION_CACHE_LOCATION
+# (p. ej. django.core.cache.backends.redis.RedisCache y redis://host:6379/2).
+# Debe ser una base de datos propia: al cambiar de modelo se vacía entera.
+# No se usa la caché de archivos: recorre el directorio en cada escritura,
+# justo en el camino de las predicciones que no están en caché.
+# 'analyses' guarda las respuestas de los análisis; en memoria de cada worker
+# por defecto.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'analyses': {
+        'BACKEND': config(
+            'ANALYSIS_CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': config('ANALYSIS_CACHE_LOCATION', default='analyses'),
+        'TIMEOUT': ANALYSIS_CACHE['TIMEOUT'],
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # Contadores de los throttles con THROTTLE_STORE=cache (p. ej.
+    # django.core.cache.backends.redis.RedisCache y redis://host:6379/1)
+    'throttle': {
+        'BACKEND': config(
+            'THROTTLE_CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': config('THROTTLE_CACHE_LOCATION', default='throttle'),
+    },
+}
+
+if ML_CONFIG['CACHE_ALIAS']:
+    CACHES['predictions'] = {
+        'BACKEND': config('PREDICTION_CACHE_BACKEND'),
+        'LOCATION': config('PREDICTION_CACHE_LOCATION', default=''),
+        'TIMEOUT': ML_CONFIG['CACHE_TIMEOUT'],
+    }
+
 # =============================================================================
 # SECURITY SETTINGS (PRODUCTION)
 # =============================================================================
@@ -12,6 +12,8 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET
 
+from api.views import metrics_endpoint
+
 
 @require_GET
 def root_endpoint(request):
@@ -27,6 +29,7 @@ def root_endpoint(request):
             'health': '/api/health/',
             'stats': '/api/stats/',
             'model_info': '/api/model/info/',
+            'metrics': '/metrics',
             'documentation': '/api/docs/',
             'admin': '/admin/'
         }
@@ -44,6 +47,10 @@ urlpatterns = [
     path('', root_endpoint, name='root'),
 ]
 
+# Métricas de Prometheus
+if settings.METRICS['ENABLED']:
+    urlpatterns.append(path('metrics', metrics_endpoint, name='metrics'))
+
 # Configuración para archivos estáticos en desarrollo
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fakenews_api.settings')
 
 application = get_wsgi_application()
+
+# Este módulo solo lo importan los procesos que sirven peticiones: cargar
+# aquí el modelo para que no lo pague la primera petición
+from api.ml_service import load_ml_service  # noqa: E402
+
+load_ml_service()
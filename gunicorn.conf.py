@@ -0,0 +1,98 @@
+"""
+Configuración de Gunicorn
+=========================
+Carga la aplicación y el modelo ML una sola vez en el proceso maestro
+(``preload_app``) para que los workers lo compartan por copy-on-write
+en lugar de tener cada uno su propia copia.
+
+Uso:
+    # WSGI (workers síncronos)
+    gunicorn fakenews_api.wsgi:application -c gunicorn.conf.py
+
+    # ASGI (workers de uvicorn y vistas async)
+    ASYNC_VIEWS=True GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \
+        gunicorn fakenews_api.asgi:application -c gunicorn.conf.py
+"""
+
+import gc
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# En el entorno para que la aplicación lo vea (reparto de núcleos del pool
+# de inferencia, ver api.inference_backends.default_pool_size)
+workers = int(os.environ.setdefault('WEB_CONCURRENCY', '2'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+
+# Importar Django y cargar el modelo en el maestro antes del fork
+preload_app = True
+
+# Métricas de Prometheus de todos los workers (y del pool de inferencia):
+# cada proceso escribe en este directorio y /metrics las agrega. Se prepara
+# al leer la configuración porque con preload_app el maestro carga la
+# aplicación (y prometheus_client) antes de on_starting. Las métricas de una
+# ejecución anterior se borran solo la primera vez: al recargar con HUP el
+# maestro vuelve a leer este archivo y los workers siguen escribiendo aquí.
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'prometheus')
+)
+if not os.environ.get('FAKENEWS_METRICS_DIR_READY'):
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.environ['FAKENEWS_METRICS_DIR_READY'] = '1'
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def when_ready(server):
+    """
+    En el maestro, tras cargar la aplicación y antes de crear los workers
+    """
+    from django.urls import get_resolver
+    from api.ml_service import ml_service
+
+    # Importar también las URLs (vistas, DRF, serializers) que Django
+    # cargaría perezosamente en la primera petición de cada worker
+    get_resolver().url_patterns
+
+    server.log.info(f"Modelo ML precargado en el maestro (listo: {ml_service.is_ready()})")
+
+    # Mover todos los objetos existentes (modelo incluido) a la generación
+    # permanente del GC: las recolecciones en los workers no los recorren
+    # ni escriben en sus cabeceras, y las páginas siguen compartidas.
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """
+    En cada worker, justo después del fork
+    """
+    # Las conexiones a BD abiertas en el maestro no deben compartirse
+    from django.db import connections
+    connections.close_all()
+
+    # Arrancar y calentar el pool de inferencia (si está configurado) antes
+    # de aceptar peticiones
+    from api.ml_service import ml_service
+    ml_service.inference_backend.start()
+
+
+def post_worker_init(worker):
+    """
+    En cada worker, con sus manejadores de señales ya instalados
+    """
+    from api.ml_service import ml_service
+
+    # Recarga del modelo en caliente: señal (kill -USR2 <pid del worker>)
+    # y vigilancia del archivo del modelo
+    ml_service.install_reload_signal()
+    ml_service.start_model_watcher()
+
+
+def child_exit(server, worker):
+    """
+    En el maestro, cuando termina un worker
+    """
+    from api.metrics import mark_process_dead
+    mark_process_dead(worker.pid)